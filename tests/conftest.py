@@ -0,0 +1,211 @@
+"""测试用的替身模块：在导入主程序前用内存中的假桌面替换 win32gui、mouse、keyboard 等仅在 Windows 上可用的依赖。"""
+import collections
+import importlib.util
+import os
+import sys
+import types
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class FakeDesktop:
+    """假桌面：窗口、进程与光标位置，由 win32gui 等替身读取。"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.windows = {}  # hwnd -> {'title', 'cls', 'pid', 'rect', 'visible'}
+        self.processes = {}  # pid -> (可执行文件名, 启动时间)
+        self.cursor = (0, 0)
+        self.foreground = 0
+        self.calls = collections.Counter()
+
+    def add_window(self, hwnd, title='', cls='Window', pid=1000, rect=(0, 0, 400, 300), visible=True, exe=None):
+        self.windows[hwnd] = {'title': title, 'cls': cls, 'pid': pid, 'rect': rect, 'visible': visible}
+        if exe is not None and pid not in self.processes: self.start_process(pid, exe)
+        return hwnd
+
+    def start_process(self, pid, exe, start_time=None):
+        self.processes[pid] = (exe, pid if start_time is None else start_time)
+
+
+desktop = FakeDesktop()
+
+
+def _module(name, **attrs):
+    module = types.ModuleType(name)
+    module.__dict__.update(attrs)
+    return module
+
+
+class _Constants(types.ModuleType):
+    """win32con 替身：任意常量都返回一个固定的整数。"""
+
+    def __getattr__(self, name):
+        return 1
+
+
+def _counted(name, result=None):
+    def call(*args):
+        desktop.calls[name] += 1
+        return result
+    return call
+
+
+def _get_window_rect(hwnd):
+    desktop.calls['GetWindowRect'] += 1
+    return desktop.windows[hwnd]['rect']
+
+
+def _enum_windows(callback, extra):
+    for hwnd in list(desktop.windows): callback(hwnd, extra)
+
+
+def _open_process(flags, inherit, pid):
+    if pid not in desktop.processes: raise OSError('process not found')
+    return pid
+
+
+win32gui = _module(
+    'win32gui',
+    IsWindow=lambda hwnd: hwnd in desktop.windows,
+    IsWindowVisible=lambda hwnd: desktop.windows.get(hwnd, {}).get('visible', False),
+    IsIconic=lambda hwnd: False,
+    GetWindowText=lambda hwnd: desktop.windows.get(hwnd, {}).get('title', ''),
+    GetClassName=lambda hwnd: desktop.windows.get(hwnd, {}).get('cls', ''),
+    GetWindowRect=_get_window_rect,
+    GetWindowLong=lambda hwnd, index: 0,
+    SetWindowLong=_counted('SetWindowLong'),
+    SetWindowPos=_counted('SetWindowPos'),
+    SetLayeredWindowAttributes=_counted('SetLayeredWindowAttributes'),
+    PostMessage=_counted('PostMessage'),
+    GetForegroundWindow=lambda: desktop.foreground,
+    GetCursorPos=lambda: desktop.cursor,
+    WindowFromPoint=lambda pos: 0,
+    GetAncestor=lambda hwnd, flags: hwnd,
+    EnumWindows=_enum_windows,
+    GetDoubleClickTime=lambda: 500,
+)
+win32process = _module(
+    'win32process',
+    GetWindowThreadProcessId=lambda hwnd: (1, desktop.windows[hwnd]['pid']),
+    GetProcessTimes=lambda handle: {'CreationTime': desktop.processes[handle][1]},
+    GetModuleFileNameEx=lambda handle, module: 'C:/Programs/' + desktop.processes[handle][0],
+)
+win32api = _module('win32api', OpenProcess=_open_process, CloseHandle=lambda handle: None)
+
+ButtonEvent = collections.namedtuple('ButtonEvent', ['event_type', 'button', 'time'])
+WheelEvent = collections.namedtuple('WheelEvent', ['delta', 'time'])
+MoveEvent = collections.namedtuple('MoveEvent', ['x', 'y', 'time'])
+mouse = _module(
+    'mouse', ButtonEvent=ButtonEvent, WheelEvent=WheelEvent, MoveEvent=MoveEvent,
+    LEFT='left', RIGHT='right', MIDDLE='middle', X='x', X2='x2', UP='up', DOWN='down', DOUBLE='double',
+    get_position=lambda: desktop.cursor, hook=lambda callback: None, unhook=lambda callback: None,
+    on_click=lambda callback: None,
+)
+
+# keyboard 替身使用美式键盘的扫描码；同一按键的不同字符（如 1 与 !）共用扫描码
+SCAN_CODES = {'ctrl': (29,), 'shift': (42, 54), 'alt': (56,), 'windows': (91, 92), 'esc': (1,), 'space': (57,)}
+SCAN_CODES.update({key: (2 + i,) for i, key in enumerate('1234567890')})
+SCAN_CODES.update({key: (2 + i,) for i, key in enumerate('!@#$%^&*()')})
+SCAN_CODES.update({key: (code,) for code, key in enumerate('qwertyuiop', 16)})
+SCAN_CODES.update({key: (code,) for code, key in enumerate('asdfghjkl', 30)})
+SCAN_CODES.update({key: (code,) for code, key in enumerate('zxcvbnm', 44)})
+
+
+def key_to_scan_codes(key, error_if_missing=True):
+    codes = SCAN_CODES.get(key.lower())
+    if codes is None and error_if_missing: raise ValueError(f'Key {key!r} is not mapped to any known key.')
+    return codes or ()
+
+
+KeyboardEvent = collections.namedtuple('KeyboardEvent', ['event_type', 'name', 'scan_code'])
+keyboard = _module(
+    'keyboard', KEY_UP='up', KEY_DOWN='down', KeyboardEvent=KeyboardEvent, key_to_scan_codes=key_to_scan_codes,
+    hook=lambda callback, suppress=False: callback, unhook=lambda hook: None,
+)
+
+
+class _MenuItem:
+    def __init__(self, text, action, checked=None, radio=False, default=False, enabled=True):
+        self.text, self.action, self.checked, self.enabled = text, action, checked, enabled
+
+
+class _Menu:
+    SEPARATOR = None
+
+    def __init__(self, *items):
+        self.items = items
+
+
+class _Icon:
+    def __init__(self, name, icon=None, title=None, menu=None):
+        self.name, self.icon, self.title, self.menu = name, icon, title, menu
+        self.visible = False
+
+    def run(self):
+        self.visible = True
+
+    def stop(self):
+        self.visible = False
+
+    def update_menu(self):
+        pass
+
+
+pystray = _module('pystray', Icon=_Icon, Menu=_Menu, MenuItem=_MenuItem)
+
+for _name, _fake in (('win32gui', win32gui), ('win32con', _Constants('win32con')), ('win32process', win32process),
+                     ('win32api', win32api), ('mouse', mouse), ('keyboard', keyboard), ('pystray', pystray)):
+    sys.modules[_name] = _fake
+
+_spec = importlib.util.spec_from_file_location('windows_alter', os.path.join(ROOT, 'windows_alter_1.0.1.py'))
+windows_alter = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(windows_alter)
+
+
+class FakeRoot:
+    """Tk 根窗口替身：after 只登记回调，由测试调用 run_pending 执行。"""
+
+    def __init__(self):
+        self.pending = {}  # after_id -> (回调, 参数)
+        self.next_id = 0
+
+    def after(self, ms, func, *args):
+        self.next_id += 1
+        self.pending[self.next_id] = (func, args)
+        return self.next_id
+
+    def after_cancel(self, after_id):
+        self.pending.pop(after_id, None)
+
+    def winfo_screenwidth(self):
+        return 1920
+
+    def winfo_screenheight(self):
+        return 1080
+
+    def run_pending(self):
+        pending, self.pending = self.pending, {}
+        for func, args in pending.values(): func(*args)
+        return len(pending)
+
+
+@pytest.fixture
+def wa():
+    return windows_alter
+
+
+@pytest.fixture(name='desktop')
+def desktop_fixture():
+    desktop.reset()
+    yield desktop
+    desktop.reset()
+
+
+@pytest.fixture
+def root():
+    return FakeRoot()
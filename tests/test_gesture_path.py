@@ -0,0 +1,76 @@
+"""手势路径缓冲区：长时间拖动下内存保持不变，降采样后仍保留起点、终点与整体形状。"""
+import math
+import tracemalloc
+
+import numpy as np
+
+
+def spiral(points):
+    """逐像素移动的螺旋轨迹，模拟按住手势键长时间画圈。"""
+    for i in range(points):
+        angle = i / 200
+        radius = 100 + i / 100
+        yield 500 + int(radius * math.cos(angle)), 500 + int(radius * math.sin(angle))
+
+
+def peak_bytes(record, points):
+    tracemalloc.start()
+    try:
+        record(spiral(points))
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def test_memory_does_not_grow_with_gesture_length(wa):
+    path = wa.GesturePath()
+
+    def into_path(trace):
+        path.clear()
+        for x, y in trace: path.append(x, y)
+
+    def into_list(trace):
+        into_list.points = [(x, y) for x, y in trace]
+
+    results = {}
+    for points in (1000, 60000):
+        results[points] = peak_bytes(into_path, points), peak_bytes(into_list, points)
+        print(f"{points} points: GesturePath peak {results[points][0] / 1024:.1f} KiB, "
+              f"list peak {results[points][1] / 1024:.1f} KiB")
+    assert results[60000][0] < 16 * 1024
+    assert results[60000][0] < results[60000][1] / 100
+    assert len(path) <= path.capacity + 1
+
+
+def test_downsampling_keeps_endpoints_and_shape(wa):
+    trace = list(spiral(60000))
+    path = wa.GesturePath()
+    for x, y in trace: path.append(x, y)
+    assert path[0] == trace[0]
+    assert path[-1] == trace[-1]
+    # 抽稀后的每个点都落在原轨迹上，按顺序排列
+    positions = {point: i for i, point in enumerate(trace)}
+    indices = [positions[point] for point in path]
+    assert indices == sorted(indices)
+    points = path.to_numpy()
+    assert points.shape == (len(path), 2)
+    assert np.allclose(points[[0, -1]], [trace[0], trace[-1]])
+
+
+def test_short_moves_are_merged_into_the_endpoint(wa):
+    path = wa.GesturePath(min_distance=10)
+    for x in range(0, 25): path.append(x, 0)
+    assert list(path) == [(0, 0), (10, 0), (20, 0), (24, 0)]
+    path.clear()
+    assert len(path) == 0
+
+
+def test_to_numpy_is_a_view_of_the_buffer(wa):
+    path = wa.GesturePath(capacity=8, min_distance=10)
+    for x in range(0, 200, 10): path.append(x, 2 * x)
+    path.append(195, 390)  # 距上一个点太近，暂作终点
+    points = path.to_numpy()
+    assert np.shares_memory(points, np.frombuffer(path.xy, dtype=np.intc))
+    assert points.shape == (len(path), 2) and len(path) == path.count + 1
+    assert points.tolist() == [list(point) for point in path]
+    assert points[-1].tolist() == [195, 390]
@@ -0,0 +1,111 @@
+"""手势识别的准确率与延迟基准：正向、偏离坐标轴与接近对角线的笔画。"""
+import math
+import time
+
+import numpy as np
+import pytest
+
+SWIPES = {0: 'swipe_right', 90: 'swipe_down', 180: 'swipe_left', 270: 'swipe_up'}  # 屏幕坐标，y 轴向下
+
+
+def line(degrees, length=400, points=150, noise=3.0, rng=None):
+    t = np.linspace(0, length, points)
+    angle = math.radians(degrees)
+    stroke = np.column_stack((t * math.cos(angle), t * math.sin(angle)))
+    if rng is not None: stroke += rng.normal(0, noise, stroke.shape)
+    return stroke
+
+
+def polyline(corners, points=150):
+    corners = np.asarray(corners, dtype=float)
+    segments = [np.linspace(a, b, points // (len(corners) - 1), endpoint=False) for a, b in zip(corners, corners[1:])]
+    return np.vstack(segments + [corners[-1:]])
+
+
+def accepted(recognizer, wa, stroke):
+    name, score = recognizer.recognize(stroke)
+    return name if score >= wa.GESTURE_MIN_SCORE else None
+
+
+@pytest.fixture
+def recognizer(wa):
+    return wa.GestureRecognizer()
+
+
+def test_on_axis_and_off_axis_swipes_keep_their_direction(wa, recognizer):
+    rng = np.random.default_rng(0)
+    total = correct = 0
+    for base, expected in SWIPES.items():
+        for offset in range(-25, 26, 5):
+            for _ in range(10):
+                total += 1
+                correct += accepted(recognizer, wa, line(base + offset, rng=rng)) == expected
+    print(f"off-axis swipes within 25°: {correct}/{total}")
+    assert correct == total
+
+
+@pytest.mark.parametrize('degrees', [35, 40, 45, 50, 55])
+def test_near_diagonal_lines_are_rejected(wa, recognizer, degrees):
+    rng = np.random.default_rng(degrees)
+    for quadrant in range(0, 360, 90):
+        for _ in range(10):
+            assert accepted(recognizer, wa, line(quadrant + degrees, rng=rng)) is None
+
+
+def test_no_line_is_recognised_as_the_wrong_swipe(wa, recognizer):
+    for degrees in range(0, 360):
+        name = accepted(recognizer, wa, line(degrees))
+        if name is None: continue
+        assert name in SWIPES.values()
+        nearest = SWIPES[round(degrees / 90) % 4 * 90]
+        assert name == nearest, (degrees, name)
+
+
+@pytest.mark.parametrize('corners', [
+    [(0, 0), (400, 0), (400, 400)],  # 先右后下
+    [(400, 400), (400, 0), (0, 0)],  # 先上后左
+    [(0, 0), (0, 400), (400, 400)],  # 先下后右，比 l_shape 模板的横线更长
+])
+def test_corners_do_not_fire_swipes(wa, recognizer, corners):
+    assert accepted(recognizer, wa, polyline(corners)) not in SWIPES.values()
+
+
+def test_shapes(wa, recognizer):
+    rng = np.random.default_rng(1)
+    theta = np.linspace(0, 2 * np.pi, 100)
+    circle = np.column_stack((200 * np.cos(theta), 200 * np.sin(theta)))
+    assert accepted(recognizer, wa, circle + rng.normal(0, 8, circle.shape)) == 'circle'
+    assert accepted(recognizer, wa, circle * (1.5, 0.9)) == 'circle'
+    assert accepted(recognizer, wa, circle[::-1] + (300, 50)) == 'circle'
+    assert accepted(recognizer, wa, polyline([(0, 0), (20, 400), (260, 390)])) == 'l_shape'
+    assert accepted(recognizer, wa, polyline([(0, 0), (400, 40), (30, 400), (420, 380)])) == 'zigzag'
+
+
+def test_custom_templates_round_trip(wa, recognizer):
+    stroke = polyline([(0, 0), (200, 400), (400, 0)])
+    name = recognizer.next_custom_name()
+    assert recognizer.add_template(name, stroke, custom=True)
+    restored = wa.GestureRecognizer()
+    restored.load_config(recognizer.to_config())
+    assert accepted(restored, wa, stroke + 5) == name
+
+
+def test_recognition_latency_does_not_grow_with_templates(wa, recognizer):
+    rng = np.random.default_rng(2)
+    stroke = line(10, rng=rng)
+
+    def median_us():
+        samples = []
+        for _ in range(200):
+            start = time.perf_counter()
+            recognizer.recognize(stroke)
+            samples.append(time.perf_counter() - start)
+        return float(np.median(samples)) * 1e6
+
+    few = median_us()
+    for i in range(200):
+        recognizer.add_template(f"custom_{i}", rng.normal(0, 100, (20, 2)).cumsum(axis=0), custom=True)
+    many = median_us()
+    print(f"recognize: {few:.0f} us with 8 templates, {many:.0f} us with 208")
+    assert many < 1000
+    assert many < few * 5
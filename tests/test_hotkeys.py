@@ -0,0 +1,77 @@
+"""快捷键前缀树的匹配，按键事件由 keyboard 替身构造。"""
+import time
+
+import pytest
+
+from conftest import KeyboardEvent, SCAN_CODES
+
+
+def press(matcher, *names, shifted=None):
+    """依次按下再逆序抬起给定按键，返回各按下事件是否被放行；shifted 为按键报告的上档字符。"""
+    results = []
+    for name in names:
+        reported = (shifted or {}).get(name, name)
+        results.append(matcher._on_key(KeyboardEvent('down', reported, SCAN_CODES[name][0])))
+    for name in reversed(names):
+        reported = (shifted or {}).get(name, name)
+        matcher._on_key(KeyboardEvent('up', reported, SCAN_CODES[name][0]))
+    return results
+
+
+@pytest.fixture
+def fired():
+    return []
+
+
+@pytest.fixture
+def matcher(wa, fired):
+    return wa.HotkeyMatcher(dispatch=lambda callback: callback(), scope_active=lambda scope: scope == 'active')
+
+
+def test_shifted_digits_match_by_scan_code(matcher, fired):
+    matcher.bind('a', 'ctrl+shift+1', lambda: fired.append('a'))
+    # 按住 Shift 时 keyboard 报告的按键名是 "!"
+    assert press(matcher, 'ctrl', 'shift', '1', shifted={'1': '!'}) == [True, True, False]
+    assert fired == ['a']
+    assert not matcher.suppressed
+
+
+def test_sequences_and_timeout(wa, matcher, fired):
+    matcher.bind('seq', 'ctrl+alt+w, t', lambda: fired.append('seq'))
+    matcher.bind('t', 't', lambda: fired.append('t'))
+    press(matcher, 'ctrl', 'alt', 'w')
+    press(matcher, 't')
+    assert fired == ['seq']
+    press(matcher, 'ctrl', 'alt', 'w')
+    matcher.deadline = time.monotonic() - 1
+    press(matcher, 't')
+    assert fired == ['seq', 't']
+
+
+def test_scoped_binding_wins_only_while_active(matcher, fired):
+    matcher.bind('global', 'ctrl+q', lambda: fired.append('global'))
+    matcher.bind('scoped', 'ctrl+q', lambda: fired.append('scoped'), scope='active')
+    matcher.bind('inactive', 'ctrl+e', lambda: fired.append('inactive'), scope='other')
+    press(matcher, 'ctrl', 'q')
+    assert press(matcher, 'ctrl', 'e') == [True, True]
+    assert fired == ['scoped']
+
+
+def test_unbound_keys_pass_through(matcher, fired):
+    matcher.bind('a', 'ctrl+q', lambda: fired.append('a'))
+    assert press(matcher, 'ctrl', 'w') == [True, True]
+    matcher.unbind('a')
+    assert matcher.hook is None
+
+
+@pytest.mark.parametrize('count', [5, 500])
+def test_hook_cost_does_not_grow_with_bindings(matcher, fired, count):
+    letters = 'qwertyuiopasdfghjklzxcvbnm'
+    for i in range(count):
+        matcher.bind(f"b{i}", f"ctrl+alt+{letters[i % 26]}, {letters[i // 26 % 26]}", lambda: None)
+    event = KeyboardEvent('down', 'm', SCAN_CODES['m'][0])
+    start = time.perf_counter()
+    for _ in range(10000): matcher._on_key(event)
+    per_event_us = (time.perf_counter() - start) * 100
+    print(f"hook with {count} bindings: {per_event_us:.2f} us/event")
+    assert per_event_us < 50
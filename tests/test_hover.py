@@ -0,0 +1,48 @@
+"""悬停判断的滞回与驻留：回放光标在窗口边缘抖动的轨迹，比较状态切换与透明度设置的次数。"""
+import random
+
+import pytest
+
+RECT = (100, 100, 900, 700)
+
+
+def jitter_trace(seconds=3.0, interval_ms=16, seed=1):
+    """光标停在窗口左边缘附近，每帧随机抖动几个像素，偶尔越过边框。"""
+    rng = random.Random(seed)
+    for i in range(int(seconds * 1000 / interval_ms)):
+        yield i * interval_ms / 1000, RECT[0] + rng.randint(-4, 4), 400
+
+
+def replay(wa, desktop, root, trace, **options):
+    desktop.add_window(1, 'Editor', rect=RECT)
+    monitor = wa.WindowMonitor(1, root, **options)
+    monitor.refresh_rect()
+    desktop.calls.clear()
+    for now, x, y in trace: monitor.update_hover(x, y, now=now)
+    return monitor.state_changes, desktop.calls['SetLayeredWindowAttributes']
+
+
+def test_edge_jitter_trace(wa, desktop, root):
+    trace = list(jitter_trace())
+    strict = replay(wa, desktop, root, trace)
+    desktop.reset()
+    damped = replay(wa, desktop, root, trace, edge_margin=8, hover_dwell_ms=50, away_dwell_ms=150)
+    print(f"{len(trace)} frames of edge jitter: strict rect {strict[0]} state changes / {strict[1]} alpha calls, "
+          f"margin and dwell {damped[0]} / {damped[1]}")
+    assert strict[0] > 50
+    assert damped[0] <= 1
+    assert damped[1] <= damped[0] + 1
+
+
+@pytest.mark.parametrize('start, end, hovering', [((50, 400), (500, 400), True), ((500, 400), (50, 400), False)])
+def test_deliberate_moves_still_switch_after_the_dwell(wa, desktop, root, start, end, hovering):
+    desktop.add_window(1, 'Editor', rect=RECT)
+    monitor = wa.WindowMonitor(1, root, edge_margin=8, hover_dwell_ms=50, away_dwell_ms=150)
+    monitor.refresh_rect()
+    monitor.update_hover(*start, now=0.0)
+    dwell = 0.05 if hovering else 0.15
+    monitor.update_hover(*end, now=1.0)
+    monitor.update_hover(*end, now=1.0 + dwell / 2)
+    assert monitor.is_hovering is not hovering
+    monitor.update_hover(*end, now=1.0 + dwell + 0.001)
+    assert monitor.is_hovering is hovering
@@ -0,0 +1,67 @@
+"""图标缓存：首次加载与命中的耗时、文件变化后重新加载、加载失败回退到默认图标，以及托盘角标帧的复用。"""
+import io
+import os
+import time
+
+from PIL import Image
+
+
+def save_icon(path, color, size=256):
+    Image.new('RGBA', (size, size), color).save(path)
+    return str(path)
+
+
+def test_startup_benchmark(wa, tmp_path):
+    path = save_icon(tmp_path / 'icon.png', 'red')
+    cache = wa.IconCache()
+    start = time.perf_counter()
+    entry = cache.get(path)
+    first_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    for _ in range(100): assert cache.get(path) is entry
+    hit_us = (time.perf_counter() - start) * 1e4
+    print(f"icon first load {first_ms:.1f} ms, cached lookup {hit_us:.1f} us")
+    assert (cache.stats['hits'], cache.stats['misses']) == (100, 1)
+    assert hit_us < first_ms * 1000 / 10
+
+
+def test_modified_file_is_reloaded(wa, tmp_path):
+    path = save_icon(tmp_path / 'icon.png', 'red')
+    cache = wa.IconCache()
+    first = cache.get(path)
+    save_icon(path, 'blue')
+    os.utime(path, ns=(time.time_ns(), os.stat(path).st_mtime_ns + 10 ** 9))
+    second = cache.get(path)
+    assert second is not first
+    assert second.image.getpixel((0, 0))[:3] == (0, 0, 255)
+
+
+def test_bad_files_fall_back_to_the_default_icon(wa, tmp_path):
+    broken = tmp_path / 'broken.png'
+    broken.write_bytes(b'not an image')
+    cache = wa.IconCache()
+    default = cache.get('')
+    assert cache.get(str(broken)) is default
+    assert cache.get(str(tmp_path / 'missing.png')) is default
+    assert cache.stats['failures'] == 1
+
+
+def test_cache_is_bounded(wa, tmp_path):
+    cache = wa.IconCache(max_entries=3)
+    paths = [save_icon(tmp_path / f'{i}.png', (i * 40, 0, 0, 255), size=32) for i in range(5)]
+    for path in paths: cache.get(path)
+    assert [key[0] for key in cache.entries] == paths[2:]
+
+
+def test_encoded_sizes_and_tray_frames(wa, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    entry = wa.IconCache().get('')
+    with Image.open(io.BytesIO(entry.ico)) as ico:
+        assert set(ico.info['sizes']) == {(size, size) for size in wa.ICON_SIZES}
+    for size, data in entry.png.items():
+        with Image.open(io.BytesIO(data)) as png: assert png.size == (size, size)
+    # 托盘状态变化只切换预先绘制的图片
+    assert entry.tray_frame(3, True) is entry.tray_frame(3, True)
+    assert entry.tray_frame(3, True) is not entry.tray_frame(3, False)
+    assert entry.tray_frame(50, False) is entry.tray_frame(wa.TRAY_BADGE_MAX_COUNT + 1, False)
+    assert list(tmp_path.iterdir()) == []  # 不再把图标写到当前目录
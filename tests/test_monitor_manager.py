@@ -0,0 +1,124 @@
+"""监控线程：界面线程繁忙时的悬停响应延迟，以及与其他线程并发访问监控集合。"""
+import threading
+import time
+
+import pytest
+
+
+def wait_until(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline: return False
+        time.sleep(0.001)
+    return True
+
+
+@pytest.fixture
+def manager(wa):
+    manager = wa.MonitorManager(event_driven=True)
+    manager.fade_engine.duration_ms = 0
+    yield manager
+    manager.stop_all()
+
+
+def add_monitor(wa, manager, root, desktop, hwnd, rect):
+    desktop.add_window(hwnd, f'Window {hwnd}', rect=rect)
+    monitor = wa.WindowMonitor(hwnd, root, edge_margin=0, hover_dwell_ms=0, away_dwell_ms=0)
+    manager.add(monitor)
+    return monitor
+
+
+def test_hover_latency_while_ui_thread_is_busy(wa, manager, root, desktop):
+    desktop.cursor = (900, 900)
+    monitor = add_monitor(wa, manager, root, desktop, 1, (0, 0, 400, 300))
+    assert wait_until(lambda: monitor.is_hovering is False)
+    latencies = []
+    stop = threading.Event()
+
+    def busy_ui():
+        # 模拟卡住的 Tk 线程：持续执行 Python 代码，不让出事件循环
+        while not stop.is_set(): sum(range(10000))
+
+    ui = threading.Thread(target=busy_ui)
+    ui.start()
+    try:
+        for i in range(20):
+            inside = i % 2 == 0
+            desktop.cursor = (200, 150) if inside else (900, 900)
+            start = time.perf_counter()
+            manager.on_mouse_move(*desktop.cursor)
+            assert wait_until(lambda: monitor.is_hovering == inside)
+            latencies.append((time.perf_counter() - start) * 1000)
+    finally:
+        stop.set()
+        ui.join()
+    latencies.sort()
+    print(f"hover latency with a busy UI thread: median {latencies[10]:.1f} ms, max {latencies[-1]:.1f} ms")
+    assert latencies[10] < 50
+
+
+def test_snapshot_is_safe_while_worker_removes_windows(wa, manager, root, desktop):
+    monitors = [add_monitor(wa, manager, root, desktop, hwnd, (0, 0, 100, 100)) for hwnd in range(1, 201)]
+    errors = []
+
+    def read():
+        try:
+            while manager.running: [monitor.title for monitor in manager.snapshot()]
+        except RuntimeError as e:
+            errors.append(e)
+
+    reader = threading.Thread(target=read)
+    reader.start()
+    for monitor in monitors:
+        del desktop.windows[monitor.hwnd]  # 窗口关闭后由监控线程刷新矩形时移除
+        manager.next_tick = 0.0
+        manager.wake_event.set()
+    assert wait_until(lambda: not manager.running)
+    reader.join()
+    assert errors == []
+    assert manager.notifications.qsize() == 200
+
+
+@pytest.mark.parametrize('event_driven', [True, False])
+def test_rects_refresh_on_the_fallback_cadence(wa, manager, root, desktop, event_driven):
+    manager.event_driven = event_driven
+    monitor = add_monitor(wa, manager, root, desktop, 1, (0, 0, 400, 300))
+    desktop.calls.clear()
+    start = time.monotonic()
+    # 光标在窗口附近不停移动，节拍保持在最短间隔
+    while time.monotonic() - start < 1.0:
+        desktop.cursor = (410 + int((time.monotonic() - start) * 1000) % 20, 150)
+        manager.on_mouse_move(*desktop.cursor)
+        time.sleep(0.005)
+    refreshes = desktop.calls['GetWindowRect']
+    print(f"event_driven={event_driven}: {refreshes} rect refreshes in 1 s")
+    assert refreshes <= 1000 / wa.MONITOR_FALLBACK_INTERVAL_MS + 1
+    # 窗口移动后，在一个兜底间隔内按新矩形判断悬停
+    desktop.windows[1]['rect'] = (1000, 0, 1400, 300)
+    desktop.cursor = (1200, 150)
+    manager.on_mouse_move(*desktop.cursor)
+    assert wait_until(lambda: monitor.is_hovering, timeout=wa.MONITOR_FALLBACK_INTERVAL_MS / 1000 * 2)
+
+
+def test_fade_started_from_the_ui_thread_wakes_a_backed_off_worker(wa, root, desktop):
+    manager = wa.MonitorManager(event_driven=True)
+    try:
+        desktop.cursor = (900, 900)
+        monitor = add_monitor(wa, manager, root, desktop, 1, (0, 0, 400, 300))
+        assert wait_until(lambda: manager.interval_ms == manager.max_interval_ms and monitor.applied_alpha == 127,
+                          timeout=10)
+        time.sleep(0.05)  # 监控线程此时按最长间隔休眠
+        frames = []
+        apply_alpha = monitor._apply_alpha
+        monitor._apply_alpha = lambda alpha: (frames.append((time.monotonic(), alpha)), apply_alpha(alpha))
+        start = time.monotonic()
+        monitor.toggle_transparency()  # 快捷键与托盘菜单都在 Tk 线程中调用
+        duration = manager.fade_engine.duration_ms / 1000
+        assert wait_until(lambda: monitor.applied_alpha == 255, timeout=duration + 0.2)
+        steps = [alpha for _, alpha in frames if 127 < alpha < 255]
+        print(f"fade after idle backoff: {len(steps)} intermediate frames, "
+              f"done in {(frames[-1][0] - start) * 1000:.0f} ms")
+        assert len(steps) >= 3
+        assert frames[0][0] - start < 3 * wa.FADE_FRAME_INTERVAL_MS / 1000
+    finally:
+        manager.stop_all()
@@ -0,0 +1,151 @@
+"""鼠标事件的过滤、分发与单击/双击区分，以及分发表的微基准。"""
+import time
+import types
+
+import pytest
+
+from conftest import ButtonEvent, MoveEvent, WheelEvent
+
+
+def make_app(wa, root, triggers, gesture_buttons=()):
+    """只包含分发相关状态的应用替身，直接调用 App 中的方法。"""
+    app = types.SimpleNamespace(root=root, mouse_button_callbacks=triggers, gesture_recorder=None, click_trackers=[],
+                                mouse_event_queue=wa.MouseEventQueue(), double_click_ms=wa.App.double_click_ms)
+    app.gesture_handlers = {button: wa.GestureHandler(app, button) for button in gesture_buttons}
+    wa.App.compile_mouse_dispatch(app)
+    return app
+
+
+def deliver(wa, app, events):
+    """模拟钩子线程入队，再由界面线程取出分发。"""
+    for event in events: app.mouse_event_queue.put(event)
+    batch, _ = app.mouse_event_queue.drain(len(events) + 1)
+    for event in batch: wa.App._global_mouse_dispatcher(app, event)
+
+
+def click(button, t, down='down'):
+    return [ButtonEvent(down, button, t), ButtonEvent('up', button, t + 0.05)]
+
+
+@pytest.fixture
+def fired():
+    return []
+
+
+def test_single_click_fires_immediately_without_double_binding(wa, root, fired):
+    app = make_app(wa, root, {'middle_click': lambda: fired.append('single')})
+    deliver(wa, app, click('middle', 0.0) + click('middle', 0.2, down='double'))
+    assert fired == ['single', 'single']
+
+
+def test_double_click_does_not_also_fire_single_clicks(wa, root, fired):
+    app = make_app(wa, root, {'middle_click': lambda: fired.append('single'),
+                              'middle_double_click': lambda: fired.append('double')})
+    deliver(wa, app, click('middle', 0.0) + click('middle', 0.2, down='double'))
+    root.run_pending()
+    assert fired == ['double']
+    deliver(wa, app, click('middle', 5.0))
+    root.run_pending()
+    assert fired == ['double', 'single']
+
+
+def test_other_buttons_do_not_make_a_double_click(wa, root, fired):
+    app = make_app(wa, root, {'middle_double_click': lambda: fired.append('double')})
+    # mouse 库会把紧跟在左键之后的中键按下报告为 DOUBLE
+    deliver(wa, app, click('left', 0.0) + click('middle', 0.2, down='double'))
+    root.run_pending()
+    deliver(wa, app, click('middle', 2.0) + click('middle', 3.0))
+    root.run_pending()
+    assert fired == []
+
+
+def test_gesture_starts_even_when_press_is_reported_as_double(wa, root):
+    app = make_app(wa, root, {}, gesture_buttons=['right'])
+    handler = app.gesture_handlers['right']
+    deliver(wa, app, [ButtonEvent('up', 'left', 0.0), ButtonEvent('double', 'right', 0.1), MoveEvent(5, 5, 0.2)])
+    assert handler.is_recording
+
+
+def test_queue_filters_and_coalesces(wa, root, fired):
+    app = make_app(wa, root, {'wheel_up': lambda: fired.append('wheel')})
+    queue = app.mouse_event_queue
+    for i in range(100): queue.put(MoveEvent(i, i, i))
+    queue.put(WheelEvent(1, 0.0))
+    queue.put(WheelEvent(-1, 0.0))
+    assert queue.stats['filtered'] == 101
+    batch, _ = queue.drain()
+    assert batch == [WheelEvent(1, 0.0)]
+
+
+def test_queue_is_bounded(wa):
+    queue = wa.MouseEventQueue(max_events=10)
+    queue.configure({('button', 'x', 'up')}, ())
+    for i in range(25): queue.put(ButtonEvent('up', 'x', i))
+    batch, remaining = queue.drain()
+    assert [event.time for event in batch] == list(range(15, 25)) and remaining == 0
+    assert queue.stats['dropped'] == 15
+
+
+def test_dispatch_micro_benchmark(wa, root, fired):
+    triggers = {'wheel_up': lambda: None, 'x1_click': lambda: None, 'middle_click': lambda: None}
+    app = make_app(wa, root, triggers, gesture_buttons=['right'])
+    events = [MoveEvent(i, i, i) for i in range(1000)] + [WheelEvent(1, 0.0), ButtonEvent('up', 'x', 0.0)] * 500
+    start = time.perf_counter()
+    for _ in range(20):
+        for event in events: wa.App._global_mouse_dispatcher(app, event)
+    per_second = 20 * len(events) / (time.perf_counter() - start)
+    print(f"dispatch: {per_second / 1000:.0f}k events/s")
+    assert per_second > 50000
+
+
+def fast_swipe(start=(200, 400), step=(12, 1), count=80, interval=0.001):
+    """钩子以 1 ms 间隔报告的快速横扫：80 ms 内移动约 960 像素。"""
+    return [MoveEvent(start[0] + step[0] * i, start[1] + step[1] * i, i * interval) for i in range(1, count + 1)]
+
+
+def replay(wa, app, events, batch):
+    """钩子线程逐个入队，界面线程每次只取出 batch 个事件，模拟界面繁忙时事件成批到达。"""
+    queue = app.mouse_event_queue
+    for i, event in enumerate(events):
+        queue.put(event)
+        if i % batch == batch - 1:
+            for queued in queue.drain(batch)[0]: wa.App._global_mouse_dispatcher(app, queued)
+    while True:
+        drained, _ = queue.drain(batch)
+        if not drained: break
+        for queued in drained: wa.App._global_mouse_dispatcher(app, queued)
+
+
+@pytest.mark.parametrize('batch', [1, 7, 256])
+def test_gesture_path_replays_a_fast_swipe_faithfully(wa, root, batch):
+    strokes = []
+    app = make_app(wa, root, {})
+    app.gesture_recorder = wa.GestureHandler(app, 'right', on_stroke=strokes.append)
+    wa.App.compile_mouse_dispatch(app)
+    # 按下前的移动在队列中合并为最新位置，作为手势的起点
+    approach = [MoveEvent(x, 400, -1 + x / 1000) for x in range(0, 201, 5)]
+    swipe = fast_swipe()
+    events = approach + [ButtonEvent('down', 'right', 0.0)] + swipe + [ButtonEvent('up', 'right', 0.1)]
+    replay(wa, app, events, batch)
+    root.run_pending()
+    assert len(strokes) == 1
+    expected = [(200, 400)] + [(event.x, event.y) for event in swipe]
+    assert strokes[0] == [list(point) for point in expected]
+    if batch == 256: assert app.mouse_event_queue.stats['coalesced'] == len(approach) - 1
+    # 旧实现每 10 ms 读取一次光标位置，同一段横扫只能得到约十分之一的点
+    polled = [event for event in swipe if round(event.time * 1000) % 10 == 0]
+    print(f"batch {batch}: captured {len(strokes[0])} of {len(expected)} points, "
+          f"10 ms polling would get {len(polled) + 1}")
+
+
+def test_moves_outside_a_gesture_are_still_coalesced(wa, root):
+    strokes = []
+    app = make_app(wa, root, {})
+    app.gesture_recorder = wa.GestureHandler(app, 'right', on_stroke=strokes.append)
+    wa.App.compile_mouse_dispatch(app)
+    queue = app.mouse_event_queue
+    for event in fast_swipe(): queue.put(event)
+    assert len(queue.events) == 1
+    queue.put(ButtonEvent('down', 'right', 0.1))
+    for event in fast_swipe(start=(1160, 480), step=(-12, 0)): queue.put(event)
+    assert len(queue.events) == 2 + 80
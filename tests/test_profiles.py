@@ -0,0 +1,126 @@
+"""自动附加配置的匹配。"""
+import random
+import re
+import time
+
+import pytest
+
+
+def window(wa, title, exe='notepad.exe', cls='Notepad'):
+    return wa.WindowInfo(1, title, cls, 1000, exe, True)
+
+
+def test_first_matching_profile_wins(wa):
+    matcher = wa.ProfileMatcher([
+        {'name': 'disabled', 'exe': 'notepad.exe', 'enabled': False},
+        {'name': 'report', 'exe': 'NOTEPAD.EXE', 'title_regex': r'report'},
+        {'name': 'notepad', 'exe': 'notepad.exe'},
+        {'name': 'any-doc', 'title_regex': r'\.txt$'},
+    ])
+    assert matcher.match(window(wa, 'Weekly Report.txt'))['name'] == 'report'
+    assert matcher.match(window(wa, 'todo.txt'))['name'] == 'notepad'
+    assert matcher.match(window(wa, 'todo.txt', exe='code.exe', cls='Chrome_WidgetWin_1'))['name'] == 'any-doc'
+    assert matcher.match(window(wa, 'readme.md', exe='code.exe')) is None
+    assert [profile['name'] for profile in matcher.profiles] == ['report', 'notepad', 'any-doc']
+
+
+def test_user_regex_features_are_kept_per_profile(wa):
+    matcher = wa.ProfileMatcher([
+        {'name': 'a', 'exe': 'a.exe', 'title_regex': r'(?P<v>\d+) left'},
+        {'name': 'b', 'exe': 'b.exe', 'title_regex': r'(?P<v>\d+) right'},
+        {'name': 'backref', 'exe': 'c.exe', 'title_regex': r'(ab)\1'},
+        {'name': 'flags', 'exe': 'd.exe', 'title_regex': r'(?i)doc'},
+    ])
+    assert matcher.match(window(wa, '3 right', exe='b.exe'))['name'] == 'b'
+    assert matcher.match(window(wa, 'x abab y', exe='c.exe'))['name'] == 'backref'
+    assert matcher.match(window(wa, 'DOC', exe='d.exe'))['name'] == 'flags'
+
+
+def test_invalid_regex_is_reported_and_skipped(wa):
+    matcher = wa.ProfileMatcher()
+    errors = matcher.compile([{'name': 'bad', 'title_regex': '('}, {'name': 'good', 'title_regex': 'x'}])
+    assert [name for name, _ in errors] == ['bad']
+    assert matcher.match(window(wa, 'x'))['name'] == 'good'
+
+
+def linear_match(profiles, info):
+    """逐个检查每个配置的参考实现。"""
+    for profile in profiles:
+        exe, cls, title = (profile.get(key, '').strip() for key in ('exe', 'class', 'title_regex'))
+        if not profile.get('enabled', True) or not (exe or cls or title): continue
+        if exe and exe.lower() != info.exe.lower() or cls and cls.lower() != info.cls.lower(): continue
+        if not title or re.search(title, info.title, re.IGNORECASE): return profile
+    return None
+
+
+def test_indexed_title_rules_agree_with_a_linear_scan(wa):
+    rng = random.Random(3)
+    patterns = ['report', r'^todo', r'\.txt$', r'q[1-4]', r'(draft|final)', r'(?i)memo', r'(ab)\1', r'x{2,}', r'\bplan\b',
+                r'(?s)a.b', r'^$', 'word|excel', r'plan \d+', r'abc?d', r'ticket-|memo', r'(?x) q 3']
+    profiles = [{'name': f'p{i}', 'exe': rng.choice(['', '', 'notepad.exe', 'winword.exe']),
+                 'class': rng.choice(['', '', 'Notepad']), 'title_regex': rng.choice(patterns + [''])}
+                for i in range(60)]
+    matcher = wa.ProfileMatcher(profiles)
+    titles = ['Weekly report.txt', 'todo list', 'Q3 plan', 'final DRAFT', 'memo', 'abab', 'xxx', 'a\nb', '',
+              'Word document', 'nothing here', 'PLAN 12', 'abd', 'ABCD', 'Ticket-9']
+    for title in titles:
+        for exe, cls in [('notepad.exe', 'Notepad'), ('winword.exe', 'OpusApp'), ('code.exe', 'Notepad')]:
+            info = window(wa, title, exe=exe, cls=cls)
+            assert matcher.match(info) is linear_match(profiles, info), (title, exe, cls)
+
+
+@pytest.mark.parametrize('pattern, keywords, exact', [
+    (r'Visual Studio Code|VSCodium', ['visual studio code', 'vscodium'], True),
+    (r'C:\\Users\.txt', ['c:\\users.txt'], True),
+    (r'^project \d+\b|ticket-\d', ['project ', 'ticket-'], False),
+    (r'abc?d', ['ab'], False),
+    (r'a{2}bcd', ['bcd'], False),
+    (r'\u00e9cole', ['cole'], False),
+    (r'(report|memo) draft', [' draft'], False),
+    (r'[(]xyz', ['xyz'], False),
+    (r'report|', None, False),
+    (r'x{2,}', None, False),
+    (r'(ab)\1', None, False),
+])
+def test_title_keywords(wa, pattern, keywords, exact):
+    assert wa.title_keywords(pattern) == (keywords, exact)
+
+
+def test_keyword_automaton_finds_overlapping_keywords(wa):
+    automaton = wa.KeywordAutomaton([('he', 3), ('she', 1), ('his', 2), ('hers', 0)])
+    assert automaton.search('ushers') == {0, 1, 3}
+    assert automaton.search('ahishe') == {1, 2, 3}
+    assert automaton.search('xyz') == set()
+
+
+BENCH_PROFILES = {
+    'exe': lambda i: {'exe': f'app{i}.exe', 'title_regex': f'doc{i}'},
+    'text': lambda i: {'title_regex': f'Project {i} - |ticket-{i}:'},
+    'regex': lambda i: {'title_regex': rf'^project {i}\b|ticket-{i}\d'},
+    'unindexable': lambda i: {'title_regex': rf'\d{{{i + 3}}}'},  # 提取不到关键词，只能逐个检查
+}
+
+
+@pytest.mark.parametrize('kind', BENCH_PROFILES)
+def test_match_cost_with_many_profiles(wa, kind):
+    # 只按标题匹配的配置无法用可执行文件或窗口类缩小范围，全部落在同一个索引项中
+    profiles = [dict(BENCH_PROFILES[kind](i), name=f'p{i}') for i in range(500)]
+    profiles.append({'name': 'last', 'exe': 'notepad.exe'})
+    matcher = wa.ProfileMatcher(profiles)
+    info = window(wa, 'Untitled document with a fairly long title - notes.txt')
+    # 逐个检查预编译正则的旧做法
+    compiled = [(profile, profile.get('exe', '').lower(), re.compile(profile.get('title_regex', ''), re.IGNORECASE))
+                for profile in profiles]
+
+    def linear(info):
+        for profile, exe, title_regex in compiled:
+            if (not exe or exe == info.exe) and title_regex.search(info.title): return profile
+
+    def per_match_us(match):
+        start = time.perf_counter()
+        for _ in range(200): assert match(info)['name'] == 'last'
+        return (time.perf_counter() - start) * 5000
+
+    combined, scanned = per_match_us(matcher.match), per_match_us(linear)
+    print(f"profile match with 500 {kind} profiles: {combined:.1f} us, linear scan {scanned:.1f} us")
+    assert combined < {'exe': scanned / 5, 'unindexable': scanned * 1.5}.get(kind, scanned / 10)
@@ -0,0 +1,53 @@
+"""配置文件的迁移、原子写入与限速，以及设置快照不改写界面。"""
+import json
+import time
+import tkinter as tk
+
+
+class SpinVar:
+    """Tk 数值变量替身：value 为 None 时模拟输入框为空。"""
+
+    def __init__(self, value):
+        self.value = value
+        self.writes = []
+
+    def get(self):
+        if self.value is None: raise tk.TclError('expected integer but got ""')
+        return self.value
+
+    def set(self, value):
+        self.writes.append(value)
+        self.value = value
+
+
+def test_peek_spin_value_does_not_write_back(wa):
+    empty = SpinVar(None)
+    assert wa.App.peek_spin_value(empty) is None
+    assert empty.writes == []
+    assert wa.App.peek_spin_value(SpinVar(-5)) == 0
+
+
+def test_legacy_config_is_migrated(wa, tmp_path):
+    path = tmp_path / 'config.json'
+    path.write_text(json.dumps({'last_window_title': 'notes.txt - Notepad',
+                                'triggers': {'exit_app': {'keyboard': 'X+Alt+Ctrl'}}}), encoding='utf-8')
+    settings = wa.ConfigStore(str(path)).load()
+    assert settings['version'] == wa.CONFIG_VERSION
+    assert settings['monitored_windows'] == [{'title': 'notes.txt - Notepad'}]
+    assert settings['triggers']['exit_app']['keyboard'] == 'ctrl+alt+x'
+
+
+def test_saves_are_coalesced_and_written_atomically(wa, tmp_path):
+    path = tmp_path / 'config.json'
+    store = wa.ConfigStore(str(path), min_interval_ms=200)
+    store.start()
+    try:
+        for i in range(100):
+            store.save({'value': i})
+            time.sleep(0.005)
+    finally:
+        store.close()
+    assert json.loads(path.read_text(encoding='utf-8'))['value'] == 99
+    assert store.stats['requests'] == 100
+    assert store.stats['writes'] <= 5
+    assert not (tmp_path / 'config.json.tmp').exists()
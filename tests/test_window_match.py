@@ -0,0 +1,95 @@
+"""启动时按指纹找回上次监控的窗口：在不同规模的合成窗口集合上检验。"""
+import random
+import time
+import types
+
+import pytest
+
+APPS = [('chrome.exe', 'Chrome_WidgetWin_1', 'Google Chrome'), ('winword.exe', 'OpusApp', 'Word'),
+        ('code.exe', 'Chrome_WidgetWin_1', 'Visual Studio Code'), ('notepad.exe', 'Notepad', 'Notepad')]
+LETTERS = 'abcdefghijklmnopqrstuvwxyz'
+
+
+def synthetic_desktop(wa, size, seed):
+    """生成 size 个窗口的索引，与 App 中的窗口索引和列表行号一致；找回窗口不依赖搜索索引。
+    每个窗口的文档名随机生成；只差一两个字符的标题（如 "Report Q1" 与 "Report Q2"）本身就无法区分，不在考察范围内。"""
+    rng = random.Random(seed)
+    window_index = wa.WindowIndex()
+    titles = set()
+    for hwnd in range(1, size + 1):
+        exe, cls, app_name = rng.choice(APPS)
+        while True:
+            title = f"{''.join(rng.choices(LETTERS, k=rng.randrange(5, 12)))}.txt - {app_name}"
+            if title not in titles: break
+        titles.add(title)
+        x, y = rng.randrange(0, 1600), rng.randrange(0, 900)
+        info = wa.WindowInfo(hwnd, title, cls, 1000 + hwnd, exe, True, (x, y, x + 800, y + 600))
+        window_index.put(info)
+    app = types.SimpleNamespace(window_index=window_index, restored_window_settings={},
+                                list_rows={hwnd: hwnd - 1 for hwnd in window_index.by_hwnd})
+    app.row_of = lambda hwnd: app.list_rows.get(hwnd)
+    return app
+
+
+def fingerprint(info, **changes):
+    saved = {'title': info.title, 'exe': info.exe, 'class': info.cls, 'rect': list(info.rect)}
+    saved.update(changes)
+    return saved
+
+
+@pytest.mark.parametrize('size', [10, 100, 1000])
+def test_restores_the_same_window(wa, size):
+    app = synthetic_desktop(wa, size, seed=size)
+    for hwnd in random.Random(size).sample(sorted(app.window_index.by_hwnd), min(size, 20)):
+        info = app.window_index.get(hwnd)
+        assert wa.App.find_saved_window(app, fingerprint(info)) == hwnd
+        # 标题加上修改标记、窗口移动后仍能找回
+        moved = [value + 40 for value in info.rect]
+        assert wa.App.find_saved_window(app, fingerprint(info, title='● ' + info.title, rect=moved)) == hwnd
+
+
+@pytest.mark.parametrize('size', [10, 100, 1000])
+def test_other_documents_of_the_same_exe_are_not_taken(wa, size):
+    app = synthetic_desktop(wa, size, seed=size)
+    checked = wrong = 0
+    for hwnd in sorted(app.window_index.by_hwnd)[:50]:
+        info = app.window_index.get(hwnd)
+        saved = fingerprint(info)
+        app.window_index.remove(hwnd)
+        del app.list_rows[hwnd]
+        # 原窗口已关闭：同一程序的其他窗口（即使位置相同）也不应被当作它
+        checked += 1
+        wrong += wa.App.find_saved_window(app, saved) is not None
+    print(f"{size} windows: {wrong}/{checked} closed windows matched another window")
+    # 上千个同类窗口中偶尔会有随机名称足够相似的窗口
+    assert wrong <= checked // 50
+
+
+def test_same_position_and_class_alone_is_not_enough(wa):
+    saved = {'title': 'GitHub - Google Chrome', 'exe': 'chrome.exe', 'class': 'Chrome_WidgetWin_1',
+             'rect': [0, 0, 800, 600]}
+    other = wa.WindowInfo(1, 'YouTube - Google Chrome', 'Chrome_WidgetWin_1', 1, 'chrome.exe', True, (0, 0, 800, 600))
+    assert wa.score_window_match(saved, other) <= wa.WINDOW_MATCH_MIN_SCORE
+    legacy = {'title': 'GitHub - Google Chrome'}  # 旧配置只保存了标题
+    same = wa.WindowInfo(2, 'GitHub - Google Chrome', 'Chrome_WidgetWin_1', 1, 'chrome.exe', True)
+    assert wa.score_window_match(legacy, same) > wa.WINDOW_MATCH_MIN_SCORE
+
+
+def test_lookup_time_with_many_windows(wa):
+    app = synthetic_desktop(wa, 1000, seed=7)
+    saved = fingerprint(app.window_index.get(500))
+    start = time.perf_counter()
+    for _ in range(20): wa.App.find_saved_window(app, saved)
+    per_lookup_ms = (time.perf_counter() - start) * 50
+    print(f"find_saved_window over 1000 windows: {per_lookup_ms:.2f} ms")
+    assert per_lookup_ms < 100
+
+
+def test_exe_index_follows_updates(wa):
+    index = wa.WindowIndex()
+    index.put(wa.WindowInfo(1, 'Inbox', 'Window', 10, 'Outlook.EXE', True))
+    assert index.find_by_exe('outlook.exe') == {1}
+    index.put(wa.WindowInfo(1, 'Inbox', 'Window', 11, 'olk.exe', True))  # 同一句柄被另一个进程复用
+    assert index.find_by_exe('outlook.exe') == set() and index.find_by_exe('OLK.exe') == {1}
+    index.remove(1)
+    assert index.by_exe == {}
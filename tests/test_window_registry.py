@@ -0,0 +1,55 @@
+"""后台窗口注册表的变化发布与进程信息缓存。"""
+import pytest
+
+
+@pytest.fixture
+def registry(wa):
+    return wa.WindowRegistry(wa.ProcessInfoCache())
+
+
+def published(registry):
+    events = []
+    while not registry.events.empty(): events += registry.events.get_nowait()
+    return [(kind, info.hwnd, info.title, info.exe) for kind, info in events]
+
+
+def test_changes_are_published_in_batches(registry, desktop):
+    desktop.add_window(1, 'Untitled - Notepad', pid=10, exe='notepad.exe')
+    desktop.add_window(2, 'Inbox', pid=20, exe='outlook.exe')
+    registry.scan()
+    assert published(registry) == [('created', 1, 'Untitled - Notepad', 'notepad.exe'),
+                                   ('created', 2, 'Inbox', 'outlook.exe')]
+    desktop.windows[1]['title'] = 'notes.txt - Notepad'
+    desktop.windows[2]['visible'] = False
+    registry.scan()
+    assert published(registry) == [('retitled', 1, 'notes.txt - Notepad', 'notepad.exe'),
+                                   ('hidden', 2, 'Inbox', 'outlook.exe')]
+    registry.scan()
+    assert registry.events.empty()
+
+
+def test_process_is_queried_once_per_process(registry, desktop):
+    for hwnd in range(1, 51): desktop.add_window(hwnd, f'Tab {hwnd}', pid=10, exe='chrome.exe')
+    registry.scan()
+    assert registry.process_cache.stats['misses'] == 1
+    assert registry.process_cache.stats['hits'] == 49
+
+
+def test_reused_pid_within_one_scan_gets_the_new_exe(registry, desktop):
+    desktop.add_window(1, 'Untitled - Notepad', pid=10, exe='notepad.exe')
+    registry.scan()
+    # 记事本退出，进程号 10 随即被另一个程序复用，两者发生在同一个扫描间隔内
+    del desktop.windows[1]
+    desktop.start_process(10, 'calc.exe', start_time=99)
+    desktop.add_window(2, 'Calculator', pid=10)
+    registry.scan()
+    assert published(registry)[-1] == ('created', 2, 'Calculator', 'calc.exe')
+
+
+def test_processes_without_windows_are_evicted(registry, desktop):
+    desktop.add_window(1, 'A', pid=10, exe='a.exe')
+    desktop.add_window(2, 'B', pid=20, exe='b.exe')
+    registry.scan()
+    del desktop.windows[1]
+    registry.scan()
+    assert set(registry.process_cache.entries) == {20}
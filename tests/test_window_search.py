@@ -0,0 +1,181 @@
+"""窗口列表搜索：索引结果与逐个扫描一致，并对比两者在不同窗口数量下的耗时。"""
+import random
+import time
+
+import pytest
+
+from conftest import windows_alter
+
+WORDS = ['inbox', 'report', 'budget', 'github', 'youtube', 'notes', 'design', 'review', 'settings', 'terminal',
+         'explorer', 'calendar', 'meeting', 'draft', 'invoice', 'photos', 'music', 'project', 'readme', 'issue']
+EXES = ['chrome.exe', 'winword.exe', 'code.exe', 'explorer.exe', 'notepad.exe', 'outlook.exe', 'slack.exe']
+QUERIES = ['re', 'report', 'git', 'ntes', 'budget 2', 'zzz', 'code']
+
+
+def build(wa, size):
+    rng = random.Random(size)
+    index, titles = wa.WindowSearchIndex(), {}
+    for hwnd in range(1, size + 1):
+        title = ' '.join(rng.choice(WORDS) for _ in range(rng.randrange(2, 5))) + f" {rng.randrange(100)}"
+        exe = rng.choice(EXES)
+        index.put(hwnd, title, exe)
+        titles[hwnd] = (title.lower(), exe)
+    return index, titles
+
+
+def scan(titles, query, mode):
+    """不使用索引的逐个比较，作为正确性与耗时的基准。"""
+    query = query.lower()
+    if mode == 'process': return {hwnd for hwnd, (_, exe) in titles.items() if query in exe}
+    if mode == 'fuzzy':
+        return {hwnd for hwnd, (title, _) in titles.items()
+                if windows_alter.is_subsequence(query.replace(' ', ''), title)}
+    return {hwnd for hwnd, (title, _) in titles.items() if query in title}
+
+
+@pytest.mark.parametrize('mode', ['substring', 'fuzzy', 'process'])
+def test_index_agrees_with_a_full_scan(wa, mode):
+    index, titles = build(wa, 500)
+    for query in QUERIES:
+        assert index.search(query, mode) == scan(titles, query, mode), query
+        assert all(index.matches(hwnd, query, mode) == (hwnd in scan(titles, query, mode)) for hwnd in (1, 2, 3))
+
+
+def test_incremental_updates(wa):
+    index, _ = build(wa, 50)
+    index.put(7, 'Quarterly Report - Word', 'winword.exe')
+    assert 7 in index.search('quarterly')
+    index.put(7, 'Untitled - Notepad', 'notepad.exe')
+    assert 7 not in index.search('quarterly') and 7 in index.search('notepad', 'process')
+    index.remove(7)
+    assert 7 not in index.search('untitled')
+
+
+@pytest.mark.parametrize('size', [100, 1000, 5000])
+def test_filter_benchmark(wa, size):
+    index, titles = build(wa, size)
+
+    def per_query_us(func):
+        start = time.perf_counter()
+        for query in QUERIES: func(query)
+        return (time.perf_counter() - start) / len(QUERIES) * 1e6
+
+    indexed = per_query_us(lambda query: index.search(query))
+    scanned = per_query_us(lambda query: scan(titles, query, 'substring'))
+    print(f"{size} windows: indexed {indexed:.0f} us, full scan {scanned:.0f} us per substring query")
+    assert indexed < 50000
+
+
+class FakeListbox:
+    """Listbox 替身：保存行文本、选中行与顶部行，并统计修改列表的调用次数。"""
+
+    def __init__(self):
+        self.rows = []
+        self.selected = set()
+        self.top = 0
+        self.calls = 0
+
+    def insert(self, index, *items):
+        self.calls += 1
+        self.rows[index:index] = items
+        self.selected = {row + len(items) if row >= index else row for row in self.selected}
+
+    def delete(self, first, last=None):
+        self.calls += 1
+        last = len(self.rows) - 1 if last == 'end' else first if last is None else last
+        del self.rows[first:last + 1]
+        self.selected = {row - (last - first + 1) if row > last else row for row in self.selected
+                         if not first <= row <= last}
+
+    def curselection(self):
+        return tuple(sorted(self.selected))
+
+    def selection_set(self, first, last=None):
+        self.selected.update(range(first, (first if last is None else last) + 1))
+
+    def nearest(self, y):
+        return self.top if self.rows else -1
+
+    def yview(self, index):
+        self.top = index
+
+    def cget(self, option):
+        return 'normal'
+
+    def config(self, **options):
+        pass
+
+
+class Var:
+    def __init__(self, value=''):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+
+def filter_app(wa, size):
+    """只带列表与索引状态的 App，apply_window_filter 及其辅助方法按原样运行。"""
+    rng = random.Random(size)
+    app = wa.App.__new__(wa.App)
+    app.window_index, app.search_index, app.window_list = wa.WindowIndex(), wa.WindowSearchIndex(), FakeListbox()
+    app.search_var, app.search_ui = Var(), {'mode_var': Var('substring')}
+    app.list_hwnds, app.list_titles, app.list_rows, app.list_orders = [], {}, None, []
+    for hwnd in range(1, size + 1):
+        title = ' '.join(rng.choice(WORDS) for _ in range(rng.randrange(2, 5))) + f" {rng.randrange(100)}"
+        info = wa.WindowInfo(hwnd, title, 'Window', 1000 + hwnd, rng.choice(EXES), True)
+        app.window_index.put(info)
+        app.search_index.put(hwnd, title, info.exe)
+    app.apply_window_filter()
+    return app
+
+
+def expected_rows(wa, app, query):
+    infos = [app.window_index.get(hwnd) for hwnd in sorted(app.window_index.order, key=app.window_index.order.get)]
+    return [wa.App.row_text(info) for info in infos if query.lower() in info.title.lower()]
+
+
+KEYSTROKES = ['r', 're', 'rep', 'repo', 'report', 'report 1', 'report', 're', '', 'g', 'gi', 'git', '']
+
+
+def test_filtered_list_keeps_window_order(wa):
+    app = filter_app(wa, 500)
+    for query in KEYSTROKES:
+        app.search_var.value = query
+        app.apply_window_filter()
+        assert app.window_list.rows == expected_rows(wa, app, query), query
+        assert [app.list_titles[hwnd] for hwnd in app.list_hwnds] == app.window_list.rows
+        assert app.list_orders == sorted(app.list_orders)
+        assert all(app.row_of(hwnd) == index for index, hwnd in enumerate(app.list_hwnds))
+
+
+def test_rebuild_keeps_selection_and_scroll_position(wa):
+    app = filter_app(wa, 2000)
+    assert app.window_list.calls == 1  # 首次填充只需一次插入
+    report = [hwnd for hwnd in app.list_hwnds if 'report' in app.list_titles[hwnd]]
+    app.window_list.selection_set(app.row_of(report[3]))
+    app.window_list.selection_set(app.row_of(report[7]))
+    app.window_list.top = app.row_of(report[5]) - 1
+    app.search_var.value = 'report'
+    app.apply_window_filter()
+    assert [app.list_hwnds[row] for row in app.window_list.curselection()] == [report[3], report[7]]
+    assert app.list_hwnds[app.window_list.top] == report[5]
+
+
+@pytest.mark.parametrize('size', [1000, 5000])
+def test_keystroke_benchmark(wa, size):
+    app = filter_app(wa, size)
+    timings, calls, changed = [], 0, 0
+    for query in KEYSTROKES:
+        before = set(app.list_hwnds)
+        app.window_list.calls = 0
+        app.search_var.value = query
+        start = time.perf_counter()
+        app.apply_window_filter()
+        timings.append((time.perf_counter() - start) * 1000)
+        calls += app.window_list.calls
+        changed += len(before.symmetric_difference(app.list_hwnds))
+    print(f"{size} windows: worst keystroke {max(timings):.1f} ms, mean {sum(timings) / len(timings):.1f} ms; "
+          f"{calls} listbox calls for {changed} changed rows")
+    assert calls <= len(KEYSTROKES) * (wa.WINDOW_LIST_MAX_SEGMENTS + 1)
+    assert max(timings) < 100
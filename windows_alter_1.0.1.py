@@ -5,21 +5,203 @@ from tkinter import filedialog
 import win32gui
 import win32con
 import win32process
+import win32api
 import threading
 import mouse
 import keyboard
 import os
+import io
+import base64
 import time
 import json
-from pystray import MenuItem, Icon
-from PIL import Image, ImageDraw
+import math
+import re
+import numpy as np
+from pystray import Menu, MenuItem, Icon
+from PIL import Image, ImageDraw, ImageFont
 import queue
+import bisect
+from array import array
+import difflib
+from collections import deque
 
 # 常量定义
 CONFIG_FILE = "config.json"
+CONFIG_VERSION = 1  # 配置文件格式的版本号，变更格式时递增并在 CONFIG_MIGRATIONS 中添加迁移
+CONFIG_SAVE_DELAY_MS = 2000  # 设置变化后延迟多久保存，期间的其他变化合并到同一次保存
+CONFIG_MIN_WRITE_INTERVAL_MS = 10000  # 两次写入配置文件之间的最短间隔，即每分钟最多写入 6 次
 GESTURE_MIN_POINTS = 5
+GESTURE_PATH_CAPACITY = 256  # 手势路径缓冲区预分配的点数
+GESTURE_MIN_DISTANCE = 4  # 与上一个记录点相距不足该像素数的移动不记录
+GESTURE_RESAMPLE_POINTS = 32  # 识别前将笔画重采样到的点数
+GESTURE_MIN_SCORE = 0.95  # 识别结果的最低相似度（余弦相似度，最大为 1）；直线偏离约 33° 以上即不再接受
+GESTURE_MAX_ROTATION_DEG = 15  # 有方向的手势与模板之间允许的最大旋转角
+MONITOR_MIN_INTERVAL_MS = 15  # 光标在目标窗口附近移动时的检测间隔
+MONITOR_MAX_INTERVAL_MS = 1000  # 光标长时间静止时退避到的最长检测间隔
+MONITOR_NEAR_MARGIN = 150  # 光标距窗口矩形多少像素以内视为"靠近"
+MONITOR_FALLBACK_INTERVAL_MS = 500  # 刷新窗口矩形（捕获窗口移动与关闭）的间隔
+FADE_FRAME_INTERVAL_MS = 16  # 渐变动画的帧间隔
+WINDOW_LIST_MAX_SEGMENTS = 32  # 过滤后列表的变化分散成超过该数量的区段时，整表重建而不是逐段增删
+WINDOW_REGISTRY_INTERVAL_MS = 1000  # 后台窗口注册表的扫描间隔
+WINDOW_MATCH_MIN_SCORE = 4  # 启动时找回上次窗口所需的得分（需超过该值），仅凭可执行文件、窗口类与位置无法达到
+WINDOW_TITLE_MIN_SIMILARITY = 0.8  # 标题不同时，去掉共同的程序名部分后至少要有的相似度
+MOUSE_QUEUE_MAX_EVENTS = 1024  # 鼠标事件队列的上限，界面线程卡住时丢弃最旧的事件
+MOUSE_DRAIN_BATCH = 256  # 界面线程每次最多处理的鼠标事件数
+HOTKEY_SEQUENCE_TIMEOUT_MS = 1500  # 多步快捷键相邻两步之间的最长间隔
+HOTKEY_MODIFIERS = ('ctrl', 'alt', 'shift', 'windows')  # 规范化后的快捷键中修饰键的顺序
+MOUSE_DOUBLE_CLICK_MS = 500  # 无法读取系统设置时使用的双击间隔
+ICON_SIZES = (64, 48, 32, 16)  # 图标缓存中预先生成的尺寸，从大到小
+ICON_CACHE_MAX_ENTRIES = 8  # 图标缓存最多保留的图片数，超出时丢弃最久未使用的
+TRAY_BADGE_MAX_COUNT = 9  # 托盘角标显示的最大窗口数，更多时显示 "9+"
+TRAY_UPDATE_MIN_INTERVAL_MS = 500  # 两次更新托盘图标之间的最短间隔，避免频繁通知系统外壳
+TRAY_OPACITY_PRESETS = (20, 40, 60, 80)  # 托盘菜单中可选的移开时透明度
+
+# 渐变动画的缓动函数，输入与输出均为 0~1 的进度
+EASING_FUNCTIONS = {
+    'linear': lambda t: t,
+    'ease_in': lambda t: t * t,
+    'ease_out': lambda t: 1 - (1 - t) * (1 - t),
+    'ease_in_out': lambda t: 2 * t * t if t < 0.5 else 1 - 2 * (1 - t) * (1 - t),
+}
 MY_PID = os.getpid()
 
+# 鼠标按键触发器 -> 分发表中的键 (事件类型, 按键, 方向)
+# 类型为 'click' 的触发器由 ClickTracker 根据按键抬起的时间区分单击与双击
+MOUSE_BUTTON_TRIGGERS = {
+    'middle_click': ('click', mouse.MIDDLE, 'single'),
+    'wheel_up': ('wheel', None, 'up'),
+    'wheel_down': ('wheel', None, 'down'),
+    'x1_click': ('button', mouse.X, mouse.UP),
+    'x2_click': ('button', mouse.X2, mouse.UP),
+    'middle_double_click': ('click', mouse.MIDDLE, 'double'),
+}
+MOUSE_MOVE_KEY = ('move', None, None)
+
+
+def normalize_key_name(name):
+    """统一按键名：不区分大小写与左右修饰键。"""
+    name = (name or '').lower()
+    for prefix in ('left ', 'right '):
+        if name.startswith(prefix): return name[len(prefix):]
+    return name
+
+
+def parse_hotkey(hotkey):
+    """把 'ctrl+alt+w, t' 形式的快捷键解析为步骤元组，每一步是一组同时按下的按键。"""
+    steps = []
+    for part in (hotkey or '').split(','):
+        keys = frozenset(normalize_key_name(key.strip()) for key in part.split('+') if key.strip())
+        if keys: steps.append(keys)
+    return tuple(steps)
+
+
+def format_hotkey(steps):
+    """parse_hotkey 的逆操作，修饰键按固定顺序排在前面。"""
+    order = lambda key: (HOTKEY_MODIFIERS.index(key) if key in HOTKEY_MODIFIERS else len(HOTKEY_MODIFIERS), key)
+    return ', '.join('+'.join(sorted(step, key=order)) for step in steps)
+
+
+def render_tray_badge(base, count, hovering):
+    """在托盘图标上绘制监控窗口数角标与悬停指示点，count 为 0 时返回原图标。"""
+    if not count: return base
+    image = base.convert('RGBA')
+    dc = ImageDraw.Draw(image)
+    width, height = image.size
+    # 右上角的指示点：悬停为绿色，移开为灰色
+    dot = width // 4
+    dc.ellipse((width - dot - 2, 2, width - 2, dot + 2), fill='#34a853' if hovering else '#9aa0a6',
+               outline='white', width=2)
+    # 右下角的数量角标
+    text = f"{TRAY_BADGE_MAX_COUNT}+" if count > TRAY_BADGE_MAX_COUNT else str(count)
+    font = ImageFont.load_default(size=height * 3 // 8)
+    left, top, right, bottom = dc.textbbox((0, 0), text, font=font)
+    badge_width = max(right - left, bottom - top) + 8
+    box = (width - badge_width, height - (bottom - top) - 8, width - 1, height - 1)
+    dc.rounded_rectangle(box, radius=(box[3] - box[1]) // 2, fill='#d93025')
+    dc.text(((box[0] + box[2] - (right - left)) / 2 - left, (box[1] + box[3] - (bottom - top)) / 2 - top), text,
+            fill='white', font=font)
+    return image
+
+
+def mouse_event_key(event):
+    """返回鼠标事件在分发表中的键。"""
+    if isinstance(event, mouse.MoveEvent): return MOUSE_MOVE_KEY
+    if isinstance(event, mouse.WheelEvent): return 'wheel', None, 'up' if event.delta > 0 else 'down'
+    # mouse 库只要与上一次任意按键的事件足够近，就把按下报告为 DOUBLE，并不区分按键，因此一律视为按下
+    return 'button', event.button, mouse.DOWN if event.event_type == mouse.DOUBLE else event.event_type
+
+
+class ProcessInfo:
+    """进程的基本信息，启动时间用于识别被复用的进程号。"""
+    __slots__ = ('pid', 'exe', 'path', 'start_time')
+
+    def __init__(self, pid, exe, path, start_time):
+        self.pid = pid
+        self.exe = exe
+        self.path = path
+        self.start_time = start_time
+
+
+def query_process_info(pid, with_path=True):
+    """向系统查询进程信息，无权读取路径时路径为空；进程已退出时返回None。"""
+    try:
+        handle = win32api.OpenProcess(win32con.PROCESS_QUERY_INFORMATION | win32con.PROCESS_VM_READ, False, pid)
+    except Exception:
+        return None
+    try:
+        try:
+            start_time = win32process.GetProcessTimes(handle)['CreationTime']
+        except Exception:
+            start_time = None
+        path = ''
+        if with_path:
+            try:
+                path = win32process.GetModuleFileNameEx(handle, 0)
+            except Exception:
+                pass
+        return ProcessInfo(pid, os.path.basename(path), path, start_time)
+    finally:
+        win32api.CloseHandle(handle)
+
+
+class ProcessInfoCache:
+    """进程号到进程信息的线程安全缓存，由窗口注册表、鼠标选取与强制关闭共用。
+    进程的所有窗口消失后由注册表清除其记录；需要确认进程号未被复用时可校验启动时间。"""
+
+    def __init__(self):
+        self.entries = {}  # pid -> ProcessInfo
+        self.lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+    def get(self, pid, verify=False):
+        """返回进程信息；verify为True时先校验启动时间，进程号已被复用则重新查询。"""
+        with self.lock:
+            info = self.entries.get(pid)
+        if info is not None and verify:
+            current = query_process_info(pid, with_path=False)
+            if current is None or current.start_time != info.start_time:
+                self.evict(pid)
+                info = None
+        if info is not None:
+            self.stats['hits'] += 1
+            return info
+        self.stats['misses'] += 1
+        info = query_process_info(pid) or ProcessInfo(pid, '', '', None)
+        with self.lock:
+            self.entries[pid] = info
+        return info
+
+    def evict(self, pid):
+        with self.lock:
+            if self.entries.pop(pid, None) is not None: self.stats['evictions'] += 1
+
+    def retain(self, live_pids):
+        """清除不再拥有任何窗口的进程记录。"""
+        with self.lock:
+            for pid in self.entries.keys() - live_pids:
+                del self.entries[pid]
+                self.stats['evictions'] += 1
+
 
 def is_self_window(hwnd):
     """检查给定的窗口句柄是否属于当前Python进程。"""
@@ -31,91 +213,713 @@ def is_self_window(hwnd):
         return False
 
 
+class GesturePath:
+    """定长的手势路径缓冲区，坐标按 x0, y0, x1, y1… 交错存放在预分配的整型数组中。
+    按距离在线降采样；缓冲区写满时隔点抽稀并加倍采样距离，起点与终点始终保留，
+    因此无论手势持续多久，占用的内存都不变。末尾多留一个点的空间，用来放置暂未记录的终点。"""
+
+    def __init__(self, capacity=GESTURE_PATH_CAPACITY, min_distance=GESTURE_MIN_DISTANCE):
+        self.capacity = capacity
+        self.base_distance = min_distance
+        self.xy = array('i', bytes(4 * 2 * (capacity + 1)))
+        self.clear()
+
+    def clear(self):
+        self.count = 0
+        self.min_distance_sq = self.base_distance * self.base_distance
+        self.pending = None  # 因距离过近暂未记录的最新位置，结束时补作终点
+
+    def __len__(self):
+        return self.count + (self.pending is not None)
+
+    def __getitem__(self, index):
+        length = len(self)
+        if index < 0: index += length
+        if not 0 <= index < length: raise IndexError(index)
+        if index == self.count: return self.pending
+        return self.xy[2 * index], self.xy[2 * index + 1]
+
+    def __iter__(self):
+        for i in range(len(self)): yield self[i]
+
+    def append(self, x, y):
+        if self.count:
+            dx, dy = x - self.xy[2 * self.count - 2], y - self.xy[2 * self.count - 1]
+            if dx * dx + dy * dy < self.min_distance_sq:
+                self.pending = (x, y)
+                return
+        if self.count == self.capacity: self._compact()
+        self.xy[2 * self.count], self.xy[2 * self.count + 1] = x, y
+        self.count += 1
+        self.pending = None
+
+    def _compact(self):
+        """原地保留偶数下标的点，腾出一半空间。"""
+        half = (self.count + 1) // 2
+        for i in range(1, half):
+            self.xy[2 * i], self.xy[2 * i + 1] = self.xy[4 * i], self.xy[4 * i + 1]
+        self.count = half
+        self.min_distance_sq *= 4
+
+    def to_numpy(self):
+        """以 (N, 2) 整型数组返回路径。返回的是底层缓冲区的视图，不复制数据；
+        暂未记录的终点写入末尾的空位。之后的 append 或 clear 会改变视图的内容，需要保留时应自行复制。"""
+        count = len(self)
+        if self.pending is not None: self.xy[2 * self.count], self.xy[2 * self.count + 1] = self.pending
+        return np.frombuffer(self.xy, dtype=np.intc, count=2 * count).reshape(count, 2)
+
+
+def _circle_stroke(clockwise, steps=24):
+    sign = 1 if clockwise else -1
+    return [(math.cos(sign * 2 * math.pi * i / steps), math.sin(sign * 2 * math.pi * i / steps))
+            for i in range(steps + 1)]
+
+
+class GestureRecognizer:
+    """仿照 $1 单笔画识别器（Protractor 变体）的模板手势识别器。
+    笔画先重采样为固定点数，平移到重心，再归一化为单位向量；全部模板叠放在一个矩阵中，
+    一次向量运算即可求出候选笔画与所有模板在最优旋转下的相似度。
+    有方向的模板只允许小角度旋转，斜向的直线不会被当作某个方向的滑动；画圈等手势不限方向。"""
+
+    # 内置模板，使用屏幕坐标（y 轴向下）；同名的多个笔画视为同一手势的不同写法
+    BUILTIN_STROKES = [
+        ('swipe_right', [(0, 0), (1, 0)], False),
+        ('swipe_left', [(1, 0), (0, 0)], False),
+        ('swipe_up', [(0, 1), (0, 0)], False),
+        ('swipe_down', [(0, 0), (0, 1)], False),
+        ('l_shape', [(0, 0), (0, 1), (0.6, 1)], False),
+        ('zigzag', [(0, 0), (1, 0), (0, 1), (1, 1)], False),
+        ('circle', _circle_stroke(True), True),
+        ('circle', _circle_stroke(False), True),
+    ]
+
+    def __init__(self, num_points=GESTURE_RESAMPLE_POINTS):
+        self.num_points = num_points
+        self.names = []
+        self.custom = []  # 每个模板是否为用户录制
+        self.matrix = np.empty((0, 2 * num_points))
+        self.max_angle = np.empty(0)  # 每个模板允许的最大旋转角；画圈等手势不限方向
+        for name, points, rotation_invariant in self.BUILTIN_STROKES:
+            self.add_template(name, points, rotation_invariant)
+
+    def normalize(self, points):
+        """返回笔画归一化后的单位向量，笔画长度为零时返回None。"""
+        points = np.asarray(points, dtype=float)
+        lengths = np.concatenate(([0.0], np.cumsum(np.hypot(*np.diff(points, axis=0).T))))
+        if len(points) < 2 or lengths[-1] == 0: return None
+        targets = np.linspace(0.0, lengths[-1], self.num_points)
+        resampled = np.column_stack((np.interp(targets, lengths, points[:, 0]),
+                                     np.interp(targets, lengths, points[:, 1])))
+        resampled -= resampled.mean(axis=0)
+        vector = resampled.ravel()
+        return vector / np.linalg.norm(vector)
+
+    def add_template(self, name, points, rotation_invariant=False, custom=False):
+        vector = self.normalize(points)
+        if vector is None: return False
+        self.names.append(name)
+        self.custom.append(custom)
+        self.matrix = np.vstack((self.matrix, vector))
+        self.max_angle = np.append(self.max_angle,
+                                   math.pi if rotation_invariant else math.radians(GESTURE_MAX_ROTATION_DEG))
+        return True
+
+    def pattern_names(self):
+        return list(dict.fromkeys(self.names))
+
+    def next_custom_name(self):
+        numbers = [int(name[7:]) for name in self.names if name.startswith('custom_') and name[7:].isdigit()]
+        return f"custom_{max(numbers, default=0) + 1}"
+
+    def recognize(self, points):
+        """返回 (手势名, 相似度)；相似度为最优旋转下的余弦相似度。"""
+        vector = self.normalize(points)
+        if vector is None or not self.names: return None, 0.0
+        xs, ys = vector[0::2], vector[1::2]
+        dots = self.matrix @ vector
+        crosses = self.matrix[:, 0::2] @ ys - self.matrix[:, 1::2] @ xs
+        angles = np.clip(np.arctan2(crosses, dots), -self.max_angle, self.max_angle)
+        scores = dots * np.cos(angles) + crosses * np.sin(angles)
+        best = int(np.argmax(scores))
+        return self.names[best], float(scores[best])
+
+    def to_config(self):
+        """导出用户录制的模板（归一化后的点），内置模板不写入配置。"""
+        return [{'name': name, 'rotation_invariant': bool(max_angle >= math.pi),
+                 'points': np.round(row.reshape(-1, 2), 4).tolist()}
+                for name, custom, row, max_angle in zip(self.names, self.custom, self.matrix, self.max_angle)
+                if custom]
+
+    def load_config(self, templates):
+        for template in templates:
+            try:
+                self.add_template(template['name'], template['points'], template.get('rotation_invariant', False),
+                                  custom=True)
+            except (KeyError, TypeError, ValueError, IndexError) as e:
+                print(f"Skipping invalid gesture template: {e}")
+
+
 class GestureHandler:
-    """一个处理手势逻辑的普通类，通过独立的线程主动记录路径。"""
+    """一个触发按键对应一个手势处理器，直接用鼠标钩子转发的移动事件记录路径。
+    所有事件都由全局分发器在界面线程中按顺序送达，因此无需额外的线程或锁。
+    每个手势只记录、识别一次，再分发给绑定到识别结果的动作，开销与绑定数量无关。
+    设置了 on_stroke 时处于录制模式：不做识别，而是把路径坐标交给 on_stroke。"""
 
-    def __init__(self, app_instance, trigger_button, pattern, callback):
+    def __init__(self, app_instance, trigger_button, on_stroke=None):
         self.app = app_instance
         self.trigger_button = trigger_button
-        self.pattern = pattern
-        self.callback = callback
-        self.path = []
+        self.bindings = {}  # 手势名 -> 回调
+        self.on_stroke = on_stroke
+        self.path = GesturePath()
         self.is_recording = False
         self.screen_width = app_instance.root.winfo_screenwidth()
         self.screen_height = app_instance.root.winfo_screenheight()
-        self.recording_thread = None
-        self.lock = threading.Lock()
+        self.last_pos = None  # 最近一次移动事件的位置，作为手势的起点
 
     def handle_event(self, event):
-        """处理由全局分发器转发的鼠标事件，仅用于启动和停止手势。"""
-        if isinstance(event, mouse.ButtonEvent) and event.button == self.trigger_button:
-            if event.event_type == mouse.DOWN:
+        """处理由全局分发器转发的鼠标事件：按键启动和停止手势，移动事件追加到路径。"""
+        if isinstance(event, mouse.MoveEvent):
+            self.last_pos = (event.x, event.y)
+            if self.is_recording: self.path.append(event.x, event.y)
+        elif isinstance(event, mouse.ButtonEvent) and event.button == self.trigger_button:
+            if event.event_type in (mouse.DOWN, mouse.DOUBLE):
                 self._start_recording()
             elif event.event_type == mouse.UP:
                 self._stop_recording()
 
     def _start_recording(self):
+        if self.is_recording: return
+        self.is_recording = True
+        # 按键事件不带坐标，起点取按下前最后一次移动的位置
+        self.path.clear()
+        self.path.append(*(self.last_pos or mouse.get_position()))
+
+    def _stop_recording(self):
+        if not self.is_recording: return
+        self.is_recording = False
+        if len(self.path) > GESTURE_MIN_POINTS:
+            self.analyze_gesture()
+        self.path.clear()
+
+    def analyze_gesture(self):
+        if not self.path: return
+        points = self.path.to_numpy()
+        # 笔画的范围太小时视为误触（例如普通的右键单击）
+        if np.ptp(points, axis=0).max() < min(self.screen_width, self.screen_height) / 5: return
+        if self.on_stroke:
+            self.app.root.after(0, self.on_stroke, points.tolist())
+            return
+        if not self.bindings: return
+        name, score = self.app.gesture_recognizer.recognize(points)
+        if name in self.bindings and score >= GESTURE_MIN_SCORE:
+            self.app.root.after(0, self.bindings[name])
+
+
+class MouseEventQueue:
+    """鼠标钩子线程与界面线程之间的有界事件队列。
+    钩子线程中先过滤掉分发表里没有订阅者的事件；手势按键未按下时，连续的移动事件合并为最新位置，
+    按下期间则完整保留以记录手势路径。队列满时丢弃最旧的事件，并记录队列深度与丢弃数量。"""
+
+    def __init__(self, max_events=MOUSE_QUEUE_MAX_EVENTS):
+        self.events = deque()
+        self.max_events = max_events
+        self.lock = threading.Lock()
+        self.subscribed = frozenset()  # 分发表中有订阅者的键
+        self.capture_buttons = frozenset()  # 手势触发按键
+        self.capturing = False
+        self.stats = {'queued': 0, 'coalesced': 0, 'filtered': 0, 'dropped': 0, 'max_depth': 0}
+
+    def configure(self, subscribed, capture_buttons):
+        """由界面线程在分发表变化时调用，决定哪些事件需要入队。"""
         with self.lock:
-            if self.is_recording: return
-            self.is_recording = True
-            self.path = [mouse.get_position()]
-            self.recording_thread = threading.Thread(target=self._record_path_worker, daemon=True)
-            self.recording_thread.start()
-
-    def _record_path_worker(self):
-        """在后台线程中主动轮询并记录鼠标位置。"""
-        while self.is_recording:
-            current_pos = mouse.get_position()
+            self.subscribed = frozenset(subscribed)
+            self.capture_buttons = frozenset(capture_buttons)
+            if not self.capture_buttons: self.capturing = False
+
+    def put(self, event):
+        """运行在鼠标钩子线程。"""
+        key = mouse_event_key(event)
+        with self.lock:
+            if key[1] in self.capture_buttons:
+                # 手势按键的按下与抬起总要入队，以免错过状态变化
+                if key[2] == mouse.DOWN:
+                    self.capturing = True
+                elif key[2] == mouse.UP:
+                    self.capturing = False
+            elif key not in self.subscribed:
+                self.stats['filtered'] += 1
+                return
+            elif key is MOUSE_MOVE_KEY and not self.capturing and self.events \
+                    and isinstance(self.events[-1], mouse.MoveEvent):
+                self.events[-1] = event
+                self.stats['coalesced'] += 1
+                return
+            if len(self.events) >= self.max_events:
+                self.events.popleft()
+                self.stats['dropped'] += 1
+            self.events.append(event)
+            self.stats['queued'] += 1
+            self.stats['max_depth'] = max(self.stats['max_depth'], len(self.events))
+
+    def drain(self, limit=MOUSE_DRAIN_BATCH):
+        """取出至多 limit 个事件，返回 (事件列表, 剩余数量)。"""
+        with self.lock:
+            batch = [self.events.popleft() for _ in range(min(limit, len(self.events)))]
+            return batch, len(self.events)
+
+
+class ClickTracker:
+    """在界面线程中按同一按键两次抬起的时间间隔区分单击与双击。
+    绑定了双击时，单击要等双击间隔结束、确认没有第二次点击后才触发，双击也不会先触发两次单击；
+    未绑定双击时单击立即触发。间隔按事件自带的时间计算，界面线程繁忙导致事件成批到达时结果不变。"""
+
+    def __init__(self, root, on_single=None, on_double=None, interval_ms=MOUSE_DOUBLE_CLICK_MS):
+        self.root = root
+        self.on_single = on_single
+        self.on_double = on_double
+        self.interval = interval_ms / 1000
+        self.last_up = None  # 等待确认为单击的那次抬起的时间
+        self.after_id = None
+
+    def handle_event(self, event):
+        if event.event_type != mouse.UP: return
+        if self.on_double is None:
+            if self.on_single: self.on_single()
+            return
+        if self.last_up is not None and event.time - self.last_up <= self.interval:
+            self.cancel()
+            self.on_double()
+            return
+        self.cancel()
+        self.last_up = event.time
+        self.after_id = self.root.after(int(self.interval * 1000), self._fire_single)
+
+    def cancel(self):
+        if self.after_id is not None: self.root.after_cancel(self.after_id)
+        self.last_up = self.after_id = None
+
+    def _fire_single(self):
+        self.last_up = self.after_id = None
+        if self.on_single: self.on_single()
+
+
+def _migrate_config_v0(settings):
+    """版本 0（没有版本号的旧配置）：仅保存了单个窗口标题，快捷键未规范化。"""
+    if not settings.get('monitored_windows') and settings.get('last_window_title'):
+        settings['monitored_windows'] = [{'title': settings['last_window_title']}]
+    for config in settings.get('triggers', {}).values():
+        if config.get('keyboard'): config['keyboard'] = format_hotkey(parse_hotkey(config['keyboard']))
+    return settings
+
+
+# 版本号 -> 把该版本的配置升级到下一版本的函数
+CONFIG_MIGRATIONS = {0: _migrate_config_v0}
+
+
+class ConfigStore:
+    """配置文件的读写：文件带有格式版本号，读取时按顺序执行迁移；写入先写临时文件再原子替换，
+    中途崩溃也不会损坏原文件。save() 只登记一份快照，由后台线程写入，两次写入之间至少间隔 min_interval。"""
+
+    def __init__(self, path=CONFIG_FILE, min_interval_ms=CONFIG_MIN_WRITE_INTERVAL_MS):
+        self.path = path
+        self.min_interval = min_interval_ms / 1000
+        self.lock = threading.Lock()
+        self.wake_event = threading.Event()
+        self.pending = None  # 尚未写入的最新快照
+        self.last_write = float('-inf')
+        self.running = False
+        self.thread = None
+        self.stats = {'requests': 0, 'writes': 0, 'failures': 0}
+
+    def load(self):
+        """读取并迁移到当前版本，文件不存在时返回None。"""
+        if not os.path.exists(self.path): return None
+        with open(self.path, 'r', encoding='utf-8') as f:
+            settings = json.load(f)
+        version = settings.get('version', 0)
+        while version < CONFIG_VERSION:
+            settings = CONFIG_MIGRATIONS[version](settings)
+            version += 1
+        settings['version'] = version
+        return settings
+
+    def start(self):
+        if self.running: return
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def close(self):
+        """停止后台线程，并立即写入尚未保存的快照。"""
+        self.running = False
+        self.wake_event.set()
+        if self.thread: self.thread.join(timeout=1.0)
+        self.flush()
+
+    def save(self, settings):
+        with self.lock:
+            self.pending = settings
+            self.stats['requests'] += 1
+        self.wake_event.set()
+
+    def flush(self):
+        with self.lock:
+            settings, self.pending = self.pending, None
+        if settings is not None: self.write(settings)
+
+    def _run(self):
+        while self.running:
             with self.lock:
-                if not self.path or self.path[-1] != current_pos:
-                    self.path.append(current_pos)
-            time.sleep(0.01)
+                has_pending = self.pending is not None
+            wait = max(0.0, self.last_write + self.min_interval - time.monotonic()) if has_pending else None
+            if wait:
+                self.wake_event.wait(wait)
+            elif not has_pending:
+                self.wake_event.wait()
+            self.wake_event.clear()
+            if self.running and time.monotonic() >= self.last_write + self.min_interval: self.flush()
+
+    def write(self, settings):
+        settings = dict(settings, version=CONFIG_VERSION)
+        temp_path = self.path + '.tmp'
+        self.last_write = time.monotonic()
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(settings, f, indent=4, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.path)
+            self.stats['writes'] += 1
+        except Exception as e:
+            self.stats['failures'] += 1
+            print(f"Failed to save settings: {e}")
 
-    def _stop_recording(self):
+
+class IconEntry:
+    """图标缓存中的一项：解码后的图片、各尺寸的缩放结果及其PNG编码，ICO编码在首次使用时生成。"""
+    __slots__ = ('image', 'sizes', 'png', '_ico', '_tray_frames')
+
+    def __init__(self, image):
+        self.image = image
+        self.sizes = {size: image.resize((size, size), Image.LANCZOS) for size in ICON_SIZES}
+        self.png = {}
+        for size, resized in self.sizes.items():
+            buffer = io.BytesIO()
+            resized.save(buffer, format='PNG')
+            self.png[size] = buffer.getvalue()
+        self._ico = None
+        self._tray_frames = None
+
+    def tray_frame(self, count, hovering):
+        """返回带角标的托盘图标。首次调用时预先绘制所有状态，之后状态变化只需切换图片。"""
+        if self._tray_frames is None:
+            base = self.sizes[ICON_SIZES[0]]
+            self._tray_frames = {(n, hover): render_tray_badge(base, n, hover)
+                                 for n in range(TRAY_BADGE_MAX_COUNT + 2) for hover in (False, True)}
+        return self._tray_frames[min(count, TRAY_BADGE_MAX_COUNT + 1), bool(hovering)]
+
+    @property
+    def ico(self):
+        """包含全部尺寸的ICO文件内容。"""
+        if self._ico is None:
+            buffer = io.BytesIO()
+            self.image.save(buffer, format='ICO', sizes=[(size, size) for size in ICON_SIZES])
+            self._ico = buffer.getvalue()
+        return self._ico
+
+
+class IconCache:
+    """自定义图标的内存缓存，按 (路径, 修改时间) 索引，标题栏与托盘共用。
+    文件未变化时不再重复解码和编码；路径为空、文件不存在或无法解码时使用默认图标。"""
+    DEFAULT_KEY = ('', 0)
+
+    def __init__(self, max_entries=ICON_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.entries = {}  # (路径, 修改时间) -> IconEntry，按最近使用排序
+        self.stats = {'hits': 0, 'misses': 0, 'failures': 0, 'load_ms': 0.0}
+
+    def get(self, path):
+        key = self._key(path)
+        with self.lock:
+            entry = self.entries.pop(key, None)
+            if entry is not None:
+                self.entries[key] = entry
+                self.stats['hits'] += 1
+                return entry
+        start = time.perf_counter()
+        entry = self._load(key)
         with self.lock:
-            if not self.is_recording: return
-            self.is_recording = False
+            self.stats['misses'] += 1
+            self.stats['load_ms'] = (time.perf_counter() - start) * 1000
+            self.entries[key] = entry
+            while len(self.entries) > self.max_entries: self.entries.pop(next(iter(self.entries)))
+        return entry
 
-        if self.recording_thread:
-            self.recording_thread.join(timeout=0.5)
+    def _key(self, path):
+        if path:
+            try:
+                return path, os.stat(path).st_mtime_ns
+            except OSError:
+                pass
+        return self.DEFAULT_KEY
 
+    def _load(self, key):
+        if key != self.DEFAULT_KEY:
+            try:
+                with Image.open(key[0]) as image:
+                    return IconEntry(image.convert('RGBA'))
+            except Exception as e:
+                self.stats['failures'] += 1
+                print(f"Failed to load custom icon '{key[0]}', using default: {e}")
+            default = self.entries.get(self.DEFAULT_KEY)
+            if default is not None: return default
+        return IconEntry(self.create_default_image())
+
+    @staticmethod
+    def create_default_image():
+        """绘制默认图标"""
+        width, height = 64, 64
+        image = Image.new('RGB', (width, height), 'white')
+        dc = ImageDraw.Draw(image)
+        dc.ellipse((16, 24, 48, 40), fill='black', outline='black')
+        dc.ellipse((28, 30, 36, 38), fill='white', outline='white')
+        return image
+
+
+class HotkeyMatcher:
+    """所有键盘快捷键共用的匹配器：只安装一个 keyboard 钩子，用前缀树匹配单步组合键与多步序列。
+    序列的相邻两步间隔超过超时时间时重新从头匹配；绑定可限定作用范围，由 scope_active 判断当前是否生效。
+    钩子线程中只做一次查表，回调交给 dispatch 在界面线程执行，因此钩子开销与绑定数量无关。
+    修饰键按名称匹配，其余按键按扫描码匹配：按住 Shift 时 keyboard 报告的是上档字符（如 1 变成 !），按名称无法匹配。"""
+
+    def __init__(self, dispatch, scope_active, timeout_ms=HOTKEY_SEQUENCE_TIMEOUT_MS):
+        self.dispatch = dispatch
+        self.scope_active = scope_active
+        self.timeout = timeout_ms / 1000
+        self.bindings = {}  # 名称 -> (步骤元组, 回调, 作用范围)，作用范围为None表示全局
+        self.trie = {'children': {}, 'bindings': []}
+        self.lock = threading.Lock()
+        self.hook = None
+        self.node = None  # 已匹配到的序列前缀节点，None 表示从根节点开始
+        self.deadline = 0.0
+        self.pressed = set()  # 当前按下的修饰键
+        self.suppressed = set()  # 按下时被拦截的按键，其抬起事件也一并拦截
+        self.recording = None  # 录制中的步骤列表
+        self.step_event = threading.Event()
+        self.stats = {'events': 0, 'matched': 0, 'hook_ops': 0}
+
+    def bind(self, name, hotkey, callback, scope=None):
+        steps = parse_hotkey(hotkey)
+        if not steps: return False
         with self.lock:
-            if len(self.path) > GESTURE_MIN_POINTS:
-                self.analyze_gesture()
-            self.path = []
+            self.bindings[name] = (steps, callback, scope)
+            self._rebuild()
+        return True
 
-    def analyze_gesture(self):
-        if not self.path: return
-        start_x, start_y = self.path[0]
-        end_x, end_y = self.path[-1]
-        delta_x = end_x - start_x
-        delta_y = end_y - start_y
-
-        h_threshold = self.screen_width / 5
-        v_threshold = self.screen_height / 5
-        h_tolerance = self.screen_height / 10
-        v_tolerance = self.screen_width / 10
-
-        if self.pattern == 'swipe_right' and delta_x > h_threshold and abs(delta_y) < h_tolerance:
-            self.app.root.after(0, self.callback)
-        elif self.pattern == 'swipe_left' and delta_x < -h_threshold and abs(delta_y) < h_tolerance:
-            self.app.root.after(0, self.callback)
-        elif self.pattern == 'swipe_up' and delta_y < -v_threshold and abs(delta_x) < v_tolerance:
-            self.app.root.after(0, self.callback)
-        elif self.pattern == 'swipe_down' and delta_y > v_threshold and abs(delta_x) < v_tolerance:
-            self.app.root.after(0, self.callback)
+    def unbind(self, name):
+        with self.lock:
+            if self.bindings.pop(name, None) is not None: self._rebuild()
+
+    def clear(self):
+        with self.lock:
+            self.bindings.clear()
+            self._rebuild()
+
+    @staticmethod
+    def key_ids(name):
+        """按键在前缀树中的标识：修饰键为名称，其余为扫描码（一个名称可能对应多个扫描码）。"""
+        if name in HOTKEY_MODIFIERS: return name,
+        try:
+            return tuple(keyboard.key_to_scan_codes(name)) or (name,)
+        except ValueError:
+            return name,
+
+    def _rebuild(self):
+        root = {'children': {}, 'bindings': []}
+        for steps, callback, scope in self.bindings.values():
+            nodes = [root]
+            for step in steps:
+                # 每一步展开为所有扫描码组合，通常只有一种
+                combos = [frozenset()]
+                for name in step: combos = [combo | {key_id} for combo in combos for key_id in self.key_ids(name)]
+                nodes = [node['children'].setdefault(combo, {'children': {}, 'bindings': []})
+                         for node in nodes for combo in combos]
+            for node in nodes: node['bindings'].append((scope, callback))
+        self.trie = root
+        self.node = None
+        self._update_hook()
+
+    def _update_hook(self):
+        """只在存在绑定或正在录制时安装钩子。"""
+        needed = bool(self.bindings) or self.recording is not None
+        if needed and self.hook is None:
+            self.hook = keyboard.hook(self._on_key, suppress=True)
+            self.stats['hook_ops'] += 1
+        elif not needed and self.hook is not None:
+            keyboard.unhook(self.hook)
+            self.hook = None
+            self.stats['hook_ops'] += 1
+
+    def _active_callback(self, bindings):
+        """限定了作用范围且当前生效的绑定优先于全局绑定。"""
+        fallback = None
+        for scope, callback in bindings:
+            if scope is None:
+                fallback = fallback or callback
+            elif self.scope_active(scope):
+                return callback
+        return fallback
+
+    def _on_key(self, event):
+        """运行在键盘钩子线程，返回False表示拦截该按键。"""
+        name = normalize_key_name(event.name)
+        key_id = name if name in HOTKEY_MODIFIERS or not event.scan_code else event.scan_code
+        with self.lock:
+            self.stats['events'] += 1
+            if event.event_type == keyboard.KEY_UP:
+                self.pressed.discard(name)
+                if key_id in self.suppressed:
+                    self.suppressed.discard(key_id)
+                    return False
+                return True
+            if name in HOTKEY_MODIFIERS:
+                self.pressed.add(name)
+                return True
+            if self.recording is not None:
+                self.recording.append(frozenset(self.pressed | {name}))
+                self.step_event.set()
+                return True
+            step = frozenset(self.pressed | {key_id})
+            now = time.monotonic()
+            node = self.node if self.node is not None and now <= self.deadline else self.trie
+            child = node['children'].get(step)
+            if child is None and node is not self.trie:
+                # 序列中断时，这一步仍可能是另一个快捷键的开头
+                child = self.trie['children'].get(step)
+            self.node = None
+            if child is None: return True
+            callback = self._active_callback(child['bindings'])
+            if callback:
+                self.stats['matched'] += 1
+                self.dispatch(callback)
+            elif child['children']:
+                self.node, self.deadline = child, now + self.timeout
+            else:
+                return True  # 作用范围不符，放行按键
+            self.suppressed.add(key_id)
+            return False
+
+    def record(self):
+        """阻塞直到录制完一个快捷键：按下第一步后，超过序列超时时间没有新的一步即结束。"""
+        with self.lock:
+            self.recording = []
+            self.step_event.clear()
+            self._update_hook()
+        self.step_event.wait()
+        while True:
+            self.step_event.clear()
+            if not self.step_event.wait(self.timeout): break
+        with self.lock:
+            steps, self.recording = self.recording, None
+            self._update_hook()
+        return format_hotkey(steps)
+
+
+class FadeEngine:
+    """透明度渐变引擎，所有正在渐变的窗口共享同一个帧时钟（由监控线程调用 step 推进）。
+    透明度按经过的时间插值：线程被耽搁时直接跳到当前应有的值（丢帧），而不会补发错过的帧；
+    所有动画结束后不再需要任何帧。空闲时开始的动画通过 wake 回调唤醒可能正在长时间休眠的监控线程。"""
+
+    def __init__(self, duration_ms=150, easing='ease_out', wake=None):
+        self.duration_ms = duration_ms
+        self.easing = easing
+        self.wake = wake
+        self.animations = {}  # hwnd -> (monitor, start_alpha, target_alpha, start_time)
+        self.next_frame_time = 0.0
+        self.lock = threading.Lock()
+        self.stats = {'transitions': 0, 'frames': 0, 'dropped': 0}
+
+    def animate(self, monitor, target):
+        """让窗口从当前透明度渐变到目标透明度。"""
+        with self.lock:
+            animation = self.animations.get(monitor.hwnd)
+            if animation and animation[2] == target: return
+            current = monitor.applied_alpha
+            if self.duration_ms <= 0 or current is None or current == target:
+                # 无需渐变（已关闭渐变、初次设置或已是目标值），直接设置
+                self.animations.pop(monitor.hwnd, None)
+                monitor._apply_alpha(target)
+                return
+            now = time.monotonic()
+            idle = not self.animations
+            if idle: self.next_frame_time = now + FADE_FRAME_INTERVAL_MS / 1000
+            self.animations[monitor.hwnd] = (monitor, current, target, now)
+            self.stats['transitions'] += 1
+        # 已有动画时监控线程本就按帧间隔醒来，只有从空闲开始时才需要唤醒
+        if idle and self.wake: self.wake()
+
+    def cancel(self, monitor):
+        with self.lock:
+            self.animations.pop(monitor.hwnd, None)
+
+    def step(self, now):
+        """在帧到期时推进所有动画，返回距下一帧的秒数；没有进行中的动画时返回None。"""
+        frame_interval = FADE_FRAME_INTERVAL_MS / 1000
+        with self.lock:
+            if not self.animations: return None
+            if now < self.next_frame_time: return self.next_frame_time - now
+            # 帧迟到时不补发错过的帧，只记录丢帧数
+            self.stats['dropped'] += int((now - self.next_frame_time) / frame_interval)
+            self.next_frame_time = now + frame_interval
+            self.stats['frames'] += 1
+
+            ease = EASING_FUNCTIONS.get(self.easing, EASING_FUNCTIONS['linear'])
+            for hwnd, (monitor, start_alpha, target, start_time) in list(self.animations.items()):
+                progress = min(1.0, (now - start_time) * 1000 / self.duration_ms)
+                try:
+                    monitor._apply_alpha(round(start_alpha + (target - start_alpha) * ease(progress)))
+                except Exception:
+                    progress = 1.0
+                if progress >= 1.0: self.animations.pop(hwnd, None)
+            return frame_interval if self.animations else None
+
+    def frames_per_transition(self):
+        transitions = self.stats['transitions']
+        return self.stats['frames'] / transitions if transitions else 0.0
 
 
 class WindowMonitor:
-    """监控指定窗口，根据鼠标是否悬停来调整其透明度，并可选择隐藏其任务栏图标。"""
+    """监控指定窗口，根据鼠标是否悬停来调整其透明度，并可选择隐藏其任务栏图标。
+    本身不再调度定时器，由 MonitorManager 统一驱动。"""
 
-    def __init__(self, hwnd, root, always_on_top=False, away_transparency=50, hover_opacity=100, hide_taskbar=False):
+    def __init__(self, hwnd, root, always_on_top=False, away_transparency=50, hover_opacity=100, hide_taskbar=False,
+                 edge_margin=0, hover_dwell_ms=0, away_dwell_ms=0, exe=''):
         self.hwnd = hwnd
         self.root = root
+        self.title = win32gui.GetWindowText(hwnd)
+        self.cls = win32gui.GetClassName(hwnd)
+        self.exe = exe
         self.always_on_top = always_on_top
         self.hide_taskbar = hide_taskbar
+        self.away_transparency = away_transparency
+        self.hover_opacity = hover_opacity
         self.transparent_level_byte = int(away_transparency / 100 * 255)
         self.opaque_level_byte = int(hover_opacity / 100 * 255)
+        self.rect = None  # 缓存的窗口矩形，由管理器的节拍刷新
+        self.fade_engine = None  # 设置后透明度变化通过渐变引擎完成
+        # 滞回与驻留：光标需进入收缩后的矩形才变为悬停，离开扩大后的矩形才变为移开，且新状态需保持一段时间才生效
+        self.edge_margin = edge_margin
+        self.hover_dwell_ms = hover_dwell_ms
+        self.away_dwell_ms = away_dwell_ms
+        self.is_hovering = None
+        self.pending_state = None
+        self.pending_since = 0.0
+        self.state_changes = 0
+        self.transparency_enabled = True  # 关闭时窗口保持悬停时的不透明度
+        self.profile = None  # 自动附加该窗口的配置名
+        self.applied_alpha = None  # 最近一次实际设置到窗口上的透明度
+        self.alpha_stats = {'calls': 0, 'skipped': 0}  # SetLayeredWindowAttributes 的实际调用与跳过次数
         self.running = False
         self.lock = threading.Lock()
         self.original_ex_style = win32gui.GetWindowLong(self.hwnd, win32con.GWL_EXSTYLE)
@@ -138,52 +942,760 @@ class WindowMonitor:
         if win32gui.IsWindow(self.hwnd): win32gui.SetWindowPos(self.hwnd, win32con.HWND_NOTOPMOST, 0, 0, 0, 0,
                                                                win32con.SWP_NOMOVE | win32con.SWP_NOSIZE)
 
-    def make_transparent(self):
+    def _apply_alpha(self, alpha):
+        """仅在透明度与上次设置的值不同时才调用系统接口。"""
         with self.lock:
-            if win32gui.IsWindow(self.hwnd): win32gui.SetLayeredWindowAttributes(self.hwnd, 0,
-                                                                                 self.transparent_level_byte,
-                                                                                 win32con.LWA_ALPHA)
+            if alpha == self.applied_alpha:
+                self.alpha_stats['skipped'] += 1
+                return
+            if win32gui.IsWindow(self.hwnd):
+                win32gui.SetLayeredWindowAttributes(self.hwnd, 0, alpha, win32con.LWA_ALPHA)
+                self.applied_alpha = alpha
+                self.alpha_stats['calls'] += 1
+
+    def _set_target_alpha(self, alpha):
+        if self.fade_engine:
+            self.fade_engine.animate(self, alpha)
+        else:
+            self._apply_alpha(alpha)
+
+    def make_transparent(self):
+        self._set_target_alpha(self.transparent_level_byte)
 
     def make_opaque(self):
-        with self.lock:
-            if win32gui.IsWindow(self.hwnd): win32gui.SetLayeredWindowAttributes(self.hwnd, 0, self.opaque_level_byte,
-                                                                                 win32con.LWA_ALPHA)
-
-    def check_mouse_position(self):
-        if not self.running: return
-        if not win32gui.IsWindow(self.hwnd):
-            self.stop_monitoring()
-            self.root.after(0, self.root.app_instance.handle_window_closed)
-            return
+        self._set_target_alpha(self.opaque_level_byte)
+
+    def refresh_rect(self):
+        """刷新缓存的窗口矩形，窗口已关闭时返回False。"""
+        if not win32gui.IsWindow(self.hwnd): return False
         try:
-            x, y = mouse.get_position()
-            rect = win32gui.GetWindowRect(self.hwnd)
-            if rect[0] <= x <= rect[2] and rect[1] <= y <= rect[3]:
+            self.rect = win32gui.GetWindowRect(self.hwnd)
+        except Exception:
+            pass
+        return True
+
+    def _desired_hover(self, x, y):
+        """带滞回地判断光标位置对应的悬停状态。"""
+        left, top, right, bottom = self.rect
+        # 边距不超过窗口短边的四分之一，避免收缩后的矩形为空
+        margin = min(self.edge_margin, (right - left) // 4, (bottom - top) // 4)
+        if self.is_hovering:
+            margin = -margin  # 已悬停时使用扩大的矩形判断是否离开
+        return left + margin <= x <= right - margin and top + margin <= y <= bottom - margin
+
+    def update_hover(self, x, y, now=None):
+        """根据缓存的窗口矩形更新悬停状态，设置相应透明度并返回当前是否悬停。"""
+        if self.rect is None: return False
+        desired = self._desired_hover(x, y)
+        if self.is_hovering is None:
+            self.is_hovering = desired
+        elif desired == self.is_hovering:
+            self.pending_state = None
+        else:
+            now = time.monotonic() if now is None else now
+            if self.pending_state != desired:
+                self.pending_state, self.pending_since = desired, now
+            dwell_ms = self.hover_dwell_ms if desired else self.away_dwell_ms
+            if (now - self.pending_since) * 1000 >= dwell_ms:
+                self.is_hovering, self.pending_state = desired, None
+                self.state_changes += 1
+        try:
+            if self.is_hovering or not self.transparency_enabled:
                 self.make_opaque()
             else:
                 self.make_transparent()
         except Exception:
             pass
-        if self.running: self.root.after(100, self.check_mouse_position)
+        return self.is_hovering
+
+    def set_away_transparency(self, away_transparency):
+        self.away_transparency = away_transparency
+        self.transparent_level_byte = int(away_transparency / 100 * 255)
+        if self.running and self.transparency_enabled and not self.is_hovering: self.make_transparent()
+
+    def toggle_transparency(self):
+        self.transparency_enabled = not self.transparency_enabled
+        if self.transparency_enabled and not self.is_hovering:
+            self.make_transparent()
+        else:
+            self.make_opaque()
+
+    def describe(self):
+        """返回用于保存到配置文件的窗口设置。"""
+        return {'title': self.title, 'hover': self.hover_opacity, 'away': self.away_transparency,
+                'always_on_top': self.always_on_top, 'hide_taskbar': self.hide_taskbar,
+                'edge_margin': self.edge_margin, 'hover_dwell_ms': self.hover_dwell_ms,
+                'away_dwell_ms': self.away_dwell_ms,
+                # 窗口指纹，用于下次启动时在标题变化后仍能找回该窗口
+                'exe': self.exe, 'class': self.cls, 'rect': list(self.rect) if self.rect else None,
+                'profile': self.profile}
 
     def start_monitoring(self):
         if not self.running:
             self.running = True
             if self.always_on_top: self.set_always_on_top()
-            self.check_mouse_position()
 
     def stop_monitoring(self):
         if self.running:
             self.running = False
+            if self.fade_engine: self.fade_engine.cancel(self)
             with self.lock:
                 if win32gui.IsWindow(self.hwnd):
                     if self.always_on_top: self.remove_always_on_top()
                     win32gui.SetLayeredWindowAttributes(self.hwnd, 0, 255, win32con.LWA_ALPHA)
+                    self.applied_alpha = None
                     win32gui.SetWindowLong(self.hwnd, win32con.GWL_EXSTYLE, self.original_ex_style)
                     win32gui.SetWindowPos(self.hwnd, 0, 0, 0, 0, 0,
                                           win32con.SWP_NOMOVE | win32con.SWP_NOSIZE | win32con.SWP_NOZORDER | win32con.SWP_FRAMECHANGED)
 
 
+class MonitorManager:
+    """在独立的监控线程中驱动任意数量的 WindowMonitor，悬停响应不受 Tk 事件循环繁忙程度的影响。
+    每个节拍最多读取一次光标位置，再对所有缓存的窗口矩形做命中检测；窗口矩形只按兜底间隔刷新，
+    因此增加窗口不会增加线程、定时器或光标读取的次数。需要界面处理的通知通过 notifications 队列交回 Tk 线程。"""
+
+    def __init__(self, event_driven=True):
+        self.event_driven = event_driven
+        self.wake_event = threading.Event()
+        self.fade_engine = FadeEngine(wake=self.wake_event.set)
+        self.monitors = {}  # hwnd -> WindowMonitor
+        self.active_hwnd = None  # 最近悬停（或最近加入）的窗口，供触发器操作
+        self.lock = threading.RLock()
+        self.notifications = queue.Queue()  # (事件名, 参数) 由 Tk 线程取出处理
+        self.worker = None
+        self.pending_pos = None  # 鼠标钩子线程写入的最新光标位置
+        self.last_pos = None
+        self.last_tick_pos = None
+        self.last_rect_refresh = 0.0
+        self.next_tick = 0.0
+        # 自适应节拍：光标在窗口附近移动时快速检测，空闲时按指数退避到最长间隔
+        self.min_interval_ms = MONITOR_MIN_INTERVAL_MS
+        self.max_interval_ms = MONITOR_MAX_INTERVAL_MS
+        self.interval_ms = MONITOR_MIN_INTERVAL_MS
+        self.wakeup_times = deque()  # 最近一分钟内监控线程各次唤醒的时间，用于统计唤醒频率
+
+    @property
+    def running(self):
+        return bool(self.monitors)
+
+    def add(self, monitor):
+        """加入并启动一个窗口监控，所有窗口共用管理器的渐变引擎。"""
+        monitor.fade_engine = self.fade_engine
+        monitor.start_monitoring()
+        monitor.refresh_rect()
+        with self.lock:
+            self.monitors[monitor.hwnd] = monitor
+            self.active_hwnd = monitor.hwnd
+            self.next_tick = 0.0  # 立即执行一次节拍
+            if self.worker is None:
+                self.worker = threading.Thread(target=self._run, daemon=True)
+                self.worker.start()
+        self.wake_event.set()
+
+    def remove(self, hwnd):
+        with self.lock:
+            monitor = self.monitors.pop(hwnd, None)
+            if monitor: monitor.stop_monitoring()
+            if self.active_hwnd == hwnd:
+                self.active_hwnd = next(reversed(self.monitors), None)
+        self.wake_event.set()
+        return monitor
+
+    def stop_all(self):
+        with self.lock:
+            for hwnd in list(self.monitors): self.remove(hwnd)
+
+    def active_monitor(self):
+        return self.monitors.get(self.active_hwnd)
+
+    def snapshot(self):
+        """返回当前监控的窗口列表。监控线程可能随时移除已关闭的窗口，其他线程不应直接遍历 monitors。"""
+        with self.lock:
+            return list(self.monitors.values())
+
+    def describe(self):
+        with self.lock:
+            return [monitor.describe() for monitor in self.monitors.values()]
+
+    def state_changes(self):
+        """汇总所有窗口的悬停状态切换次数。"""
+        with self.lock:
+            return sum(monitor.state_changes for monitor in self.monitors.values())
+
+    def alpha_stats(self):
+        """汇总所有窗口的透明度设置调用次数与跳过次数。"""
+        totals = {'calls': 0, 'skipped': 0}
+        with self.lock:
+            for monitor in self.monitors.values():
+                for key in totals: totals[key] += monitor.alpha_stats[key]
+        return totals
+
+    def on_mouse_move(self, x, y):
+        """由鼠标钩子线程调用：只记录最新位置并唤醒监控线程，连续的移动自然合并为一次处理。"""
+        if not self.monitors: return
+        self.pending_pos = (x, y)
+        # 轮询模式下仅在节拍已退避时唤醒，以便光标靠近窗口时恢复快速检测
+        if self.event_driven or self.interval_ms > self.min_interval_ms: self.wake_event.set()
+
+    def _run(self):
+        """监控线程主循环：处理最新的光标移动、到期的节拍与渐变帧，然后休眠到下一个截止时间。"""
+        while True:
+            with self.lock:
+                if not self.monitors:
+                    self.worker = None
+                    return
+                now = time.monotonic()
+                self._record_wakeup(now)
+                pos, self.pending_pos = self.pending_pos, None
+                if pos is not None: self._handle_move(pos, now)
+                if now >= self.next_tick: self._tick(now)
+                timeout = self.next_tick - now
+            frame_delay = self.fade_engine.step(time.monotonic())
+            if frame_delay is not None: timeout = min(timeout, frame_delay)
+            self.wake_event.wait(max(0.0, timeout))
+            self.wake_event.clear()
+
+    def _handle_move(self, pos, now):
+        """仅在光标位置变化时做命中检测。"""
+        if pos == self.last_pos: return
+        self.last_pos = pos
+        if self.event_driven: self._hit_test(*pos)
+        # 节拍已退避时，光标靠近窗口立即恢复快速检测
+        if self.interval_ms > self.min_interval_ms and self._is_near(*pos):
+            self.interval_ms = self.min_interval_ms
+            self.next_tick = min(self.next_tick, now + self.interval_ms / 1000)
+
+    def _is_near(self, x, y):
+        margin = MONITOR_NEAR_MARGIN
+        for monitor in self.monitors.values():
+            rect = monitor.rect
+            if rect and rect[0] - margin <= x <= rect[2] + margin and rect[1] - margin <= y <= rect[3] + margin:
+                return True
+        return False
+
+    def _hit_test(self, x, y):
+        for monitor in self.monitors.values():
+            if monitor.update_hover(x, y): self.active_hwnd = monitor.hwnd
+
+    def _refresh_rects(self):
+        """刷新所有窗口矩形，移除已关闭的窗口并通知界面。"""
+        for monitor in list(self.monitors.values()):
+            if not monitor.refresh_rect():
+                self.remove(monitor.hwnd)
+                self.notifications.put(('window_closed', monitor.title))
+
+    def _tick(self, now):
+        # 两种模式都只按兜底间隔刷新窗口矩形，捕获窗口的移动与关闭；快速节拍只做命中检测
+        if now - self.last_rect_refresh >= MONITOR_FALLBACK_INTERVAL_MS / 1000:
+            self.last_rect_refresh = now
+            self._refresh_rects()
+        try:
+            if not self.event_driven or self.last_pos is None:
+                self.last_pos = mouse.get_position()
+            if self.monitors: self._hit_test(*self.last_pos)
+        except Exception:
+            pass
+        moved = self.last_pos != self.last_tick_pos
+        self.last_tick_pos = self.last_pos
+        pending = any(monitor.pending_state is not None for monitor in self.monitors.values())
+        if pending or (moved and self.last_pos is not None and self._is_near(*self.last_pos)):
+            # 有状态正在等待驻留时间结束时也保持快速检测
+            self.interval_ms = self.min_interval_ms
+        else:
+            self.interval_ms = min(self.interval_ms * 2, self.max_interval_ms)
+        self.next_tick = now + self.interval_ms / 1000
+
+    def _record_wakeup(self, now):
+        self.wakeup_times.append(now)
+        while self.wakeup_times and now - self.wakeup_times[0] > 60: self.wakeup_times.popleft()
+
+    def wakeups_per_minute(self):
+        """返回最近一分钟内监控线程的唤醒次数。"""
+        now = time.monotonic()
+        with self.lock:
+            return sum(1 for t in self.wakeup_times if now - t <= 60)
+
+
+class WindowInfo:
+    """窗口注册表中的一条顶层窗口记录。"""
+    __slots__ = ('hwnd', 'title', 'cls', 'pid', 'exe', 'visible', 'rect')
+
+    def __init__(self, hwnd, title, cls, pid, exe, visible, rect=None):
+        self.hwnd = hwnd
+        self.title = title
+        self.cls = cls
+        self.pid = pid
+        self.exe = exe  # 可执行文件名，如 notepad.exe
+        self.visible = visible
+        self.rect = rect
+
+    def copy(self):
+        return WindowInfo(self.hwnd, self.title, self.cls, self.pid, self.exe, self.visible, self.rect)
+
+
+class WindowIndex:
+    """以hwnd为主键的窗口表，并按标题、进程、可执行文件与窗口类建立二级索引，同名窗口不会互相覆盖。"""
+
+    def __init__(self):
+        self.by_hwnd = {}  # hwnd -> WindowInfo
+        self.by_title = {}  # 标题 -> {hwnd}
+        self.by_pid = {}  # 进程号 -> {hwnd}
+        self.by_exe = {}  # 小写可执行文件名 -> {hwnd}
+        self.by_class = {}  # 窗口类名 -> {hwnd}
+        self.order = {}  # hwnd -> 首次加入的序号，用于让列表行保持稳定的先后顺序
+        self.next_order = 0
+
+    def __len__(self):
+        return len(self.by_hwnd)
+
+    def __contains__(self, hwnd):
+        return hwnd in self.by_hwnd
+
+    def get(self, hwnd):
+        return self.by_hwnd.get(hwnd)
+
+    def put(self, info):
+        """加入或更新一条记录，并同步所有二级索引。"""
+        old = self.by_hwnd.get(info.hwnd)
+        if old is not None:
+            self._unindex(old)
+        else:
+            self.order[info.hwnd] = self.next_order
+            self.next_order += 1
+        self.by_hwnd[info.hwnd] = info
+        self.by_title.setdefault(info.title, set()).add(info.hwnd)
+        self.by_pid.setdefault(info.pid, set()).add(info.hwnd)
+        self.by_exe.setdefault(info.exe.lower(), set()).add(info.hwnd)
+        self.by_class.setdefault(info.cls, set()).add(info.hwnd)
+
+    def remove(self, hwnd):
+        info = self.by_hwnd.pop(hwnd, None)
+        if info is None: return None
+        self._unindex(info)
+        del self.order[hwnd]
+        return info
+
+    def _unindex(self, info):
+        hwnd = info.hwnd
+        for mapping, key in ((self.by_title, info.title), (self.by_pid, info.pid), (self.by_exe, info.exe.lower()),
+                             (self.by_class, info.cls)):
+            hwnds = mapping.get(key)
+            if hwnds is not None:
+                hwnds.discard(hwnd)
+                if not hwnds: del mapping[key]
+
+    def find_by_title(self, title):
+        return self.by_title.get(title, set())
+
+    def find_by_pid(self, pid):
+        return self.by_pid.get(pid, set())
+
+    def find_by_exe(self, exe):
+        return self.by_exe.get(exe.lower(), set())
+
+    def find_by_class(self, cls):
+        return self.by_class.get(cls, set())
+
+
+def is_subsequence(query, text):
+    """判断query中的字符是否按顺序出现在text中（模糊匹配）。"""
+    position = 0
+    for char in query:
+        position = text.find(char, position) + 1
+        if not position: return False
+    return True
+
+
+def contiguous_runs(indices):
+    """把升序排列的行号合并为 [首行, 末行] 区段。"""
+    runs = []
+    for index in indices:
+        if runs and runs[-1][1] == index - 1:
+            runs[-1][1] = index
+        else:
+            runs.append([index, index])
+    return runs
+
+
+def merge_list_rows(orders, hwnds, rows):
+    """把按序号排好的新行 (序号, hwnd, 标题) 并入已有的行，返回 (序号列表, hwnd列表, 插入区段)。
+    插入区段为 (行号, [标题])，两个已有行之间的新行归为一段；按顺序逐段插入时每段的行号恰好有效。"""
+    merged_orders, merged_hwnds, groups = [], [], []
+    kept = 0  # 已并入结果的已有行数
+    for order, hwnd, title in rows:
+        gap = bisect.bisect(orders, order, kept)
+        if gap != kept or not groups: groups.append((len(merged_hwnds) + gap - kept, []))
+        merged_orders += orders[kept:gap]
+        merged_hwnds += hwnds[kept:gap]
+        kept = gap
+        groups[-1][1].append(title)
+        merged_orders.append(order)
+        merged_hwnds.append(hwnd)
+    return merged_orders + orders[kept:], merged_hwnds + hwnds[kept:], groups
+
+
+class WindowSearchIndex:
+    """窗口标题的三元组倒排索引，随注册表事件增量更新。
+    子串与模糊匹配先用索引缩小候选集合，再逐一校验；进程名匹配在去重后的可执行文件名上进行。"""
+
+    def __init__(self):
+        self.titles = {}  # hwnd -> 小写标题
+        self.grams = {}  # 三元组 -> {hwnd}
+        self.chars = {}  # 单个字符 -> {hwnd}，用于短查询与模糊匹配
+        self.exes = {}  # 小写可执行文件名 -> {hwnd}
+        self.exe_of = {}  # hwnd -> 小写可执行文件名
+
+    @staticmethod
+    def _grams(text):
+        return {text[i:i + 3] for i in range(len(text) - 2)}
+
+    def put(self, hwnd, title, exe):
+        self.remove(hwnd)
+        title, exe = title.lower(), (exe or '').lower()
+        self.titles[hwnd] = title
+        self.exe_of[hwnd] = exe
+        for gram in self._grams(title): self.grams.setdefault(gram, set()).add(hwnd)
+        for char in set(title): self.chars.setdefault(char, set()).add(hwnd)
+        self.exes.setdefault(exe, set()).add(hwnd)
+
+    def remove(self, hwnd):
+        title = self.titles.pop(hwnd, None)
+        if title is None: return
+        for mapping, keys in ((self.grams, self._grams(title)), (self.chars, set(title)),
+                              (self.exes, (self.exe_of.pop(hwnd),))):
+            for key in keys:
+                hwnds = mapping.get(key)
+                if hwnds is not None:
+                    hwnds.discard(hwnd)
+                    if not hwnds: del mapping[key]
+
+    def _candidates(self, mapping, keys):
+        """返回同时出现在所有键下的hwnd集合，从最小的集合开始求交集。"""
+        sets = [mapping.get(key, set()) for key in keys]
+        if not sets: return set(self.titles)
+        sets.sort(key=len)
+        result = set(sets[0])
+        for other in sets[1:]:
+            result &= other
+            if not result: break
+        return result
+
+    def search(self, query, mode='substring'):
+        """返回匹配查询的hwnd集合。"""
+        query = query.lower()
+        if mode == 'process':
+            return set().union(*(hwnds for exe, hwnds in self.exes.items() if query in exe))
+        if mode == 'fuzzy':
+            query = query.replace(' ', '')
+            candidates = self._candidates(self.chars, set(query))
+            return {hwnd for hwnd in candidates if is_subsequence(query, self.titles[hwnd])}
+        keys = self._grams(query) if len(query) >= 3 else set(query)
+        candidates = self._candidates(self.grams if len(query) >= 3 else self.chars, keys)
+        return {hwnd for hwnd in candidates if query in self.titles[hwnd]}
+
+    def matches(self, hwnd, query, mode='substring'):
+        """判断单个窗口是否匹配查询，用于增量更新时无需查索引。"""
+        query = query.lower()
+        if mode == 'process': return query in self.exe_of.get(hwnd, '')
+        title = self.titles.get(hwnd, '')
+        if mode == 'fuzzy': return is_subsequence(query.replace(' ', ''), title)
+        return query in title
+
+
+TITLE_SEPARATOR = re.compile(r'\s+[-–—|]\s+')
+
+
+def title_similarity(a, b):
+    """比较两个窗口标题中不同的部分：先去掉末尾共同的段落（通常是程序名，如 " - Google Chrome"）。"""
+    a_parts, b_parts = TITLE_SEPARATOR.split(a), TITLE_SEPARATOR.split(b)
+    while len(a_parts) > 1 and len(b_parts) > 1 and a_parts[-1] == b_parts[-1]:
+        a_parts.pop()
+        b_parts.pop()
+    return difflib.SequenceMatcher(None, ' - '.join(a_parts), ' - '.join(b_parts)).ratio()
+
+
+def score_window_match(saved, info):
+    """按可执行文件、窗口类、标题与大致位置为候选窗口打分，可执行文件不同的窗口直接排除。
+    标题是区分同一程序不同文档或网页的主要依据，标题差别较大时得分不会超过 WINDOW_MATCH_MIN_SCORE。"""
+    score = 0.0
+    saved_exe = (saved.get('exe') or '').lower()
+    if saved_exe:
+        if saved_exe != (info.exe or '').lower(): return 0.0
+        score += 1
+    if saved.get('class') and saved['class'] == info.cls: score += 1
+    saved_title = saved.get('title') or ''
+    if saved_title == info.title:
+        score += 5
+    elif saved_title and info.title:
+        similarity = title_similarity(saved_title, info.title)
+        if similarity >= WINDOW_TITLE_MIN_SIMILARITY: score += 4 * similarity
+    saved_rect, rect = saved.get('rect'), info.rect
+    if saved_rect and rect:
+        # 位置与尺寸越接近得分越高，偏差达到 500 像素时不再加分
+        drift = sum(abs(a - b) for a, b in zip(saved_rect, rect)) / 4
+        score += max(0.0, 1 - drift / 500)
+    return score
+
+
+# 正则表达式的词法单元，供 title_keywords 分析最外层结构；字符类与转义序列整体作为一个单元
+REGEX_TOKEN = re.compile(r"""
+    (?P<escape>\\(?:x[0-9a-fA-F]{2}|u[0-9a-fA-F]{4}|U[0-9a-fA-F]{8}|N\{[^}]*\}|[0-9]+|.))
+  | (?P<quantifier>[*+?]|\{\d*,?\d*\})
+  | (?P<alternation>\|)
+  | (?P<open>\() | (?P<close>\))
+  | (?P<charset>\[\^?\]?(?:\\.|[^\]\\])*\])
+  | (?P<char>.)""", re.DOTALL | re.VERBOSE)
+
+
+def title_keywords(pattern):
+    """分析标题正则的最外层，返回 (关键词列表, 是否纯文本)：任何匹配都至少包含其中一个关键词（已 casefold）。
+    按最外层的 | 拆分备选，每个备选取最长的一段不带量词的连续普通字符，分组与字符类内部一律跳过；
+    某个备选找不到这样的文本时返回 (None, False)。纯文本表示正则只由普通字符与 | 组成，出现关键词即为匹配。"""
+    branches, runs, run = [], [], ''
+    depth, exact, last_literal = 0, True, False
+    for token in REGEX_TOKEN.finditer(pattern):
+        kind, text = token.lastgroup, token.group()
+        if depth:
+            depth += {'open': 1, 'close': -1}.get(kind, 0)
+            continue
+        literal = None
+        if kind == 'escape':
+            if len(text) == 2 and not (text[1].isalnum() or text[1].isspace() or text[1] == '_'): literal = text[1]
+        elif kind == 'quantifier':
+            if last_literal: run = run[:-1]  # 量词作用于前一个字符，它不再是必有的
+        elif kind == 'alternation':
+            branches.append(max(runs + [run], key=len))
+            runs, run, last_literal = [], '', False
+            continue
+        elif kind == 'open':
+            depth = 1
+        elif kind == 'char' and text not in '.^${}':
+            literal = text
+        if literal is None:
+            exact = False
+            runs.append(run)
+            run = ''
+        else:
+            run += literal
+        last_literal = literal is not None
+    branches.append(max(runs + [run], key=len))
+    if not all(branches): return None, False
+    return [branch.casefold() for branch in branches], exact and all(branch.isascii() for branch in branches)
+
+
+class KeywordAutomaton:
+    """Aho-Corasick 自动机：一次扫描文本即可找出其中出现的全部关键词，耗时与关键词数量无关。
+    每个关键词关联一个数值，search 返回文本中出现过的关键词所关联的数值集合。"""
+
+    def __init__(self, keywords):
+        self.children = [{}]  # 节点 -> {字符: 子节点}，0 为根节点
+        self.fail = [0]  # 节点 -> 失配时退回的节点
+        self.values = [()]  # 节点 -> 在该节点结束的关键词（含沿失配链可达的）所关联的数值
+        for keyword, value in keywords:
+            node = 0
+            for char in keyword:
+                child = self.children[node].get(char)
+                if child is None:
+                    child = len(self.children)
+                    self.children[node][char] = child
+                    self.children.append({})
+                    self.fail.append(0)
+                    self.values.append(())
+                node = child
+            self.values[node] += (value,)
+        # 按层次计算失配链，较浅的节点先完成，其数值可直接并入
+        pending = deque(self.children[0].values())
+        while pending:
+            node = pending.popleft()
+            for char, child in self.children[node].items():
+                fail = self.fail[node]
+                while fail and char not in self.children[fail]: fail = self.fail[fail]
+                self.fail[child] = self.children[fail].get(char, 0)
+                self.values[child] += self.values[self.fail[child]]
+                pending.append(child)
+
+    def search(self, text):
+        children, fail, values = self.children, self.fail, self.values
+        node, found = 0, set()
+        for char in text:
+            while node and char not in children[node]: node = fail[node]
+            node = children[node].get(char, 0)
+            if values[node]: found.update(values[node])
+        return found
+
+
+class TitleRules:
+    """同一索引项中各配置的标题条件，按配置顺序找出第一个符合的配置。
+    从每个正则中提取必有的关键词放入一个关键词自动机，扫描一遍标题即可排除绝大多数配置；
+    纯文本条件出现关键词即为匹配，其余只对出现了关键词的配置执行各自的正则。提取不到关键词的正则每次都要检查。"""
+    PLAIN_FLAGS = re.compile('', re.IGNORECASE).flags
+
+    def __init__(self, entries):
+        self.fallback = None  # 没有标题条件的 (顺序, 配置)，排在它之后的配置永远不会被选中
+        self.rules = {}  # 顺序 -> (顺序, 配置, 标题正则, 是否纯文本)
+        self.always = []  # 提取不到关键词、每次都要检查的规则，按顺序排列
+        keywords = []
+        for order, profile, title_regex in entries:
+            if title_regex is None:
+                self.fallback = (order, profile)
+                break
+            words, exact = title_keywords(title_regex.pattern)
+            if title_regex.flags != self.PLAIN_FLAGS: words = None  # 如 (?x) 会改变字符的含义
+            self.rules[order] = rule = (order, profile, title_regex, exact and words is not None)
+            if words:
+                keywords.extend((word, order) for word in words)
+            else:
+                self.always.append(rule)
+        self.keywords = KeywordAutomaton(keywords) if keywords else None
+
+    def match(self, title, folded, limit=math.inf):
+        """返回顺序小于 limit 的第一个符合的 (顺序, 配置)，没有时返回None。folded 为 casefold 后的标题。"""
+        best = self.fallback if self.fallback and self.fallback[0] < limit else None
+        if best: limit = best[0]
+        found = self.keywords.search(folded) if self.keywords else None
+        rules = sorted([self.rules[order] for order in found] + self.always) if found else self.always
+        for order, profile, title_regex, exact in rules:
+            if order >= limit: break
+            if exact or title_regex.search(title): return order, profile
+        return best
+
+
+class ProfileMatcher:
+    """按可执行文件与窗口类为启用的自动附加配置建立索引，新窗口只需检查可能符合的少数配置。
+    可执行文件与窗口类需完全相同（不区分大小写），留空表示不限；标题按各配置自己的正则表达式搜索，
+    同一索引项中的标题条件由 TitleRules 统一预编译。多个配置都符合时，排在前面的优先。"""
+
+    def __init__(self, profiles=()):
+        self.compile(profiles)
+
+    def compile(self, profiles):
+        """重新编译匹配器，返回因正则表达式无效而被跳过的 [(配置名, 错误信息)]。"""
+        entries = {}  # (可执行文件, 窗口类) -> [(顺序, 配置, 标题正则)]，空字符串表示不限
+        self.profiles = []
+        errors = []
+        for order, profile in enumerate(profiles):
+            if not profile.get('enabled', True): continue
+            exe, cls, title = (profile.get(key, '').strip() for key in ('exe', 'class', 'title_regex'))
+            if not (exe or cls or title): continue  # 没有任何条件的配置会匹配所有窗口，忽略
+            try:
+                title_regex = re.compile(title, re.IGNORECASE) if title else None
+            except re.error as e:
+                errors.append((profile.get('name', ''), str(e)))
+                continue
+            entries.setdefault((exe.lower(), cls.lower()), []).append((order, profile, title_regex))
+            self.profiles.append(profile)
+        self.buckets = {key: TitleRules(bucket) for key, bucket in entries.items()}
+        return errors
+
+    def match(self, info):
+        if not self.buckets: return None
+        exe, cls, title = (info.exe or '').lower(), (info.cls or '').lower(), info.title or ''
+        folded = title.casefold()
+        best = None  # (顺序, 配置)
+        for key in {(exe, cls), (exe, ''), ('', cls), ('', '')}:
+            rules = self.buckets.get(key)
+            if rules is None: continue
+            found = rules.match(title, folded, best[0] if best else math.inf)
+            if found: best = found
+        return best[1] if best else None
+
+
+class WindowRegistry:
+    """在后台线程中维护以hwnd为键的顶层窗口表，并把窗口的创建、销毁、改名与显隐变化成批发布给界面。
+    窗口类名与进程号在窗口的生命周期内不变，只在首次发现时读取一次。"""
+
+    def __init__(self, process_cache, interval_ms=WINDOW_REGISTRY_INTERVAL_MS):
+        self.process_cache = process_cache
+        self.interval_ms = interval_ms
+        self.windows = {}  # hwnd -> WindowInfo
+        self.lock = threading.Lock()
+        self.events = queue.Queue()  # 每次扫描发布一批 [(事件名, WindowInfo副本), ...]
+        self.wake_event = threading.Event()
+        self.running = False
+        self.thread = None
+        self.scan_count = 0
+
+    def start(self):
+        if self.running: return
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        self.wake_event.set()
+
+    def refresh_now(self):
+        """请求立即重新扫描，不阻塞调用方。"""
+        self.wake_event.set()
+
+    def get(self, hwnd):
+        with self.lock:
+            info = self.windows.get(hwnd)
+            return info.copy() if info else None
+
+    def snapshot(self):
+        with self.lock:
+            return {hwnd: info.copy() for hwnd, info in self.windows.items()}
+
+    def _run(self):
+        while self.running:
+            try:
+                self.scan()
+            except Exception as e:
+                print(f"Error scanning windows: {e}")
+            self.wake_event.wait(self.interval_ms / 1000)
+            self.wake_event.clear()
+
+    def scan(self):
+        """枚举一次顶层窗口，与上次的结果对比并发布变化。"""
+        seen = {}
+
+        def collect(hwnd, _):
+            title = win32gui.GetWindowText(hwnd)
+            if title: seen[hwnd] = (title, bool(win32gui.IsWindowVisible(hwnd)))
+
+        win32gui.EnumWindows(collect, None)
+
+        events = []
+        with self.lock:
+            for hwnd in self.windows.keys() - seen.keys():
+                events.append(('destroyed', self.windows.pop(hwnd)))
+            live_pids = {info.pid for info in self.windows.values()}
+            for hwnd, (title, visible) in seen.items():
+                info = self.windows.get(hwnd)
+                if info is None:
+                    try:
+                        cls = win32gui.GetClassName(hwnd)
+                        _, pid = win32process.GetWindowThreadProcessId(hwnd)
+                    except Exception:
+                        continue  # 窗口在枚举期间已销毁
+                    # 每个新窗口只查一次进程信息，同一进程的其他窗口直接命中缓存；
+                    # 该进程号此前已没有窗口时，进程可能已退出且进程号被复用，需校验启动时间
+                    process = self.process_cache.get(pid, verify=pid not in live_pids)
+                    live_pids.add(pid)
+                    info = WindowInfo(hwnd, title, cls, pid, process.exe, visible)
+                    self.windows[hwnd] = info
+                    events.append(('created', info))
+                else:
+                    if title != info.title:
+                        info.title = title
+                        events.append(('retitled', info))
+                    if visible != info.visible:
+                        info.visible = visible
+                        events.append(('shown' if visible else 'hidden', info))
+                if visible:
+                    try:
+                        info.rect = win32gui.GetWindowRect(hwnd)
+                    except Exception:
+                        pass
+            # 发布副本，避免界面线程读到正在被修改的记录
+            events = [(kind, info.copy()) for kind, info in events]
+        if any(kind == 'destroyed' for kind, _ in events): self.process_cache.retain(live_pids)
+        if events or self.scan_count == 0: self.events.put(events)
+        self.scan_count += 1
+
+
 class App:
     """应用程序主界面和逻辑"""
 
@@ -197,32 +1709,62 @@ class App:
         # 初始化状态变量
         self.is_fully_initialized = False
         self.is_closing = False
-        self.monitor = None
-        self.windows_map = {}
+        self.monitor_manager = MonitorManager()
+        self.last_monitored_windows = []  # 上次退出时正在监控的窗口设置
+        self.restored_window_settings = {}  # hwnd -> 预选窗口的已保存设置
+        self.profiles = []  # 自动附加配置，按优先级排序
+        self.profile_matcher = ProfileMatcher()
+        self.profile_attached = set()  # 已被自动附加过的窗口，用户停止监控后不再重复附加
+        self.process_cache = ProcessInfoCache()
+        self.window_registry = WindowRegistry(self.process_cache)
+        self.window_index = WindowIndex()  # 由注册表事件在界面线程中维护
+        self.has_window_snapshot = False  # 是否已收到注册表的第一批窗口
+        self.list_hwnds = []  # 列表框每一行对应的窗口句柄
+        self.list_titles = {}  # hwnd -> 列表框中显示的标题
+        self.list_rows = None  # hwnd -> 行号，列表变动后按需重建
+        self.list_orders = []  # 每一行窗口在 window_index 中的序号，保持升序
+        self.search_index = WindowSearchIndex()
+        self.last_filter_ms = 0.0  # 最近一次过滤耗时（毫秒）
         self.selected_hwnd_by_mouse = None
-        self.triggers = {}
+        # 所有快捷键共用一个键盘钩子，回调交给界面线程执行
+        self.hotkey_matcher = HotkeyMatcher(lambda callback: self.root.after(0, callback), self.hotkey_scope_active)
+        self.trigger_hotkeys = {}  # 动作名 -> 已绑定的 (快捷键, 作用范围)，用于求差
+        self.trigger_stats = {'reconciles': 0, 'binding_ops': 0, 'last_binding_ops': 0}  # 快捷键的绑定/解绑次数
         self.mouse_button_callbacks = {}
-        self.gesture_handlers = {}
+        self.mouse_dispatch = {}  # (事件类型, 按键, 方向) -> [订阅者]，由 compile_mouse_dispatch 生成
+        self.click_trackers = []  # 区分单击与双击的跟踪器，重新编译分发表时取消尚未触发的单击
+        self.gesture_handlers = {}  # 手势触发按键 -> GestureHandler
+        self.gesture_recognizer = GestureRecognizer()
+        self.gesture_recorder = None  # 录制自定义手势时临时使用的处理器
+        self.recording_gesture_name = None
         self.is_recording_hotkey = False
         self.tray_icon = None
         self.tray_thread = None
+        self.tray_shown = (None, None, None)  # 托盘上当前显示的 (图片, 提示文字, 菜单状态)
+        self.tray_last_update = float('-inf')
+        self.tray_stats = {'updates': 0, 'deferred': 0, 'menu_updates': 0}  # 托盘图标的实际更新与推迟次数
         self.is_capturing_click = False  # 鼠标监听标签
-        self.temp_icon_path = None # 临时图标路径
+        self.icon_cache = IconCache()
+        self.window_icon_photos = []  # 标题栏图标的PhotoImage，需保留引用以免被回收
 
         # 初始化国际化(i18n)系统
         self.language_var = tk.StringVar(value='zh')
         self.i18n = self.get_language_definitions()
 
         # 定义Combobox的内部值和映射
-        self.mb_values = ['middle_click', 'wheel_up', 'wheel_down']
+        self.mb_values = list(MOUSE_BUTTON_TRIGGERS)
+        self.kb_scope_values = ['global', 'monitored']
         self.mg_trigger_values = ['middle', 'right']
-        self.mg_pattern_values = ['swipe_right', 'swipe_left', 'swipe_up', 'swipe_down']
+        self.mg_pattern_values = self.gesture_recognizer.pattern_names()
 
         # 初始化其他设置
-        self.tray_icon_path_var = tk.StringVar(value='icon.ico')
+        self.tray_icon_path_var = tk.StringVar(value='')
 
         # 用于鼠标事件的线程安全队列
-        self.mouse_event_queue = queue.Queue()
+        self.mouse_event_queue = MouseEventQueue()
+        self.config_store = ConfigStore()
+        self.saved_transparency = {}  # 上一份快照中的透明度设置，输入框内容无效时沿用
+        self.save_after_id = None
 
         self.setup_ui()
         self.load_settings()
@@ -235,23 +1777,23 @@ class App:
         self.language_var.trace_add('write', self.on_language_change)
         self.update_ui_text()  # 应用加载的或默认的语言
 
-        self.selected_label.config(text=self._('status_refreshing_list'))
-        self.root.update_idletasks()
+        # 设置变化后自动保存（加载完成后才开始跟踪）
+        self.config_store.start()
+        for var in self.settings_vars(): var.trace_add('write', self.request_save)
 
-        self.refresh_windows()
+        # 窗口列表由后台注册表填充，收到第一批窗口后再预选上次监控的窗口
+        self.selected_label.config(text=self._('status_refreshing_list'))
+        self.window_registry.start()
+        self.process_registry_events()
 
         self.is_fully_initialized = True
         self.setup_all_triggers()
         self.update_ui_states()
 
         # --- 启动永久的鼠标监听器和队列处理器 ---
-        mouse.hook(self.mouse_event_queue.put)
+        mouse.hook(self._on_mouse_hook)
         self.process_mouse_queue()
-
-        if hasattr(self, 'last_monitored_title') and self.last_monitored_title:
-            self.preselect_last_window(self.last_monitored_title)
-        else:
-            self.selected_label.config(text=self._('status_no_window_selected'))
+        self.process_monitor_notifications()
 
     def _(self, key, **kwargs):
         """获取当前语言的文本。"""
@@ -263,32 +1805,12 @@ class App:
         self.update_ui_text()
 
     def update_window_icon(self, *args):
-        """根据设置更新主窗口的标题栏图标。"""
-        # 清理上一个临时图标（如果存在）
-        if self.temp_icon_path and os.path.exists(self.temp_icon_path):
-            try:
-                os.remove(self.temp_icon_path)
-                self.temp_icon_path = None
-            except OSError as e:
-                print(f"Error removing old temp icon: {e}")
-
-        image = None
-        custom_icon_path = self.tray_icon_path_var.get()
-
-        if custom_icon_path and os.path.exists(custom_icon_path):
-            try:
-                image = Image.open(custom_icon_path)
-            except Exception as e:
-                print(f"Failed to load custom icon for window icon, using default: {e}")
-                image = self._create_default_icon_image()
-        else:
-            image = self._create_default_icon_image()
-
+        """根据设置更新主窗口的标题栏图标，直接使用缓存中的PNG数据，不再写入临时文件。"""
+        entry = self.icon_cache.get(self.tray_icon_path_var.get())
         try:
-            self.temp_icon_path = 'icon.ico'
-            image.save('icon.ico', format="ICO", sizes=[(64, 64)])
-            self.root.iconbitmap(self.temp_icon_path)
-
+            photos = [tk.PhotoImage(data=base64.b64encode(entry.png[size])) for size in ICON_SIZES]
+            self.root.iconphoto(True, *photos)
+            self.window_icon_photos = photos
         except Exception as e:
             print(f"Could not set window icon: {e}")
 
@@ -341,10 +1863,28 @@ class App:
 
         main_frame = self.scrollable_frame
 
+        # --- 窗口搜索 ---
+        search_frame = ttk.Frame(main_frame)
+        search_frame.pack(fill=tk.X, pady=(0, 5))
+        self.ui_elements['search_label'] = ttk.Label(search_frame)
+        self.ui_elements['search_label'].pack(side=tk.LEFT)
+        self.search_values = ['substring', 'fuzzy', 'process']
+        self.search_ui = {'mode_var': tk.StringVar(value='substring'), 'mode_reverse_map': {}}
+        search_mode_combo = ttk.Combobox(search_frame, state='readonly', width=8)
+        self.search_ui['mode_combo'] = search_mode_combo
+        search_mode_combo.pack(side=tk.RIGHT)
+        search_mode_combo.bind("<<ComboboxSelected>>",
+                               lambda e: self.on_combo_select(self.search_ui, 'mode_var', 'mode_reverse_map',
+                                                              e.widget.get()))
+        self.search_var = tk.StringVar()
+        ttk.Entry(search_frame, textvariable=self.search_var).pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+        self.search_var.trace_add('write', self.apply_window_filter)
+        self.search_ui['mode_var'].trace_add('write', self.apply_window_filter)
+
         # --- 窗口列表 ---
         list_container = ttk.Frame(main_frame)
         list_container.pack(fill=tk.BOTH, expand=True, pady=(0, 5))
-        self.window_list = tk.Listbox(list_container, width=50, height=10)
+        self.window_list = tk.Listbox(list_container, width=50, height=10, selectmode=tk.EXTENDED)
         list_scrollbar = ttk.Scrollbar(list_container, orient=tk.VERTICAL, command=self.window_list.yview)
         self.window_list.config(yscrollcommand=list_scrollbar.set)
         list_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
@@ -426,6 +1966,40 @@ class App:
                   command=lambda v: self.away_transparency_var.set(int(float(v))))
         self.ui_elements['away_transparency_scale'].pack(side=tk.RIGHT, fill=tk.X, expand=True)
 
+        fade_frame = ttk.Frame(settings_frame)
+        fade_frame.pack(fill=tk.X, expand=True, pady=2)
+        self.ui_elements['fade_duration_label'] = ttk.Label(fade_frame)
+        self.ui_elements['fade_duration_label'].pack(side=tk.LEFT)
+        self.fade_duration_var = tk.IntVar(value=150)
+        self.ui_elements['fade_duration_spin'] = ttk.Spinbox(fade_frame, from_=0, to=2000, increment=50, width=6,
+                                                             textvariable=self.fade_duration_var)
+        self.ui_elements['fade_duration_spin'].pack(side=tk.LEFT, padx=5)
+        self.ui_elements['fade_easing_label'] = ttk.Label(fade_frame)
+        self.ui_elements['fade_easing_label'].pack(side=tk.LEFT, padx=(10, 0))
+        self.easing_values = list(EASING_FUNCTIONS)
+        self.fade_ui = {'easing_var': tk.StringVar(value='ease_out'), 'easing_reverse_map': {}}
+        easing_combo = ttk.Combobox(fade_frame, state='readonly', width=10)
+        self.fade_ui['easing_combo'] = easing_combo
+        self.ui_elements['fade_easing_combo'] = easing_combo
+        easing_combo.pack(side=tk.LEFT, padx=5)
+        easing_combo.bind("<<ComboboxSelected>>",
+                          lambda e: self.on_combo_select(self.fade_ui, 'easing_var', 'easing_reverse_map',
+                                                         e.widget.get()))
+
+        hysteresis_frame = ttk.Frame(settings_frame)
+        hysteresis_frame.pack(fill=tk.X, expand=True, pady=2)
+        self.edge_margin_var = tk.IntVar(value=8)
+        self.hover_dwell_var = tk.IntVar(value=50)
+        self.away_dwell_var = tk.IntVar(value=150)
+        for key, var, limit, step in (('edge_margin', self.edge_margin_var, 100, 2),
+                                      ('hover_dwell', self.hover_dwell_var, 2000, 50),
+                                      ('away_dwell', self.away_dwell_var, 2000, 50)):
+            self.ui_elements[f'{key}_label'] = ttk.Label(hysteresis_frame)
+            self.ui_elements[f'{key}_label'].pack(side=tk.LEFT)
+            self.ui_elements[f'{key}_spin'] = ttk.Spinbox(hysteresis_frame, from_=0, to=limit, increment=step,
+                                                          width=5, textvariable=var)
+            self.ui_elements[f'{key}_spin'].pack(side=tk.LEFT, padx=(2, 8))
+
         options_frame = ttk.LabelFrame(transparency_tab, padding=(10, 5))
         self.ui_elements['monitor_options_frame'] = options_frame
         options_frame.pack(pady=10, fill=tk.X)
@@ -437,15 +2011,63 @@ class App:
         self.hide_taskbar_check = ttk.Checkbutton(options_frame, variable=self.hide_taskbar_var)
         self.ui_elements['hide_taskbar_check'] = self.hide_taskbar_check
         self.hide_taskbar_check.pack(anchor=tk.W)
+        self.event_driven_var = tk.BooleanVar(value=True)
+        self.event_driven_check = ttk.Checkbutton(options_frame, variable=self.event_driven_var)
+        self.ui_elements['event_driven_check'] = self.event_driven_check
+        self.event_driven_check.pack(anchor=tk.W)
+        self.auto_resume_var = tk.BooleanVar()
+        self.auto_resume_check = ttk.Checkbutton(options_frame, variable=self.auto_resume_var)
+        self.ui_elements['auto_resume_check'] = self.auto_resume_check
+        self.auto_resume_check.pack(anchor=tk.W)
 
         # --- 触发器标签页 ---
         self.hotkey_tab = ttk.Frame(self.settings_notebook, padding=10)
         self.ui_elements['hotkey_tab'] = self.hotkey_tab
         self.settings_notebook.add(self.hotkey_tab, text=self._('tab_triggers'))
-        self.trigger_actions = ['minimize_monitored_window', 'close_window', 'hide_tray', 'show_tray', 'exit_app']
+        self.trigger_actions = ['minimize_monitored_window', 'close_window', 'toggle_transparency', 'hide_tray',
+                                'show_tray', 'exit_app']
         for action_name in self.trigger_actions:
             self.create_trigger_ui(self.hotkey_tab, action_name)
 
+        # --- 自动附加配置标签页 ---
+        profiles_tab = ttk.Frame(self.settings_notebook, padding=10)
+        self.ui_elements['profiles_tab'] = profiles_tab
+        self.settings_notebook.add(profiles_tab, text=self._('tab_profiles'))
+        self.profile_list = tk.Listbox(profiles_tab, height=5, exportselection=False)
+        self.profile_list.pack(fill=tk.X)
+        self.profile_list.bind("<<ListboxSelect>>", self.on_profile_select)
+        self.profile_list.bind("<MouseWheel>", _on_list_mousewheel)
+        self.profile_ui = {}
+        form_frame = ttk.Frame(profiles_tab)
+        form_frame.pack(fill=tk.X, pady=5)
+        form_frame.grid_columnconfigure(1, weight=1)
+        for row, key in enumerate(('name', 'exe', 'class', 'title_regex')):
+            self.ui_elements[f'profile_{key}_label'] = ttk.Label(form_frame)
+            self.ui_elements[f'profile_{key}_label'].grid(row=row, column=0, sticky=tk.W, pady=1)
+            self.profile_ui[key] = tk.StringVar()
+            ttk.Entry(form_frame, textvariable=self.profile_ui[key]).grid(row=row, column=1, sticky=tk.EW, pady=1)
+        opacity_frame = ttk.Frame(profiles_tab)
+        opacity_frame.pack(fill=tk.X)
+        for key, default in (('hover', 100), ('away', 50)):
+            self.ui_elements[f'profile_{key}_label'] = ttk.Label(opacity_frame)
+            self.ui_elements[f'profile_{key}_label'].pack(side=tk.LEFT)
+            self.profile_ui[key] = tk.IntVar(value=default)
+            ttk.Spinbox(opacity_frame, from_=0, to=100, increment=5, width=5,
+                        textvariable=self.profile_ui[key]).pack(side=tk.LEFT, padx=(2, 8))
+        checks_frame = ttk.Frame(profiles_tab)
+        checks_frame.pack(fill=tk.X)
+        for key, default in (('always_on_top', False), ('hide_taskbar', False), ('enabled', True)):
+            self.profile_ui[key] = tk.BooleanVar(value=default)
+            self.ui_elements[f'profile_{key}_check'] = ttk.Checkbutton(checks_frame, variable=self.profile_ui[key])
+            self.ui_elements[f'profile_{key}_check'].pack(side=tk.LEFT, padx=(0, 8))
+        profile_buttons = ttk.Frame(profiles_tab)
+        profile_buttons.pack(pady=(5, 0))
+        for key, command in (('profile_from_window_button', self.fill_profile_from_window),
+                             ('profile_save_button', self.save_profile),
+                             ('profile_delete_button', self.delete_profile)):
+            self.ui_elements[key] = ttk.Button(profile_buttons, command=command)
+            self.ui_elements[key].pack(side=tk.LEFT, padx=5)
+
         # --- 控制按钮 ---
         control_frame = ttk.Frame(main_frame)
         control_frame.pack(fill=tk.X, pady=(10, 0))
@@ -464,6 +2086,7 @@ class App:
         self.settings_notebook.tab(self.ui_elements['general_tab'], text=self._('tab_general'))
         self.settings_notebook.tab(self.ui_elements['transparency_tab'], text=self._('tab_transparency'))
         self.settings_notebook.tab(self.ui_elements['hotkey_tab'], text=self._('tab_triggers'))
+        self.settings_notebook.tab(self.ui_elements['profiles_tab'], text=self._('tab_profiles'))
 
         # 更新通用设置页
         self.ui_elements['lang_frame'].config(text=self._('frame_language'))
@@ -479,9 +2102,25 @@ class App:
         self.ui_elements['transparency_settings_frame'].config(text=self._('frame_transparency'))
         self.ui_elements['hover_opacity_label'].config(text=self._('label_hover_opacity'))
         self.ui_elements['away_opacity_label'].config(text=self._('label_away_opacity'))
+        self.ui_elements['fade_duration_label'].config(text=self._('label_fade_duration'))
+        self.ui_elements['fade_easing_label'].config(text=self._('label_fade_easing'))
+        self._update_combobox_display(self.fade_ui, 'easing_combo', self.easing_values, 'easing_var')
+        self.ui_elements['edge_margin_label'].config(text=self._('label_edge_margin'))
+        self.ui_elements['hover_dwell_label'].config(text=self._('label_hover_dwell'))
+        self.ui_elements['away_dwell_label'].config(text=self._('label_away_dwell'))
         self.ui_elements['monitor_options_frame'].config(text=self._('frame_monitor_options'))
         self.ui_elements['always_on_top_check'].config(text=self._('check_always_on_top'))
         self.ui_elements['hide_taskbar_check'].config(text=self._('check_hide_taskbar'))
+        self.ui_elements['event_driven_check'].config(text=self._('check_event_driven'))
+        self.ui_elements['auto_resume_check'].config(text=self._('check_auto_resume'))
+
+        # 更新自动附加配置页
+        for key in ('name', 'exe', 'class', 'title_regex', 'hover', 'away'):
+            self.ui_elements[f'profile_{key}_label'].config(text=self._(f'label_profile_{key}'))
+        for key in ('always_on_top', 'hide_taskbar', 'enabled'):
+            self.ui_elements[f'profile_{key}_check'].config(text=self._(f'check_profile_{key}'))
+        for key in ('profile_from_window_button', 'profile_save_button', 'profile_delete_button'):
+            self.ui_elements[key].config(text=self._(f'button_{key[:-len("_button")]}'))
 
         # 更新触发器页
         for action_name in self.trigger_actions:
@@ -496,12 +2135,19 @@ class App:
             ui_map['mb_label'].config(text=self._('label_mouse_button'))
             ui_map['mg_trigger_label'].config(text=self._('label_gesture_trigger_key'))
             ui_map['mg_pattern_label'].config(text=self._('label_gesture_pattern'))
+            ui_map['mg_record_button'].config(text=self._('button_draw_gesture') if self.gesture_recorder
+                                              and self.recording_gesture_name == action_name
+                                              else self._('button_record_gesture'))
 
             # 更新Combobox的显示值
             self._update_combobox_display(ui_map, 'mb_combo', self.mb_values, 'mb_var')
+            self._update_combobox_display(ui_map, 'kb_scope_combo', self.kb_scope_values, 'kb_scope_var')
             self._update_combobox_display(ui_map, 'mg_trigger_combo', self.mg_trigger_values, 'mg_trigger_var')
             self._update_combobox_display(ui_map, 'mg_pattern_combo', self.mg_pattern_values, 'mg_pattern_var')
 
+        self.ui_elements['search_label'].config(text=self._('label_search'))
+        self._update_combobox_display(self.search_ui, 'mode_combo', self.search_values, 'mode_var')
+
         # 更新主按钮
         self.ui_elements['select_mouse_button'].config(text=self._('button_select_with_mouse'))
         self.ui_elements['refresh_button'].config(text=self._('button_refresh_list'))
@@ -512,14 +2158,11 @@ class App:
         # 更新状态标签，如果它已经有内容
         current_text = self.selected_label.cget("text")
         # 定义语言无关的前缀
-        monitoring_prefixes = (
-            self.i18n['en']['status_monitoring'].split(':')[0], self.i18n['zh']['status_monitoring'].split(':')[0])
         selected_prefixes = (
             self.i18n['en']['status_selected'].split(':')[0], self.i18n['zh']['status_selected'].split(':')[0])
 
-        if any(current_text.startswith(prefix) for prefix in monitoring_prefixes):
-            title = current_text.split(":")[-1].strip()
-            self.selected_label.config(text=self._('status_monitoring', title=title))
+        if self.monitor_manager.running:
+            self.update_monitoring_label()
         elif any(current_text.startswith(prefix) for prefix in selected_prefixes):
             title = current_text.split(":")[-1].strip()
             self.selected_label.config(text=self._('status_selected', title=title))
@@ -529,19 +2172,27 @@ class App:
         if combo_key in ui_map:
             combo = ui_map[combo_key]
             # 创建翻译后的显示列表
-            display_list = [self._(f'combo_{v}') for v in internal_values]
+            display_list = [self.combo_text(v) for v in internal_values]
             combo['values'] = display_list
+            # 同步显示值到内部值的反向映射，供选择事件使用
+            reverse_map = ui_map.setdefault(var_key.replace('_var', '_reverse_map'), {})
+            reverse_map.clear()
+            reverse_map.update(zip(display_list, internal_values))
 
             # 获取当前存储的内部值
             current_internal_value = ui_map[var_key].get()
             # 找到对应的显示值
             if current_internal_value in internal_values:
-                current_display_value = self._(f'combo_{current_internal_value}')
+                current_display_value = self.combo_text(current_internal_value)
                 combo.set(current_display_value)
             else:  # 如果值无效，则选择第一个
                 combo.current(0)
-                internal_val = ui_map['reverse_map'][combo.get()]
-                ui_map[var_key].set(internal_val)
+                ui_map[var_key].set(internal_values[0])
+
+    def combo_text(self, value):
+        """Combobox选项的显示文本；用户录制的手势没有固定的翻译键。"""
+        if value.startswith('custom_'): return self._('combo_custom_gesture', n=value[7:])
+        return self._(f'combo_{value}')
 
     def create_trigger_ui(self, parent, action_name):
         ui_map = {}
@@ -563,6 +2214,7 @@ class App:
         default_hotkeys = {
             'minimize_monitored_window': 'ctrl+alt+m',
             'close_window': 'ctrl+alt+c',
+            'toggle_transparency': 'ctrl+alt+w, t',
             'hide_tray': 'ctrl+alt+h',
             'show_tray': 'ctrl+alt+s',
             'exit_app': 'ctrl+alt+x'
@@ -595,6 +2247,15 @@ class App:
             side=tk.LEFT, padx=5)
         ui_map['kb_button'] = ttk.Button(kb_frame, command=lambda: self.start_hotkey_recording(action_name))
         ui_map['kb_button'].pack(side=tk.RIGHT)
+        # 快捷键的作用范围：全局，或仅在被监控窗口位于前台时生效（可覆盖同名的全局快捷键）
+        ui_map['kb_scope_var'] = tk.StringVar(value='global')
+        ui_map['kb_scope_reverse_map'] = {}
+        kb_scope_combo = ttk.Combobox(kb_frame, state='readonly', width=18)
+        ui_map['kb_scope_combo'] = kb_scope_combo
+        kb_scope_combo.pack(side=tk.RIGHT, padx=5)
+        kb_scope_combo.bind("<<ComboboxSelected>>",
+                            lambda e, u=ui_map: self.on_combo_select(u, 'kb_scope_var', 'kb_scope_reverse_map',
+                                                                     e.widget.get()))
 
         # 鼠标按键
         mb_frame = ttk.Frame(options_container)
@@ -634,6 +2295,8 @@ class App:
         mg_pattern_combo.bind("<<ComboboxSelected>>",
                               lambda e, u=ui_map: self.on_combo_select(u, 'mg_pattern_var', 'mg_pattern_reverse_map',
                                                                        e.widget.get()))
+        ui_map['mg_record_button'] = ttk.Button(mg_frame, command=lambda: self.start_gesture_recording(action_name))
+        ui_map['mg_record_button'].pack(side=tk.RIGHT)
 
         on_type_change()
 
@@ -642,19 +2305,29 @@ class App:
         internal_value = ui_map[reverse_map_key].get(selected_display_value)
         if internal_value:
             ui_map[var_key].set(internal_value)
-        self.setup_all_triggers()
+        if self.is_fully_initialized: self.setup_all_triggers()
 
     def on_list_select(self, event):
         selected_indices = self.window_list.curselection()
         if selected_indices:
             self.selected_hwnd_by_mouse = None
-            title = self.window_list.get(selected_indices[0])
+            title = "、".join(self.window_list.get(i) for i in selected_indices)
             self.selected_label.config(text=self._('status_selected', title=title))
 
+    def update_monitoring_label(self):
+        """根据当前监控中的窗口集合更新状态标签。"""
+        titles = [monitor.title for monitor in self.monitor_manager.snapshot()]
+        if len(titles) == 1:
+            self.selected_label.config(text=self._('status_monitoring', title=titles[0]))
+        else:
+            self.selected_label.config(text=self._('status_monitoring_many', count=len(titles),
+                                                   titles="、".join(titles)))
+
     def select_window_with_mouse(self):
         if self.is_capturing_click:
             return
         self.is_capturing_click = True
+        self.restored_window_settings.clear()
         self.selected_label.config(text=self._('status_clicking_to_select'))
         self.root.iconify()
         mouse.on_click(self._capture_click)
@@ -686,7 +2359,9 @@ class App:
                 self.root.after(50, self._handle_self_selection)
             else:
                 title = win32gui.GetWindowText(top_level_hwnd) or self._('untitled_window')
-                self.update_selection_by_mouse(top_level_hwnd, title)
+                _, pid = win32process.GetWindowThreadProcessId(top_level_hwnd)
+                exe = self.process_cache.get(pid).exe
+                self.update_selection_by_mouse(top_level_hwnd, f"{title} — {exe}" if exe else title)
         except Exception as e:
             print(f"Error during window capture logic: {e}")
 
@@ -694,6 +2369,11 @@ class App:
         self.selected_hwnd_by_mouse = hwnd
         self.selected_label.config(text=self._('status_selected', title=title))
         self.window_list.selection_clear(0, tk.END)
+        # 若该窗口在列表中，同时高亮其所在行
+        index = self.row_of(hwnd)
+        if index is not None:
+            self.window_list.selection_set(index)
+            self.window_list.see(index)
 
     def _handle_self_selection(self):
         messagebox.showwarning(self._('title_invalid_op'), self._('error_cannot_select_self'))
@@ -701,20 +2381,183 @@ class App:
         self.selected_hwnd_by_mouse = None
 
     def refresh_windows(self):
-        self.window_list.delete(0, tk.END)
-        self.windows_map.clear()
+        """请求后台注册表立即重新扫描，结果通过事件异步更新列表。"""
+        self.window_registry.refresh_now()
 
-        def enum_windows(hwnd, _):
-            if win32gui.IsWindowVisible(hwnd) and not is_self_window(hwnd):
-                title = win32gui.GetWindowText(hwnd)
-                if title:
-                    self.windows_map[title] = hwnd
-                    self.window_list.insert(tk.END, title)
+    def process_registry_events(self):
+        """在Tk线程中应用窗口注册表发布的变化。"""
+        try:
+            while not self.window_registry.events.empty():
+                self.apply_window_events(self.window_registry.events.get_nowait())
+                if not self.has_window_snapshot:
+                    self.has_window_snapshot = True
+                    self.on_first_window_snapshot()
+        finally:
+            if not self.is_closing: self.root.after(100, self.process_registry_events)
+
+    def on_first_window_snapshot(self):
+        if self.last_monitored_windows:
+            self.preselect_last_windows(self.last_monitored_windows)
+            # 找回了上次的窗口且开启了自动恢复时，直接开始监控
+            if self.restored_window_settings and self.auto_resume_var.get(): self.start_monitoring()
+        elif not self.monitor_manager.running:
+            self.selected_label.config(text=self._('status_no_window_selected'))
 
-        win32gui.EnumWindows(enum_windows, None)
+    def is_listable(self, info):
+        """可见、有标题且不属于本程序的窗口才显示在列表中。"""
+        return info.visible and bool(info.title) and info.pid != MY_PID
+
+    def matches_filter(self, hwnd):
+        query = self.search_var.get().strip()
+        return not query or self.search_index.matches(hwnd, query, self.search_ui['mode_var'].get())
+
+    def apply_window_events(self, events):
+        """根据注册表事件只插入、删除或改名发生变化的行，保留用户的选择与滚动位置。"""
+        previous_state = self.window_list.cget('state')
+        self.window_list.config(state=tk.NORMAL)
+        candidates = []  # 可能需要自动附加的窗口
+        for kind, info in events:
+            if kind == 'destroyed':
+                self.window_index.remove(info.hwnd)
+                self.search_index.remove(info.hwnd)
+                self.profile_attached.discard(info.hwnd)
+            else:
+                self.window_index.put(info)
+                if kind != 'shown' and kind != 'hidden': self.search_index.put(info.hwnd, info.title, info.exe)
+                if kind != 'hidden': candidates.append(info)
+            self._sync_row(info.hwnd)
+        self.window_list.config(state=previous_state)
+        if candidates and self.profile_matcher.profiles: self.auto_attach(candidates)
+
+    def auto_attach(self, infos):
+        """按自动附加配置开始监控新出现（或改名后才符合条件）的窗口。"""
+        attached = False
+        for info in infos:
+            if info.hwnd in self.profile_attached or info.hwnd in self.monitor_manager.monitors: continue
+            if not self.is_listable(info): continue
+            profile = self.profile_matcher.match(info)
+            if profile is None: continue
+            self.profile_attached.add(info.hwnd)
+            self.apply_monitor_options()
+            try:
+                self.create_monitor(info.hwnd, dict(profile, profile=profile.get('name')))
+                attached = True
+            except Exception as e:
+                print(f"Failed to attach profile '{profile.get('name')}' to '{info.title}': {e}")
+        if attached:
+            self.setup_all_triggers()
+            self.update_ui_states()
+            self.update_monitoring_label()
+
+    def _sync_row(self, hwnd):
+        """让单个窗口在列表中的行与其当前状态及过滤条件保持一致。"""
+        info = self.window_index.get(hwnd)
+        listed = hwnd in self.list_titles
+        should_list = info is not None and self.is_listable(info) and self.matches_filter(hwnd)
+        if listed and not should_list:
+            self._list_remove(hwnd)
+        elif should_list and not listed:
+            self._list_insert(hwnd, self.row_text(info))
+        elif listed and self.list_titles[hwnd] != self.row_text(info):
+            self._list_retitle(hwnd, self.row_text(info))
+
+    @staticmethod
+    def row_text(info):
+        """列表中显示的行文本：标题 — 可执行文件名。"""
+        return f"{info.title} — {info.exe}" if info.exe else info.title
+
+    def apply_window_filter(self, *args):
+        """按搜索框内容过滤列表：借助索引算出匹配集合，再批量增删有变化的行。
+        相邻的待删除行一次删除，落在同一位置的新行一次插入；变化过于分散时整表重建，
+        因此每次按键的 Tk 调用次数不随变化的行数增长。"""
+        start = time.perf_counter()
+        query = self.search_var.get().strip()
+        if query:
+            matched = self.search_index.search(query, self.search_ui['mode_var'].get())
+        else:
+            matched = self.window_index.by_hwnd.keys()
+        removed = [index for index, hwnd in enumerate(self.list_hwnds) if hwnd not in matched]
+        new_rows = []  # (序号, hwnd, 标题)
+        for hwnd in matched:
+            if hwnd in self.list_titles: continue
+            info = self.window_index.get(hwnd)
+            if info is not None and self.is_listable(info):
+                new_rows.append((self.window_index.order[hwnd], hwnd, self.row_text(info)))
+        if not removed and not new_rows:
+            self.last_filter_ms = (time.perf_counter() - start) * 1000
+            return
+        new_rows.sort()
+        removed_set = set(removed)
+        orders, hwnds, groups = merge_list_rows(
+            [order for index, order in enumerate(self.list_orders) if index not in removed_set],
+            [hwnd for index, hwnd in enumerate(self.list_hwnds) if index not in removed_set], new_rows)
+        runs = contiguous_runs(removed)
+        for index in removed: del self.list_titles[self.list_hwnds[index]]
+        for _, hwnd, title in new_rows: self.list_titles[hwnd] = title
+        previous_state = self.window_list.cget('state')
+        self.window_list.config(state=tk.NORMAL)
+        if len(runs) + len(groups) > WINDOW_LIST_MAX_SEGMENTS:
+            self._list_rebuild(hwnds)
+        else:
+            for first, last in reversed(runs): self.window_list.delete(first, last)  # 从后往前，前面的行号不变
+            for index, titles in groups: self.window_list.insert(index, *titles)
+        self.window_list.config(state=previous_state)
+        self.list_orders, self.list_hwnds, self.list_rows = orders, hwnds, None
+        self.last_filter_ms = (time.perf_counter() - start) * 1000
+
+    def _list_rebuild(self, hwnds):
+        """用新的行替换整个列表：仍在列表中的已选窗口保持选中，原先最上方可见的保留行仍滚动到顶部。"""
+        rows = {hwnd: index for index, hwnd in enumerate(hwnds)}
+        selected = [rows[self.list_hwnds[index]] for index in self.window_list.curselection()
+                    if self.list_hwnds[index] in rows]
+        top = next((hwnd for hwnd in self.list_hwnds[max(0, self.window_list.nearest(0)):] if hwnd in rows), None)
+        self.window_list.delete(0, tk.END)
+        self.window_list.insert(0, *[self.list_titles[hwnd] for hwnd in hwnds])
+        for first, last in contiguous_runs(sorted(selected)): self.window_list.selection_set(first, last)
+        if top is not None: self.window_list.yview(rows[top])
+
+    def row_of(self, hwnd):
+        """返回窗口在列表中的行号，不在列表中时返回None。"""
+        if self.list_rows is None:
+            self.list_rows = {row_hwnd: index for index, row_hwnd in enumerate(self.list_hwnds)}
+        return self.list_rows.get(hwnd)
+
+    def _list_insert(self, hwnd, title):
+        """按窗口首次出现的顺序插入一行，新窗口总是追加在末尾。"""
+        order = self.window_index.order[hwnd]
+        index = bisect.bisect(self.list_orders, order)
+        self.window_list.insert(index, title)
+        self.list_orders.insert(index, order)
+        self.list_hwnds.insert(index, hwnd)
+        self.list_titles[hwnd] = title
+        if index == len(self.list_hwnds) - 1:
+            if self.list_rows is not None: self.list_rows[hwnd] = index
+        else:
+            self.list_rows = None  # 之后的行号都已变化
+
+    def _list_remove(self, hwnd):
+        self._list_delete_row(self.row_of(hwnd))
+
+    def _list_delete_row(self, index):
+        hwnd = self.list_hwnds[index]
+        self.window_list.delete(index)
+        del self.list_hwnds[index]
+        del self.list_orders[index]
+        del self.list_titles[hwnd]
+        self.list_rows = None  # 之后的行号都已变化
+
+    def _list_retitle(self, hwnd, title):
+        """原地替换一行的标题，并恢复其选中状态。"""
+        index = self.row_of(hwnd)
+        was_selected = self.window_list.selection_includes(index)
+        self.window_list.delete(index)
+        self.window_list.insert(index, title)
+        if was_selected: self.window_list.selection_set(index)
+        self.list_titles[hwnd] = title
 
     def check_for_duplicate_triggers(self):
         trigger_map = {}
+        hotkeys = []  # (步骤元组, 动作名称)，用于检查前缀冲突
         for name in self.trigger_actions:
             if hasattr(self, f"trigger_ui_{name}"):
                 ui_map = getattr(self, f"trigger_ui_{name}")
@@ -723,9 +2566,11 @@ class App:
                 action_label = self._(f'frame_trigger_{name}')
 
                 if trigger_type == 'keyboard':
-                    value = ui_map['kb_var'].get();
+                    steps = parse_hotkey(ui_map['kb_var'].get())
+                    # 作用范围不同的相同快捷键可以共存，范围更小的优先
                     trigger_config = (
-                        self._('radio_keyboard'), value) if value else None
+                        self._('radio_keyboard'), format_hotkey(steps), ui_map['kb_scope_var'].get()) if steps else None
+                    if steps: hotkeys.append((steps, action_label))
                 elif trigger_type == 'mouse_button':
                     value = ui_map['mb_var'].get();
                     trigger_config = (
@@ -742,6 +2587,13 @@ class App:
 
         conflicts = [f"- {cfg[0]} '{cfg[1]}' " + self._('conflict_used_for') + " " + "、".join(f"“{a}”" for a in acts)
                      for cfg, acts in trigger_map.items() if len(acts) > 1]
+        # 一个快捷键是另一个序列的前缀时，较长的序列永远无法触发
+        for steps, action_label in hotkeys:
+            for other_steps, other_label in hotkeys:
+                if len(steps) < len(other_steps) and other_steps[:len(steps)] == steps:
+                    conflicts.append(f"- {self._('radio_keyboard')} '{format_hotkey(steps)}' "
+                                     + self._('conflict_prefix_of', longer=format_hotkey(other_steps))
+                                     + " " + "、".join(f"“{a}”" for a in (action_label, other_label)))
 
         if conflicts:
             return self._('error_conflict_header') + "\n\n" + "\n".join(conflicts)
@@ -753,10 +2605,10 @@ class App:
             messagebox.showerror(self._('title_conflict'), conflict_message)
             return
 
-        hwnd_to_monitor = None
+        hwnds_to_monitor = []
         if self.selected_hwnd_by_mouse:
             if win32gui.IsWindow(self.selected_hwnd_by_mouse):
-                hwnd_to_monitor = self.selected_hwnd_by_mouse
+                hwnds_to_monitor.append(self.selected_hwnd_by_mouse)
             else:
                 messagebox.showwarning(self._('title_warning'), self._('error_window_closed'))
                 self.selected_hwnd_by_mouse = None
@@ -765,63 +2617,173 @@ class App:
         else:
             selected_indices = self.window_list.curselection()
             if selected_indices:
-                hwnd_to_monitor = self.windows_map.get(self.window_list.get(selected_indices[0]))
+                hwnds_to_monitor = [self.list_hwnds[i] for i in selected_indices]
             else:
                 messagebox.showwarning(self._('title_warning'), self._('error_select_window_first'))
                 return
 
-        if not hwnd_to_monitor or not win32gui.IsWindow(hwnd_to_monitor):
+        if not all(hwnd and win32gui.IsWindow(hwnd) for hwnd in hwnds_to_monitor):
             messagebox.showerror(self._('title_error'), self._('error_invalid_handle'))
             self.refresh_windows()
             return
 
-        if is_self_window(hwnd_to_monitor):
+        if any(is_self_window(hwnd) for hwnd in hwnds_to_monitor):
             messagebox.showerror(self._('title_invalid_op'), self._('error_cannot_monitor_self'))
             return
 
+        self.apply_monitor_options()
+        for hwnd in hwnds_to_monitor:
+            # 从配置恢复的窗口沿用其已保存的透明度设置，其余窗口使用当前滑块的值
+            saved = self.restored_window_settings.pop(hwnd, {})
+            try:
+                self.create_monitor(hwnd, saved)
+            except Exception as e:
+                messagebox.showerror(self._('title_start_failed'), self._('error_start_failed').format(e=e))
+        self.setup_all_triggers()
+        self.update_ui_states()
+        if self.monitor_manager.running: self.update_monitoring_label()
+        self.request_save()
+
+    def apply_monitor_options(self):
+        """把界面上的检测方式与渐变设置应用到监控管理器。"""
+        self.monitor_manager.event_driven = self.event_driven_var.get()
+        self.monitor_manager.fade_engine.duration_ms = self.get_spin_value(self.fade_duration_var,
+                                                                           self.monitor_manager.fade_engine.duration_ms)
+        self.monitor_manager.fade_engine.easing = self.fade_ui['easing_var'].get()
+
+    def create_monitor(self, hwnd, saved):
+        """按给定的窗口设置开始监控，缺少的项使用界面上的当前值。"""
+        # 再次监控同一窗口时先恢复其原始样式，以便按新设置重新应用
+        self.monitor_manager.remove(hwnd)
+        monitor = WindowMonitor(hwnd, self.root,
+                                saved.get('always_on_top', self.always_on_top_var.get()),
+                                saved.get('away', self.away_transparency_var.get()),
+                                saved.get('hover', self.hover_opacity_var.get()),
+                                saved.get('hide_taskbar', self.hide_taskbar_var.get()),
+                                saved.get('edge_margin', self.get_spin_value(self.edge_margin_var, 8)),
+                                saved.get('hover_dwell_ms', self.get_spin_value(self.hover_dwell_var, 50)),
+                                saved.get('away_dwell_ms', self.get_spin_value(self.away_dwell_var, 150)),
+                                self.process_cache.get(win32process.GetWindowThreadProcessId(hwnd)[1]).exe)
+        monitor.profile = saved.get('profile')
+        self.monitor_manager.add(monitor)
+        return monitor
+
+    def on_profile_select(self, event):
+        selected = self.profile_list.curselection()
+        if not selected: return
+        profile = self.profiles[selected[0]]
+        for key in ('name', 'exe', 'class', 'title_regex'): self.profile_ui[key].set(profile.get(key, ''))
+        for key, default in (('hover', 100), ('away', 50), ('always_on_top', False), ('hide_taskbar', False),
+                             ('enabled', True)):
+            self.profile_ui[key].set(profile.get(key, default))
+
+    def fill_profile_from_window(self):
+        """用窗口列表中选中的窗口填写匹配条件。"""
+        selected = self.window_list.curselection()
+        info = self.window_index.get(self.list_hwnds[selected[0]]) if selected else None
+        if info is None:
+            messagebox.showwarning(self._('title_warning'), self._('error_select_window_first'))
+            return
+        self.profile_ui['exe'].set(info.exe)
+        self.profile_ui['class'].set(info.cls)
+        self.profile_ui['title_regex'].set(re.escape(info.title))
+        if not self.profile_ui['name'].get(): self.profile_ui['name'].set(info.exe or info.title)
+
+    def save_profile(self):
+        """按名称新增或更新配置。"""
+        name = self.profile_ui['name'].get().strip()
+        if not name:
+            messagebox.showerror(self._('title_profile_error'), self._('error_profile_name'))
+            return
+        profile = {'name': name}
+        for key in ('exe', 'class', 'title_regex'): profile[key] = self.profile_ui[key].get().strip()
+        for key, fallback in (('hover', 100), ('away', 50)):
+            profile[key] = min(100, self.get_spin_value(self.profile_ui[key], fallback))
+        for key in ('always_on_top', 'hide_taskbar', 'enabled'): profile[key] = self.profile_ui[key].get()
+        existing = next((i for i, p in enumerate(self.profiles) if p.get('name') == name), None)
+        if existing is None:
+            self.profiles.append(profile)
+        else:
+            # 保留只能在配置文件中设置的项（如配置专属的快捷键）
+            self.profiles[existing] = dict(self.profiles[existing], **profile)
+        self.on_profiles_changed()
+
+    def delete_profile(self):
+        selected = self.profile_list.curselection()
+        if not selected: return
+        del self.profiles[selected[0]]
+        self.on_profiles_changed()
+
+    def on_profiles_changed(self, show_errors=True):
+        """重新编译匹配器并刷新列表，然后对现有窗口执行一次自动附加。"""
+        errors = self.profile_matcher.compile(self.profiles)
+        if errors and show_errors:
+            messagebox.showerror(self._('title_profile_error'), "\n".join(
+                self._('error_profile_pattern', name=name, e=e) for name, e in errors))
+        self.profile_list.delete(0, tk.END)
+        for profile in self.profiles:
+            self.profile_list.insert(tk.END, profile.get('name', ''))
+        if not self.is_fully_initialized: return
+        self.setup_all_triggers()
+        self.request_save()
+        self.auto_attach(list(self.window_index.by_hwnd.values()))
+
+    def get_spin_value(self, var, fallback):
+        """读取数值输入框，输入无效时恢复为给定的值。"""
         try:
-            self.monitor = WindowMonitor(hwnd_to_monitor, self.root, self.always_on_top_var.get(),
-                                         self.away_transparency_var.get(), self.hover_opacity_var.get(),
-                                         self.hide_taskbar_var.get())
-            self.monitor.start_monitoring()
-            self.setup_all_triggers()
-            self.update_ui_states()
-            title = win32gui.GetWindowText(hwnd_to_monitor)
-            self.selected_label.config(text=self._('status_monitoring', title=title))
-        except Exception as e:
-            messagebox.showerror(self._('title_start_failed'), self._('error_start_failed').format(e=e))
-            if self.monitor: self.monitor.stop_monitoring(); self.monitor = None
-            self.update_ui_states()
+            return max(0, var.get())
+        except tk.TclError:
+            var.set(fallback)
+            return fallback
+
+    @staticmethod
+    def peek_spin_value(var):
+        """读取数值输入框但不改写界面，输入无效（例如正在输入时为空）时返回None。"""
+        try:
+            return max(0, var.get())
+        except tk.TclError:
+            return None
 
     def stop_monitoring_ui(self):
-        if self.monitor: self.monitor.stop_monitoring(); self.monitor = None
+        self.monitor_manager.stop_all()
+        # 用户停止监控后不再保留启动时读取的窗口集合，否则下次启动会恢复已停止的窗口
+        self.last_monitored_windows = []
         self.setup_all_triggers()
         self.update_ui_states()
         self.selected_label.config(text=self._('status_stopped'))
+        self.request_save()
 
-    def handle_window_closed(self):
-        messagebox.showinfo(self._('title_info'), self._('info_window_closed'))
-        self.stop_monitoring_ui()
+    def handle_window_closed(self, title=''):
+        messagebox.showinfo(self._('title_info'), self._('info_window_closed', title=title))
+        if self.monitor_manager.running:
+            self.update_monitoring_label()
+        else:
+            self.stop_monitoring_ui()
 
     def update_ui_states(self):
-        is_monitoring = self.monitor is not None and self.monitor.running
+        is_monitoring = self.monitor_manager.running
         is_recording = self.is_recording_hotkey
-        general_state = tk.DISABLED if is_monitoring or is_recording else tk.NORMAL
+        # 监控期间仍可继续选取窗口并加入监控，仅在录制快捷键时禁用
+        general_state = tk.DISABLED if is_recording else tk.NORMAL
 
         self.ui_elements['start_button'].config(state=general_state)
         self.ui_elements['stop_button'].config(state=tk.NORMAL if is_monitoring and not is_recording else tk.DISABLED)
 
         self.ui_elements['tray_button'].config(state=tk.DISABLED if is_recording else tk.NORMAL)
-        for widget_key in ['refresh_button', 'select_mouse_button', 'always_on_top_check', 'hide_taskbar_check']:
+        for widget_key in ['refresh_button', 'select_mouse_button', 'always_on_top_check', 'hide_taskbar_check',
+                           'event_driven_check', 'auto_resume_check']:
             self.ui_elements[widget_key].config(state=general_state)
         self.window_list.config(state=general_state)
 
         # transparency_settings_frame
-        opacity_controls_state = tk.DISABLED if is_recording or is_monitoring else tk.NORMAL
+        opacity_controls_state = tk.DISABLED if is_recording else tk.NORMAL
         self.ui_elements['hover_opacity_label'].config(state=opacity_controls_state)
         self.ui_elements['away_opacity_label'].config(state=opacity_controls_state)
         self.ui_elements['hover_opacity_scale'].config(state=opacity_controls_state)
         self.ui_elements['away_transparency_scale'].config(state=opacity_controls_state)
+        for widget_key in ['fade_duration_spin', 'edge_margin_spin', 'hover_dwell_spin', 'away_dwell_spin']:
+            self.ui_elements[widget_key].config(state=opacity_controls_state)
+        self.ui_elements['fade_easing_combo'].config(state='readonly' if opacity_controls_state == tk.NORMAL else tk.DISABLED)
 
         for action_name in self.trigger_actions:
             ui_map = getattr(self, f"trigger_ui_{action_name}", {})
@@ -844,12 +2806,41 @@ class App:
 
     def record_hotkey_worker(self):
         try:
-            new_hotkey = keyboard.read_hotkey(suppress=False)
+            new_hotkey = self.hotkey_matcher.record()
             self.root.after(0, self.stop_hotkey_recording, new_hotkey)
         except Exception as e:
             print(f"Error reading hotkey: {e}")
             self.root.after(0, self.stop_hotkey_recording, None)
 
+    def start_gesture_recording(self, action_name):
+        """录制一个自定义手势：用当前选择的手势按键画出笔画后，将其保存为新模板并绑定到该动作。
+        录制过程中再次点击按钮则取消。"""
+        ui_map = getattr(self, f"trigger_ui_{action_name}")
+        if self.gesture_recorder:
+            self.gesture_recorder = None
+            getattr(self, f"trigger_ui_{self.recording_gesture_name}")['mg_record_button'].config(
+                text=self._('button_record_gesture'))
+            if self.recording_gesture_name == action_name:
+                self.compile_mouse_dispatch()
+                return
+        self.recording_gesture_name = action_name
+        self.gesture_recorder = GestureHandler(self, ui_map['mg_trigger_var'].get(),
+                                               lambda points: self.stop_gesture_recording(action_name, points))
+        ui_map['mg_record_button'].config(text=self._('button_draw_gesture'))
+        self.compile_mouse_dispatch()
+
+    def stop_gesture_recording(self, action_name, points):
+        self.gesture_recorder = None
+        ui_map = getattr(self, f"trigger_ui_{action_name}")
+        name = self.gesture_recognizer.next_custom_name()
+        if self.gesture_recognizer.add_template(name, points, custom=True):
+            self.mg_pattern_values = self.gesture_recognizer.pattern_names()
+            ui_map['mg_pattern_var'].set(name)
+        # 刷新所有动作的手势下拉列表与按钮文本
+        self.update_ui_text()
+        self.setup_all_triggers()
+        self.request_save()
+
     def stop_hotkey_recording(self, new_hotkey):
         action_name = self.recording_key_name
         ui_map = getattr(self, f"trigger_ui_{action_name}")
@@ -859,56 +2850,147 @@ class App:
         self.setup_all_triggers()
         self.update_ui_states()
 
+    def _on_mouse_hook(self, event):
+        """运行在鼠标钩子线程：移动事件直接交给监控线程，所有事件再经队列过滤、合并后供界面线程处理触发器。"""
+        if isinstance(event, mouse.MoveEvent): self.monitor_manager.on_mouse_move(event.x, event.y)
+        self.mouse_event_queue.put(event)
+
+    def process_monitor_notifications(self):
+        """在Tk线程中处理监控线程发来的通知。"""
+        try:
+            while not self.monitor_manager.notifications.empty():
+                kind, payload = self.monitor_manager.notifications.get_nowait()
+                if kind == 'window_closed': self.handle_window_closed(payload)
+            self.update_tray_state()
+        finally:
+            if not self.is_closing: self.root.after(50, self.process_monitor_notifications)
+
     def process_mouse_queue(self):
+        remaining = 0
         try:
-            while not self.mouse_event_queue.empty(): self._global_mouse_dispatcher(self.mouse_event_queue.get_nowait())
+            batch, remaining = self.mouse_event_queue.drain()
+            for event in batch: self._global_mouse_dispatcher(event)
         finally:
-            if not self.is_closing: self.root.after(20, self.process_mouse_queue)
+            # 还有积压时尽快处理下一批，同时让出界面线程
+            if not self.is_closing: self.root.after(1 if remaining else 20, self.process_mouse_queue)
 
     def _global_mouse_dispatcher(self, event):
-        for handler in self.gesture_handlers.values(): handler.handle_event(event)
-        if isinstance(event, mouse.WheelEvent):
-            cb_key = 'wheel_up' if event.delta > 0 else 'wheel_down'
-            if cb_key in self.mouse_button_callbacks: self.mouse_button_callbacks[cb_key]()
-        elif isinstance(event, mouse.ButtonEvent) and event.event_type == mouse.UP and event.button == mouse.MIDDLE:
-            if 'middle_click' in self.mouse_button_callbacks: self.mouse_button_callbacks['middle_click']()
+        for subscriber in self.mouse_dispatch.get(mouse_event_key(event), ()): subscriber(event)
 
     def setup_all_triggers(self):
-        self.remove_all_triggers()
+        """将界面上的触发器设置与当前已注册的触发器求差，只注册或注销发生变化的快捷键，
+        其余全局快捷键在此期间保持有效；仍在使用的手势处理器也会保留。"""
         actions = {'minimize_monitored_window': self.trigger_minimize_monitored_window,
-                   'close_window': self.trigger_force_close, 'hide_tray': self.hide_tray_icon,
-                   'show_tray': self.show_tray_icon_from_hotkey, 'exit_app': self.on_closing}
-        self.mouse_button_callbacks.clear()
-        self.gesture_handlers.clear()
+                   'close_window': self.trigger_force_close, 'toggle_transparency': self.trigger_toggle_transparency,
+                   'hide_tray': self.hide_tray_icon, 'show_tray': self.show_tray_icon_from_hotkey,
+                   'exit_app': self.on_closing}
+        desired_hotkeys = {}  # 动作名 -> (快捷键, 作用范围, 回调)
+        mouse_button_callbacks = {}
+        gesture_bindings = {}  # 手势触发按键 -> {手势名: 回调}
         for name, callback in actions.items():
-            if name in ['close_window', 'minimize_monitored_window'] and (
-                    self.monitor is None or not self.monitor.running): continue
+            if name in ['close_window', 'minimize_monitored_window', 'toggle_transparency'] \
+                    and not self.monitor_manager.running: continue
             ui_map = getattr(self, f"trigger_ui_{name}")
             trigger_type = ui_map['type_var'].get()
-            try:
-                if trigger_type == 'keyboard':
-                    hotkey = ui_map['kb_var'].get()
-                    if hotkey: self.triggers[f"{name}_kb"] = keyboard.add_hotkey(hotkey, callback, suppress=True)
-                elif trigger_type == 'mouse_button':
-                    self.mouse_button_callbacks[ui_map['mb_var'].get()] = callback
-                elif trigger_type == 'mouse_gesture':
-                    self.gesture_handlers[name] = GestureHandler(self, ui_map['mg_trigger_var'].get(),
-                                                                 ui_map['mg_pattern_var'].get(), callback)
-            except Exception as e:
-                messagebox.showerror(self._('title_trigger_error'), self._('error_set_trigger').format(name=name, e=e))
+            if trigger_type == 'keyboard':
+                hotkey = ui_map['kb_var'].get()
+                scope = ui_map['kb_scope_var'].get()
+                if hotkey: desired_hotkeys[name] = (hotkey, None if scope == 'global' else scope, callback)
+            elif trigger_type == 'mouse_button':
+                mouse_button_callbacks[ui_map['mb_var'].get()] = callback
+            elif trigger_type == 'mouse_gesture':
+                # 同一按键上的所有手势动作共用一个处理器
+                gesture_bindings.setdefault(ui_map['mg_trigger_var'].get(), {})[ui_map['mg_pattern_var'].get()] = callback
+        if self.monitor_manager.running:
+            # 配置专属的快捷键只在该配置附加的窗口位于前台时生效
+            for profile in self.profile_matcher.profiles:
+                for name, hotkey in profile.get('hotkeys', {}).items():
+                    if name in actions and hotkey:
+                        desired_hotkeys[f"{name}@{profile['name']}"] = (hotkey, f"profile:{profile['name']}",
+                                                                        actions[name])
+
+        # 所有快捷键都在同一个钩子的前缀树中匹配，绑定变化不再需要向系统注册或注销
+        binding_ops = 0
+        for name, spec in list(self.trigger_hotkeys.items()):
+            if desired_hotkeys.get(name, (None, None))[:2] != spec:
+                self.hotkey_matcher.unbind(name)
+                del self.trigger_hotkeys[name]
+                binding_ops += 1
+        for name, (hotkey, scope, callback) in desired_hotkeys.items():
+            if name in self.trigger_hotkeys: continue
+            if self.hotkey_matcher.bind(name, hotkey, callback, scope):
+                self.trigger_hotkeys[name] = (hotkey, scope)
+                binding_ops += 1
+            else:
+                messagebox.showerror(self._('title_trigger_error'),
+                                     self._('error_set_trigger').format(name=name, e=hotkey))
+        self.trigger_stats['reconciles'] += 1
+        self.trigger_stats['binding_ops'] += binding_ops
+        self.trigger_stats['last_binding_ops'] = binding_ops
+
+        self.mouse_button_callbacks = mouse_button_callbacks
+        for button in [button for button in self.gesture_handlers if button not in gesture_bindings]:
+            del self.gesture_handlers[button]
+        for button, bindings in gesture_bindings.items():
+            if button not in self.gesture_handlers: self.gesture_handlers[button] = GestureHandler(self, button)
+            self.gesture_handlers[button].bindings = bindings
+        self.compile_mouse_dispatch()
+
+    def compile_mouse_dispatch(self):
+        """把鼠标按键触发器与手势处理器编译为分发表，并告诉事件队列哪些事件需要入队。"""
+        dispatch = {}
+        clicks = {}  # 按键 -> {'single'/'double': 回调}
+        for trigger, callback in self.mouse_button_callbacks.items():
+            kind, button, direction = MOUSE_BUTTON_TRIGGERS[trigger]
+            if kind == 'click':
+                clicks.setdefault(button, {})[direction] = callback
+            else:
+                dispatch.setdefault((kind, button, direction), []).append(lambda event, cb=callback: cb())
+        for tracker in self.click_trackers: tracker.cancel()
+        self.click_trackers = []
+        for button, callbacks in clicks.items():
+            tracker = ClickTracker(self.root, callbacks.get('single'), callbacks.get('double'), self.double_click_ms())
+            self.click_trackers.append(tracker)
+            dispatch.setdefault(('button', button, mouse.UP), []).append(tracker.handle_event)
+        handlers = list(self.gesture_handlers.values())
+        if self.gesture_recorder: handlers.append(self.gesture_recorder)
+        for handler in handlers:
+            for key in (MOUSE_MOVE_KEY, ('button', handler.trigger_button, mouse.DOWN),
+                        ('button', handler.trigger_button, mouse.UP)):
+                dispatch.setdefault(key, []).append(handler.handle_event)
+        self.mouse_dispatch = dispatch
+        self.mouse_event_queue.configure(dispatch, {handler.trigger_button for handler in handlers})
+
+    @staticmethod
+    def double_click_ms():
+        try:
+            return win32gui.GetDoubleClickTime()
+        except Exception:
+            return MOUSE_DOUBLE_CLICK_MS
 
     def remove_all_triggers(self):
-        for trigger in self.triggers.values():
-            try:
-                keyboard.remove_hotkey(trigger)
-            except (KeyError, ValueError):
-                pass
-        self.triggers.clear()
+        self.hotkey_matcher.clear()
+        self.trigger_hotkeys.clear()
+
+    def hotkey_scope_active(self, scope):
+        """运行在键盘钩子线程，判断限定了作用范围的快捷键当前是否生效。"""
+        if scope == 'monitored': return win32gui.GetForegroundWindow() in self.monitor_manager.monitors
+        if scope.startswith('profile:'):
+            monitor = self.monitor_manager.monitors.get(win32gui.GetForegroundWindow())
+            return monitor is not None and monitor.profile == scope[len('profile:'):]
+        return False
+
+    def trigger_toggle_transparency(self):
+        """切换前台被监控窗口（否则为当前活动的被监控窗口）的透明效果。"""
+        monitor = self.monitor_manager.monitors.get(win32gui.GetForegroundWindow()) \
+                  or self.monitor_manager.active_monitor()
+        if monitor and monitor.running: monitor.toggle_transparency()
 
     def trigger_minimize_monitored_window(self):
-        if self.monitor and self.monitor.running:
+        monitor = self.monitor_manager.active_monitor()
+        if monitor and monitor.running:
             try:
-                hwnd = self.monitor.hwnd
+                hwnd = monitor.hwnd
                 if win32gui.IsWindow(hwnd):
                     cmd = win32con.SC_RESTORE if win32gui.IsIconic(hwnd) else win32con.SC_MINIMIZE
                     win32gui.PostMessage(hwnd, win32con.WM_SYSCOMMAND, cmd, 0)
@@ -916,24 +2998,35 @@ class App:
                 print(f"Error toggling window minimization: {e}")
 
     def trigger_force_close(self):
-        if self.monitor and self.monitor.running: self.root.after(0, self.execute_force_close)
+        if self.monitor_manager.active_monitor(): self.root.after(0, self.execute_force_close)
 
     def execute_force_close(self):
-        if not (self.monitor and self.monitor.running): return
-        hwnd = self.monitor.hwnd
+        monitor = self.monitor_manager.active_monitor()
+        if not (monitor and monitor.running): return
+        hwnd = monitor.hwnd
         try:
             _, pid = win32process.GetWindowThreadProcessId(hwnd)
+            process = self.process_cache.get(pid)
         except Exception:
-            pid = None
-        self.stop_monitoring_ui()
+            pid, process = None, None
+        self.monitor_manager.remove(hwnd)
+        if self.monitor_manager.running:
+            self.setup_all_triggers()
+            self.update_ui_states()
+            self.update_monitoring_label()
+        else:
+            self.stop_monitoring_ui()
         time.sleep(0.1)
         if win32gui.IsWindow(hwnd):
             win32gui.PostMessage(hwnd, win32con.WM_CLOSE, 0, 0)
-            threading.Thread(target=self.check_and_kill, args=(hwnd, pid), daemon=True).start()
+            threading.Thread(target=self.check_and_kill, args=(hwnd, pid, process), daemon=True).start()
 
-    def check_and_kill(self, hwnd, pid):
+    def check_and_kill(self, hwnd, pid, process=None):
         time.sleep(1.5)
-        if pid and win32gui.IsWindow(hwnd): os.system(f"taskkill /PID {pid} /F /T > nul")
+        if not (pid and win32gui.IsWindow(hwnd)): return
+        # 校验启动时间，确保不会误杀复用了该进程号的其他进程
+        if process is not None and self.process_cache.get(pid, verify=True).start_time != process.start_time: return
+        os.system(f"taskkill /PID {pid} /F /T > nul")
 
     def select_tray_icon(self):
         path = filedialog.askopenfilename(
@@ -947,29 +3040,107 @@ class App:
         """清空自定义托盘图标路径，恢复默认图标"""
         self.tray_icon_path_var.set('')
 
-    def _create_default_icon_image(self):
-        """用于绘制默认图标的PIL.Image对象"""
-        width, height = 64, 64
-        image = Image.new('RGB', (width, height), 'white')
-        dc = ImageDraw.Draw(image)
-        dc.ellipse((16, 24, 48, 40), fill='black', outline='black')
-        dc.ellipse((28, 30, 36, 38), fill='white', outline='white')
-        return image
-
     def create_tray_image(self):
-        path = self.tray_icon_path_var.get()
-        if path and os.path.exists(path):
+        monitors = self.monitor_manager.snapshot()
+        hovering = any(monitor.is_hovering for monitor in monitors)
+        return self.icon_cache.get(self.tray_icon_path_var.get()).tray_frame(len(monitors), hovering)
+
+    def tray_title(self):
+        count = len(self.monitor_manager.monitors)
+        if not count: return self._('window_title')
+        return self._('tray_tooltip_monitoring', title=self._('window_title'), count=count)
+
+    def tray_menu_state(self):
+        """影响托盘菜单内容的状态，变化时才重建菜单。"""
+        return (tuple(profile.get('name') for profile in self.profiles),
+                tuple((monitor.profile, monitor.away_transparency) for monitor in self.monitor_manager.snapshot()))
+
+    def update_tray_state(self):
+        """在Tk线程中定期调用：托盘显示时，按当前监控状态切换预先绘制好的图标。
+        两次更新至少间隔 TRAY_UPDATE_MIN_INTERVAL_MS，期间的变化合并到下一次更新。"""
+        if not (self.tray_icon and self.tray_icon.visible): return
+        desired = (self.create_tray_image(), self.tray_title(), self.tray_menu_state())
+        # 图片按对象比较：同一状态总是取到同一张预先绘制的图片
+        if desired[0] is self.tray_shown[0] and desired[1:] == self.tray_shown[1:]: return
+        now = time.monotonic()
+        if (now - self.tray_last_update) * 1000 < TRAY_UPDATE_MIN_INTERVAL_MS:
+            self.tray_stats['deferred'] += 1
+            return
+        self.tray_last_update = now
+        image, title, menu_state = desired
+        try:
+            if image is not self.tray_shown[0]: self.tray_icon.icon = image
+            if title != self.tray_shown[1]: self.tray_icon.title = title
+            if menu_state != self.tray_shown[2]:
+                self.tray_icon.update_menu()
+                self.tray_stats['menu_updates'] += 1
+            self.tray_stats['updates'] += 1
+            self.tray_shown = desired
+        except Exception as e:
+            print(f"Failed to update tray icon: {e}")
+
+    def tray_action(self, func, *args):
+        """托盘菜单的回调在托盘线程中执行，转交Tk线程处理。"""
+        return lambda: self.root.after(0, func, *args)
+
+    def create_tray_menu(self):
+        """菜单在托盘线程中生成，读取监控状态时一律使用快照。"""
+        def all_monitors(predicate):
+            monitors = self.monitor_manager.snapshot()
+            return bool(monitors) and all(predicate(monitor) for monitor in monitors)
+
+        def profile_items():
+            running = self.monitor_manager.running
+            items = [MenuItem(profile.get('name'), self.tray_action(self.apply_profile_to_monitors, profile.get('name')),
+                              checked=lambda item, name=profile.get('name'): all_monitors(
+                                  lambda monitor: monitor.profile == name),
+                              radio=True, enabled=running)
+                     for profile in list(self.profiles)]
+            return items or [MenuItem(self._('tray_no_profiles'), None, enabled=False)]
+
+        def opacity_items():
+            return [MenuItem(self._('tray_opacity_preset', value=value),
+                             self.tray_action(self.set_away_transparency, value),
+                             checked=lambda item, value=value: all_monitors(
+                                 lambda monitor: monitor.away_transparency == value),
+                             radio=True)
+                    for value in TRAY_OPACITY_PRESETS]
+
+        return Menu(MenuItem(self._('tray_show_window'), self.show_window_from_tray, default=True),
+                    Menu.SEPARATOR,
+                    MenuItem(self._('tray_stop'), self.tray_action(self.stop_monitoring_ui),
+                             enabled=lambda item: self.monitor_manager.running),
+                    MenuItem(self._('tray_profiles'), Menu(profile_items)),
+                    MenuItem(self._('tray_opacity'), Menu(opacity_items)),
+                    Menu.SEPARATOR,
+                    MenuItem(self._('tray_exit'), self.exit_app_from_tray))
+
+    def apply_profile_to_monitors(self, name):
+        """把指定配置的透明度与窗口选项应用到所有被监控的窗口。"""
+        profile = next((p for p in self.profiles if p.get('name') == name), None)
+        if profile is None or not self.monitor_manager.running: return
+        self.apply_monitor_options()
+        for monitor in self.monitor_manager.snapshot():
+            saved = dict(monitor.describe(), profile=name)
+            for key in ('hover', 'away', 'always_on_top', 'hide_taskbar'):
+                if key in profile: saved[key] = profile[key]
             try:
-                return Image.open(path)
+                self.create_monitor(monitor.hwnd, saved)
             except Exception as e:
-                print(f"Failed to load custom tray icon '{path}': {e}")
-        # 调用默认图标
-        width, height = 64, 64
-        image = Image.new('RGB', (width, height), 'white')
-        dc = ImageDraw.Draw(image)
-        dc.ellipse((16, 24, 48, 40), fill='black', outline='black')
-        dc.ellipse((28, 30, 36, 38), fill='white', outline='white')
-        return image
+                print(f"Failed to apply profile '{name}' to '{monitor.title}': {e}")
+        self.setup_all_triggers()
+        self.update_ui_states()
+        if self.monitor_manager.running:
+            self.update_monitoring_label()
+        else:
+            self.stop_monitoring_ui()
+        self.request_save()
+
+    def set_away_transparency(self, value):
+        """设置移开时的透明度，同时应用到所有被监控的窗口。"""
+        self.away_transparency_var.set(value)
+        for monitor in self.monitor_manager.snapshot(): monitor.set_away_transparency(value)
+        self.request_save()
 
     def minimize_to_tray(self):
         self.root.withdraw()
@@ -977,10 +3148,10 @@ class App:
 
     def show_tray_icon(self):
         if self.tray_icon and self.tray_icon.visible: return
-        image = self.create_tray_image()
-        menu = (MenuItem(self._('tray_show_window'), self.show_window_from_tray, default=True),
-                MenuItem(self._('tray_exit'), self.exit_app_from_tray))
-        self.tray_icon = Icon("WindowMonitor", image, self._('window_title'), menu)
+        image, title = self.create_tray_image(), self.tray_title()
+        self.tray_icon = Icon("WindowMonitor", image, title, self.create_tray_menu())
+        self.tray_shown = (image, title, self.tray_menu_state())
+        self.tray_last_update = time.monotonic()
         self.tray_thread = threading.Thread(target=self.tray_icon.run, daemon=True)
         self.tray_thread.start()
 
@@ -1006,72 +3177,109 @@ class App:
     def on_closing(self):
         if self.is_closing: return
         self.is_closing = True
-        if self.monitor and self.monitor.running: self.monitor.stop_monitoring()
+        # 停止前记录监控中的窗口集合，供退出时保存
+        if self.monitor_manager.running: self.last_monitored_windows = self.monitor_manager.describe()
+        self.monitor_manager.stop_all()
         self.root.withdraw()
+        # 在界面线程中取最后一份快照，由后台线程写入
+        if self.save_after_id: self.root.after_cancel(self.save_after_id)
+        self.save_settings()
         threading.Thread(target=self._perform_cleanup_and_exit, daemon=True).start()
 
     def _perform_cleanup_and_exit(self):
-        self.save_settings()
-        mouse.unhook(self.mouse_event_queue.put)
+        self.window_registry.stop()
+        self.config_store.close()
+        mouse.unhook(self._on_mouse_hook)
         if self.tray_icon and self.tray_icon.visible: self.tray_icon.stop()
         self.remove_all_triggers()
         self.root.after(0, self.root.destroy)
 
+    def settings_vars(self):
+        """返回会写入配置文件的所有Tk变量，用于跟踪设置变化。"""
+        variables = [self.always_on_top_var, self.hide_taskbar_var, self.event_driven_var, self.auto_resume_var,
+                     self.hover_opacity_var, self.away_transparency_var, self.fade_duration_var,
+                     self.fade_ui['easing_var'], self.edge_margin_var, self.hover_dwell_var, self.away_dwell_var,
+                     self.language_var, self.tray_icon_path_var]
+        for action in self.trigger_actions:
+            ui_map = getattr(self, f"trigger_ui_{action}")
+            variables += [ui_map[key] for key in ('type_var', 'kb_var', 'kb_scope_var', 'mb_var', 'mg_trigger_var',
+                                                  'mg_pattern_var')]
+        return variables
+
+    def request_save(self, *args):
+        """设置变化后延迟保存；延迟期间的其他变化合并到同一份快照中，拖动滑块时也只保存一次。"""
+        if self.save_after_id is None and not self.is_closing:
+            self.save_after_id = self.root.after(CONFIG_SAVE_DELAY_MS, self.save_settings)
+
     def save_settings(self):
+        """在界面线程中生成设置快照，交给配置存储在后台写入。"""
+        self.save_after_id = None
+        self.config_store.save(self.collect_settings())
+
+    def collect_settings(self):
         settings = {'triggers': {}, 'general': {}}
         for action in self.trigger_actions:
             if hasattr(self, f"trigger_ui_{action}"):
                 ui_map = getattr(self, f"trigger_ui_{action}")
                 settings['triggers'][action] = {
                     'type': ui_map['type_var'].get(), 'keyboard': ui_map['kb_var'].get(),
+                    'keyboard_scope': ui_map['kb_scope_var'].get(),
                     'mouse_button': ui_map['mb_var'].get(), 'gesture_trigger': ui_map['mg_trigger_var'].get(),
                     'gesture_pattern': ui_map['mg_pattern_var'].get()
                 }
         settings['options'] = {'always_on_top': self.always_on_top_var.get(),
-                               'hide_taskbar': self.hide_taskbar_var.get()}
-        settings['transparency'] = {'hover': self.hover_opacity_var.get(), 'away': self.away_transparency_var.get()}
+                               'hide_taskbar': self.hide_taskbar_var.get(),
+                               'event_driven': self.event_driven_var.get(),
+                               'auto_resume': self.auto_resume_var.get(),
+                               'min_interval_ms': self.monitor_manager.min_interval_ms,
+                               'max_interval_ms': self.monitor_manager.max_interval_ms}
+        transparency = {'hover': self.hover_opacity_var.get(), 'away': self.away_transparency_var.get(),
+                        'easing': self.fade_ui['easing_var'].get()}
+        # 快照不改写界面：用户正在编辑、内容暂时无效的输入框沿用上一份快照中的值
+        for key, var in (('fade_ms', self.fade_duration_var), ('edge_margin', self.edge_margin_var),
+                         ('hover_dwell_ms', self.hover_dwell_var), ('away_dwell_ms', self.away_dwell_var)):
+            value = self.peek_spin_value(var)
+            if value is None: value = self.saved_transparency.get(key)
+            if value is not None: transparency[key] = value
+        settings['transparency'] = self.saved_transparency = transparency
         settings['general'] = {'language': self.language_var.get(), 'tray_icon_path': self.tray_icon_path_var.get()}
+        settings['gesture_templates'] = self.gesture_recognizer.to_config()
+        settings['profiles'] = [dict(profile) for profile in self.profiles]
 
-        last_title = None
-        if self.monitor and self.monitor.running:
-            try:
-                if win32gui.IsWindow(self.monitor.hwnd): last_title = win32gui.GetWindowText(self.monitor.hwnd)
-            except Exception:
-                pass
-        settings['last_window_title'] = last_title
-
-        try:
-            with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
-                json.dump(settings, f, indent=4, ensure_ascii=False)
-        except Exception as e:
-            print(f"Failed to save settings: {e}")
+        monitored = self.monitor_manager.describe() if self.monitor_manager.running else self.last_monitored_windows
+        settings['monitored_windows'] = monitored
+        settings['last_window_title'] = monitored[-1]['title'] if monitored else None
+        return settings
 
     def load_settings(self):
         # 定义默认热键，以便在加载设置失败或文件不存在时使用
         default_hotkeys = {
             'minimize_monitored_window': 'ctrl+alt+m',
             'close_window': 'ctrl+alt+c',
+            'toggle_transparency': 'ctrl+alt+w, t',
             'hide_tray': 'ctrl+alt+h',
             'show_tray': 'ctrl+alt+s',
             'exit_app': 'ctrl+alt+x'
         }
 
-        if not os.path.exists(CONFIG_FILE):
-            # 如果没有配置文件，应用默认热键
-            for action, hotkey in default_hotkeys.items():
-                if hasattr(self, f"trigger_ui_{action}"):
-                    getattr(self, f"trigger_ui_{action}")['kb_var'].set(hotkey)
-            return
-
         try:
-            with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-                settings = json.load(f)
+            settings = self.config_store.load()
+            if settings is None:
+                # 如果没有配置文件，应用默认热键
+                for action, hotkey in default_hotkeys.items():
+                    if hasattr(self, f"trigger_ui_{action}"):
+                        getattr(self, f"trigger_ui_{action}")['kb_var'].set(hotkey)
+                return
 
             # 加载基础设置
             general = settings.get('general', {})
             self.language_var.set(general.get('language', 'zh'))
             self.tray_icon_path_var.set(general.get('tray_icon_path', ''))
 
+            # 先加载自定义手势模板，使触发器可以引用它们
+            self.gesture_recognizer.load_config(settings.get('gesture_templates', []))
+            self.mg_pattern_values = self.gesture_recognizer.pattern_names()
+
             # 加载其他设置
             triggers = settings.get('triggers', {})
             for action, config in triggers.items():
@@ -1080,6 +3288,7 @@ class App:
                     ui_map['type_var'].set(config.get('type', 'keyboard'))
                     # 加载已保存的快捷键，如果不存在，则使用该动作的默认值
                     ui_map['kb_var'].set(config.get('keyboard', default_hotkeys.get(action, '')))
+                    ui_map['kb_scope_var'].set(config.get('keyboard_scope', 'global'))
                     ui_map['mb_var'].set(config.get('mouse_button', 'middle_click'))
                     ui_map['mg_trigger_var'].set(config.get('gesture_trigger', 'right'))
                     ui_map['mg_pattern_var'].set(config.get('gesture_pattern', 'swipe_right'))
@@ -1087,24 +3296,59 @@ class App:
             options = settings.get('options', {})
             self.always_on_top_var.set(options.get('always_on_top', False))
             self.hide_taskbar_var.set(options.get('hide_taskbar', False))
+            self.event_driven_var.set(options.get('event_driven', True))
+            self.auto_resume_var.set(options.get('auto_resume', False))
+            # 自适应检测间隔的上下限仅通过配置文件调整
+            self.monitor_manager.min_interval_ms = max(1, int(options.get('min_interval_ms', MONITOR_MIN_INTERVAL_MS)))
+            self.monitor_manager.max_interval_ms = max(self.monitor_manager.min_interval_ms,
+                                                       int(options.get('max_interval_ms', MONITOR_MAX_INTERVAL_MS)))
 
             transparency = settings.get('transparency', {})
+            self.saved_transparency = dict(transparency)
             self.hover_opacity_var.set(transparency.get('hover', 100))
             self.away_transparency_var.set(transparency.get('away', 50))
-
-            self.last_monitored_title = settings.get('last_window_title')
+            self.fade_duration_var.set(transparency.get('fade_ms', 150))
+            self.fade_ui['easing_var'].set(transparency.get('easing', 'ease_out'))
+            self.edge_margin_var.set(transparency.get('edge_margin', 8))
+            self.hover_dwell_var.set(transparency.get('hover_dwell_ms', 50))
+            self.away_dwell_var.set(transparency.get('away_dwell_ms', 150))
+
+            self.last_monitored_windows = settings.get('monitored_windows') or []
+            self.profiles = [profile for profile in settings.get('profiles', []) if profile.get('name')]
+            self.on_profiles_changed(show_errors=False)
         except Exception as e:
             print(f"Error loading settings ({e}), using defaults.")
 
-    def preselect_last_window(self, title_to_select):
+    def find_saved_window(self, saved):
+        """用保存的窗口指纹在窗口索引中查找最匹配的窗口，找不到足够相似的窗口时返回None。"""
+        # 先用可执行文件或窗口类缩小候选范围，旧配置只有标题时退回按标题查找
+        if saved.get('exe'):
+            candidates = self.window_index.find_by_exe(saved['exe'])
+        elif saved.get('class'):
+            candidates = self.window_index.find_by_class(saved['class'])
+        else:
+            candidates = self.window_index.find_by_title(saved.get('title'))
+        best_hwnd, best_score = None, WINDOW_MATCH_MIN_SCORE
+        for hwnd in candidates:
+            # 已被前面的记录选中的窗口不再重复使用
+            if hwnd in self.restored_window_settings or self.row_of(hwnd) is None: continue
+            score = score_window_match(saved, self.window_index.get(hwnd))
+            if score > best_score or (score == best_score and best_hwnd is not None
+                                      and self.row_of(hwnd) < self.row_of(best_hwnd)):
+                best_hwnd, best_score = hwnd, score
+        return best_hwnd
+
+    def preselect_last_windows(self, saved_windows):
         try:
-            items = self.window_list.get(0, tk.END)
-            if title_to_select in items:
-                index = items.index(title_to_select)
-                self.window_list.selection_set(index)
-                self.window_list.activate(index)
-                self.window_list.see(index)
-                self.on_list_select(None)
+            for saved in saved_windows:
+                hwnd = self.find_saved_window(saved)
+                if hwnd is not None:
+                    index = self.row_of(hwnd)
+                    self.window_list.selection_set(index)
+                    self.window_list.activate(index)
+                    self.window_list.see(index)
+                    self.restored_window_settings[hwnd] = saved
+            self.on_list_select(None)
         except Exception as e:
             print(f"Error preselecting window: {e}")
 
@@ -1117,15 +3361,20 @@ class App:
                 'status_no_window_selected': "尚未选取窗口",
                 'status_selected': "已选取: {title}",
                 'status_monitoring': "正在监控: {title}",
+                'status_monitoring_many': "正在监控 {count} 个窗口: {titles}",
                 'status_stopped': "监控已停止。",
                 'status_clicking_to_select': "请点击目标窗口以完成选取...",
+                'label_search': "搜索:",
+                'combo_substring': "子串",
+                'combo_fuzzy': "模糊",
+                'combo_process': "进程名",
                 'button_select_with_mouse': "用鼠标选取窗口",
                 'button_refresh_list': "刷新窗口列表",
                 'button_start_monitoring': "开始监控",
                 'button_stop_monitoring': "停止监控",
                 'button_minimize_to_tray': "最小化到系统托盘",
                 'button_set_hotkey': "点此设置",
-                'button_press_hotkey': "请按下组合键...",
+                'button_press_hotkey': "请按下组合键（可连续按多步）...",
                 'tab_general': "通用设置",
                 'tab_transparency': "透明度 & 选项",
                 'tab_triggers': "触发器设置",
@@ -1140,11 +3389,39 @@ class App:
                 'frame_transparency': "透明度设置 (%)   0表示完全透明",
                 'label_hover_opacity': "鼠标悬停不透明度:",
                 'label_away_opacity': "鼠标移开不透明度:  ",
+                'label_fade_duration': "渐变时长(毫秒):",
+                'label_fade_easing': "缓动:",
+                'label_edge_margin': "边缘容差(像素):",
+                'label_hover_dwell': "悬停延迟(毫秒):",
+                'label_away_dwell': "移开延迟(毫秒):",
+                'combo_linear': "线性",
+                'combo_ease_in': "缓入",
+                'combo_ease_out': "缓出",
+                'combo_ease_in_out': "缓入缓出",
                 'frame_monitor_options': "监控选项",
                 'check_always_on_top': "被监控窗口始终置顶",
                 'check_hide_taskbar': "被监控窗口隐藏任务栏图标 (及Alt+Tab)",
+                'check_event_driven': "事件驱动悬停检测 (关闭则自适应轮询)",
+                'check_auto_resume': "启动时自动找回并恢复监控上次的窗口",
+                'tab_profiles': "自动附加",
+                'label_profile_name': "名称:",
+                'label_profile_exe': "程序名:",
+                'label_profile_class': "窗口类:",
+                'label_profile_title_regex': "标题正则:",
+                'label_profile_hover': "悬停不透明度:",
+                'label_profile_away': "移开不透明度:",
+                'check_profile_always_on_top': "置顶",
+                'check_profile_hide_taskbar': "隐藏任务栏图标",
+                'check_profile_enabled': "启用",
+                'button_profile_from_window': "使用选中的窗口",
+                'button_profile_save': "保存配置",
+                'button_profile_delete': "删除配置",
+                'title_profile_error': "配置错误",
+                'error_profile_name': "请先填写配置名称。",
+                'error_profile_pattern': "配置“{name}”的标题正则无效：{e}",
                 'frame_trigger_minimize_monitored_window': "最小化/复原被监控窗口",
                 'frame_trigger_close_window': "关闭被监控窗口",
+                'frame_trigger_toggle_transparency': "开启/暂停被监控窗口的透明效果",
                 'frame_trigger_hide_tray': "隐藏托盘图标",
                 'frame_trigger_show_tray': "显示托盘图标",
                 'frame_trigger_exit_app': "关闭本程序",
@@ -1159,12 +3436,21 @@ class App:
                 'combo_middle_click': "中键单击",
                 'combo_wheel_up': "滚轮向上",
                 'combo_wheel_down': "滚轮向下",
+                'combo_x1_click': "侧键 1 单击",
+                'combo_x2_click': "侧键 2 单击",
+                'combo_middle_double_click': "中键双击",
                 'combo_middle': "鼠标中键",
                 'combo_right': "鼠标右键",
                 'combo_swipe_right': "向右滑动",
                 'combo_swipe_left': "向左滑动",
                 'combo_swipe_up': "向上滑动",
                 'combo_swipe_down': "向下滑动",
+                'combo_l_shape': "L 形",
+                'combo_zigzag': "Z 字形",
+                'combo_circle': "画圈",
+                'combo_custom_gesture': "自定义手势 {n}",
+                'button_record_gesture': "录制手势",
+                'button_draw_gesture': "请画出手势...",
                 'title_invalid_op': "操作无效",
                 'title_warning': "警告",
                 'title_error': "错误",
@@ -1183,9 +3469,18 @@ class App:
                 'error_set_trigger': "无法设置“{name}”的触发器: \n{e}",
                 'error_conflict_header': "发现重复的触发器设置，请修改后重试：",
                 'conflict_used_for': "同时用于",
-                'info_window_closed': "被监控的窗口已关闭，监控自动停止。",
+                'conflict_prefix_of': "是 '{longer}' 的前缀，后者将无法触发：",
+                'combo_global': "所有窗口",
+                'combo_monitored': "仅被监控窗口在前台时",
+                'info_window_closed': "被监控的窗口“{title}”已关闭，已停止对其监控。",
                 'tray_show_window': "显示主窗口",
                 'tray_exit': "结束程序",
+                'tray_stop': "停止监控",
+                'tray_profiles': "应用配置",
+                'tray_no_profiles': "（无配置）",
+                'tray_opacity': "移开时透明度",
+                'tray_opacity_preset': "{value}%",
+                'tray_tooltip_monitoring': "{title} - 正在监控 {count} 个窗口",
                 'instructions': "使用说明",
                 'instructions_label': "选择窗口后点击开始监控 \n 通过蓝色字确认所选择窗口 \n\n  请勿使用任务管理器强制退出此程序！ \n如需强制退出请设置触发器快捷键",
             },
@@ -1196,15 +3491,20 @@ class App:
                 'status_no_window_selected': "No window selected",
                 'status_selected': "Selected: {title}",
                 'status_monitoring': "Monitoring: {title}",
+                'status_monitoring_many': "Monitoring {count} windows: {titles}",
                 'status_stopped': "Monitoring stopped.",
                 'status_clicking_to_select': "Please click on the target window to select it...",
+                'label_search': "Search:",
+                'combo_substring': "Substring",
+                'combo_fuzzy': "Fuzzy",
+                'combo_process': "Process",
                 'button_select_with_mouse': "Select with Mouse",
                 'button_refresh_list': "Refresh List",
                 'button_start_monitoring': "Start Monitoring",
                 'button_stop_monitoring': "Stop Monitoring",
                 'button_minimize_to_tray': "Minimize to Tray",
                 'button_set_hotkey': "Set Hotkey",
-                'button_press_hotkey': "Press any key combo...",
+                'button_press_hotkey': "Press a key combo or sequence...",
                 'tab_general': "General",
                 'tab_transparency': "Transparency & Options",
                 'tab_triggers': "Triggers",
@@ -1219,11 +3519,39 @@ class App:
                 'frame_transparency': "Transparency Settings (%)",
                 'label_hover_opacity': "Hover Opacity:",
                 'label_away_opacity': "Away Opacity:  ",
+                'label_fade_duration': "Fade (ms):",
+                'label_fade_easing': "Easing:",
+                'label_edge_margin': "Edge margin (px):",
+                'label_hover_dwell': "Hover delay (ms):",
+                'label_away_dwell': "Away delay (ms):",
+                'combo_linear': "Linear",
+                'combo_ease_in': "Ease In",
+                'combo_ease_out': "Ease Out",
+                'combo_ease_in_out': "Ease In-Out",
                 'frame_monitor_options': "Monitoring Options",
                 'check_always_on_top': "Always on Top",
                 'check_hide_taskbar': "Hide Taskbar Icon (and Alt+Tab)",
+                'check_event_driven': "Event-driven hover detection (off: adaptive polling)",
+                'check_auto_resume': "Find and resume last monitored windows at startup",
+                'tab_profiles': "Auto-attach",
+                'label_profile_name': "Name:",
+                'label_profile_exe': "Executable:",
+                'label_profile_class': "Window class:",
+                'label_profile_title_regex': "Title regex:",
+                'label_profile_hover': "Hover opacity:",
+                'label_profile_away': "Away opacity:",
+                'check_profile_always_on_top': "Always on top",
+                'check_profile_hide_taskbar': "Hide taskbar icon",
+                'check_profile_enabled': "Enabled",
+                'button_profile_from_window': "Use Selected Window",
+                'button_profile_save': "Save Profile",
+                'button_profile_delete': "Delete Profile",
+                'title_profile_error': "Profile Error",
+                'error_profile_name': "Please enter a profile name first.",
+                'error_profile_pattern': "The title regex of profile '{name}' is invalid: {e}",
                 'frame_trigger_minimize_monitored_window': "Minimize/Restore Monitored Window",
                 'frame_trigger_close_window': "Close Monitored Window",
+                'frame_trigger_toggle_transparency': "Toggle Transparency of Monitored Window",
                 'frame_trigger_hide_tray': "Hide Tray Icon",
                 'frame_trigger_show_tray': "Show Tray Icon",
                 'frame_trigger_exit_app': "Exit Application",
@@ -1238,12 +3566,21 @@ class App:
                 'combo_middle_click': "Middle Click",
                 'combo_wheel_up': "Wheel Up",
                 'combo_wheel_down': "Wheel Down",
+                'combo_x1_click': "X1 (Back) Click",
+                'combo_x2_click': "X2 (Forward) Click",
+                'combo_middle_double_click': "Middle Double Click",
                 'combo_middle': "Middle Button",
                 'combo_right': "Right Button",
                 'combo_swipe_right': "Swipe Right",
                 'combo_swipe_left': "Swipe Left",
                 'combo_swipe_up': "Swipe Up",
                 'combo_swipe_down': "Swipe Down",
+                'combo_l_shape': "L Shape",
+                'combo_zigzag': "Zigzag",
+                'combo_circle': "Circle",
+                'combo_custom_gesture': "Custom Gesture {n}",
+                'button_record_gesture': "Record",
+                'button_draw_gesture': "Draw the gesture...",
                 'title_invalid_op': "Invalid Operation",
                 'title_warning': "Warning",
                 'title_error': "Error",
@@ -1262,9 +3599,18 @@ class App:
                 'error_set_trigger': "Failed to set trigger for '{name}': \n{e}",
                 'error_conflict_header': "Found duplicate trigger settings. Please resolve the conflicts and try again:",
                 'conflict_used_for': "is used for",
-                'info_window_closed': "The monitored window has been closed. Monitoring stopped automatically.",
+                'conflict_prefix_of': "is a prefix of '{longer}', which can then never fire:",
+                'combo_global': "All windows",
+                'combo_monitored': "Only when a monitored window is focused",
+                'info_window_closed': "The monitored window \"{title}\" has been closed and is no longer monitored.",
                 'tray_show_window': "Show Main Window",
                 'tray_exit': "Exit",
+                'tray_stop': "Stop Monitoring",
+                'tray_profiles': "Apply Profile",
+                'tray_no_profiles': "(no profiles)",
+                'tray_opacity': "Away Transparency",
+                'tray_opacity_preset': "{value}%",
+                'tray_tooltip_monitoring': "{title} - monitoring {count} window(s)",
                 'instructions': "Instructions for Use",
                 'instructions_label': "After selecting the window, click \"Start Monitoring\". \nDo not use the Task Manager to force exit this program! \nIf forced exit is required, please set the trigger shortcut key",
             }